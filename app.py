@@ -30,13 +30,16 @@ if not src_path.exists():
 
 sys.path.insert(0, str(src_path))
 sys.path.insert(0, str(current_dir))
+sys.path.insert(0, str(src_path.parent))  # config/ package
 
 try:
     from data_processor import DataProcessor
+    from data_cache import PreparedDataCache, OptimizationCache
     from optimizer import PortfolioOptimizer
     from metrics import MetricsCalculator
     from reports import ReportGenerator
     from license_manager import LicenseManager
+    from config.settings import DEFAULT_MIN_LOT, DEFAULT_LOT_STEP, DEFAULT_MAX_LOT
 except ImportError as e:
     st.error(f"❌ Error importing modules: {e}")
     st.info("💡 Tip: Check if you are in the correct project directory")
@@ -189,6 +192,23 @@ with st.sidebar:
         help="Maximum drawdown percentage accepted per strategy"
     )
     
+    max_strategies = st.number_input(
+        "Max Active Strategies",
+        value=0,
+        min_value=0,
+        max_value=500,
+        step=1,
+        help="Maximum number of EAs with nonzero weight (0 = no limit)"
+    )
+    
+    with st.expander("Broker Lot Limits"):
+        min_lot = st.number_input("Min Lot", value=DEFAULT_MIN_LOT, min_value=0.0, step=0.01, format="%.2f",
+                                  help="Smallest volume accepted by the broker (MT5 volume_min)")
+        lot_step = st.number_input("Lot Step", value=DEFAULT_LOT_STEP, min_value=0.001, step=0.01, format="%.3f",
+                                   help="Volume increment (MT5 volume_step)")
+        max_lot = st.number_input("Max Lot", value=DEFAULT_MAX_LOT, min_value=0.01, step=1.0,
+                                  help="Largest volume accepted by the broker (MT5 volume_max)")
+    
     benchmark = st.selectbox(
         "Benchmark",
         options=["SPY", "^BVSP", "^GSPC", "QQQ"],
@@ -228,15 +248,17 @@ with tab1:
         # Process data
         with st.spinner("🔄 Processing data..."):
             try:
-                # 1. Load and validate
-                processor = DataProcessor(str(temp_path))
+                # 1. Load and validate (re-uploaded files are served from the prepared-data cache)
+                if 'data_cache' not in st.session_state:
+                    st.session_state.data_cache = PreparedDataCache()
+                processor = DataProcessor(str(temp_path), cache=st.session_state.data_cache, compact=True)
                 if not processor.load_and_validate():
-                    st.markdown('<div class="error-box">❌ Error validating file</div>', unsafe_allow_html=True)
+                    st.markdown(f'<div class="error-box">❌ Error validating file: {processor.validation_error}</div>', unsafe_allow_html=True)
                     st.stop()
                 
                 # 2. Prepare data
                 daily_pnl, original_lots, metadata = processor.prepare_data()
-                original_df = processor.get_original_df()
+                original_df = processor.get_original_df(copy=False)
                 
                 # Display preview
                 st.markdown("### Data preview")
@@ -254,23 +276,37 @@ with tab1:
                 st.markdown("---")
                 st.markdown("### ⚙️ Optimizing portfolio...")
                 
-                optimizer = PortfolioOptimizer(daily_pnl, risk_free_rate=0.0)
+                # Results of re-opened portfolios are reused across reruns and sessions
+                if 'result_cache' not in st.session_state:
+                    st.session_state.result_cache = OptimizationCache()
+                optimizer = PortfolioOptimizer(daily_pnl, risk_free_rate=0.0,
+                                               result_cache=st.session_state.result_cache)
                 ann_mean, ann_cov = optimizer.calculate_annual_metrics()
-                optimal_weights = optimizer.optimize()
+                if max_strategies > 0:
+                    optimal_weights = optimizer.optimize_cardinality(max_assets=int(max_strategies))
+                    allocation_label = f"Max Sharpe (≤{int(max_strategies)} strategies)"
+                else:
+                    optimal_weights = optimizer.optimize()
+                    allocation_label = "Max Sharpe"
                 multipliers = optimizer.calculate_multipliers(
                     optimal_weights,
                     capital_inicial,
                     risk_tolerance / 100
                 )
-                
-                # 4. Create optimized trades
-                trades_original = original_df.copy()
-                trades_optimized = original_df.copy()
-                trades_optimized['Multiplier'] = trades_optimized['Strategy name (Global)'].map(multipliers)
-                trades_optimized['Profit/Loss (Global)'] = (
-                    trades_optimized['Profit/Loss (Global)'] * trades_optimized['Multiplier']
+                final_lots = optimizer.allocate_lots(
+                    optimal_weights,
+                    original_lots,
+                    capital_inicial,
+                    risk_tolerance / 100,
+                    min_lot=min_lot,
+                    lot_step=lot_step,
+                    max_lot=max_lot
                 )
                 
+                # 4. Optimized trades are derived lazily from the original
+                # frame (P/L × multiplier) by MetricsCalculator
+                trades_original = original_df
+                
                 # Save in session state
                 st.session_state.processor = processor
                 st.session_state.optimizer = optimizer
@@ -278,9 +314,15 @@ with tab1:
                 st.session_state.original_lots = original_lots
                 st.session_state.metadata = metadata
                 st.session_state.optimal_weights = optimal_weights
+                st.session_state.allocation_label = allocation_label
                 st.session_state.multipliers = multipliers
+                st.session_state.final_lots = final_lots
+                # Multipliers of the lots actually deployed (final lot / original lot)
+                st.session_state.deployed_multipliers = dict(
+                    zip(daily_pnl.columns, optimizer.lot_allocation["multipliers"].tolist())
+                )
                 st.session_state.trades_original = trades_original
-                st.session_state.trades_optimized = trades_optimized
+                st.session_state.pop('frontier', None)
                 
                 st.markdown('<div class="success-box">✅ Optimization complete!</div>', unsafe_allow_html=True)
                 
@@ -301,8 +343,9 @@ with tab2:
             capital_inicial
         )
         calc_optimized = MetricsCalculator(
-            st.session_state.trades_optimized,
-            capital_inicial
+            st.session_state.trades_original,
+            capital_inicial,
+            multipliers=st.session_state.deployed_multipliers
         )
         
         metrics_original = calc_original.calculate_all_metrics()
@@ -346,12 +389,44 @@ with tab2:
                     'Strategy': strat,
                     'Weight (%)': f"{peso:.2f}%",
                     'Original Lot': st.session_state.original_lots[strat],
-                    'Final Lot (MT5)': round(st.session_state.original_lots[strat] * st.session_state.multipliers[strat], 2)
+                    'Final Lot (MT5)': st.session_state.final_lots[strat]
                 })
         
         mt5_df = pd.DataFrame(alloc_data).sort_values(by='Final Lot (MT5)', ascending=False)
         st.dataframe(mt5_df, use_container_width=True)
-        
+
+        allocation = st.session_state.optimizer.lot_allocation
+        st.caption(f"Lots on the broker grid: deployed risk ${allocation['risk'].sum():,.2f} "
+                   f"of ${allocation['target_risk'].sum():,.2f} budget "
+                   f"(tracking error ${allocation['tracking_error']:,.2f})")
+
+        # Efficient frontier (computed once per analysis)
+        st.markdown("---")
+        st.markdown("### 📐 Efficient Frontier")
+
+        if 'frontier' not in st.session_state:
+            st.session_state.frontier = st.session_state.optimizer.efficient_frontier(num_points=25)
+        frontier = st.session_state.frontier
+        optimizer = st.session_state.optimizer
+        opt_weights = st.session_state.optimal_weights
+
+        fig, ax = plt.subplots(figsize=(12, 6))
+        ax.plot(frontier['risk'], frontier['return'], marker='o', markersize=3, label='Efficient Frontier')
+        ax.scatter(np.sqrt(opt_weights @ optimizer.ann_cov @ opt_weights), opt_weights @ optimizer.ann_mean,
+                   color='red', zorder=3, label=st.session_state.allocation_label)
+        if st.session_state.allocation_label != 'Max Sharpe':
+            # Cardinality-limited weights sit inside the frontier: show the unconstrained optimum too
+            free_weights, _ = optimizer.solve_max_sharpe(optimizer.ann_mean, optimizer.ann_cov,
+                                                         optimizer.risk_free_rate)
+            ax.scatter(np.sqrt(free_weights @ optimizer.ann_cov @ free_weights), free_weights @ optimizer.ann_mean,
+                       color='black', marker='x', zorder=3, label='Max Sharpe')
+        ax.legend()
+        ax.grid(True, alpha=0.3)
+        ax.set_xlabel('Annual Risk ($)')
+        ax.set_ylabel('Annual Return ($)')
+
+        st.pyplot(fig)
+
         # Save for report
         st.session_state.metrics_df = metrics_df
         st.session_state.mt5_df = mt5_df
@@ -416,7 +491,7 @@ with tab3:
                             st.session_state.metrics_df,
                             st.session_state.mt5_df,
                             st.session_state.trades_original,
-                            st.session_state.trades_optimized
+                            st.session_state.calc_optimized.get_trades()
                         )
                         
                         st.markdown(f'<div class="success-box">✅ Report generated: {Path(output_file).name}</div>', 
@@ -457,10 +532,8 @@ with tab4:
                     # Choose the correct data
                     if portfolio_choice == "Original":
                         calc = st.session_state.calc_original
-                        trades_df = st.session_state.trades_original
                     else:
                         calc = st.session_state.calc_optimized
-                        trades_df = st.session_state.trades_optimized
                     
                     # Get equity curve
                     equity_curve = calc.get_equity_curve()
@@ -0,0 +1,106 @@
+"""
+Benchmark: peak memory of the trade pipeline, with and without redundant copies.
+
+Rode com: python benchmarks/bench_pipeline_memory.py [num_trades]
+"""
+
+import sys
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "brp_portfolio_optimizer" / "src"))
+
+from data_processor import DataProcessor
+from optimizer import PortfolioOptimizer
+from metrics import MetricsCalculator
+
+
+def make_trades_csv(path: Path, num_trades: int, num_strategies: int = 50):
+    """Writes a synthetic MT5-style trade log."""
+    rng = np.random.default_rng(0)
+    times = pd.Timestamp("2015-01-01") + pd.to_timedelta(rng.integers(0, 10 * 365 * 24 * 60, num_trades), unit="min")
+    pd.DataFrame({
+        "Open time": times.strftime("%Y.%m.%d %H:%M:%S"),
+        "Strategy name (Global)": rng.choice([f"EA {i:03d}" for i in range(num_strategies)], num_trades),
+        "Profit/Loss (Global)": rng.normal(5, 150, num_trades).round(2),
+        "Size": rng.choice([0.01, 0.05, 0.1, 0.5], num_trades),
+    }).to_csv(path, index=False)
+
+
+def legacy_pipeline(csv_path: Path):
+    """Pipeline with the copies made before the copy-free changes."""
+    processor = DataProcessor(str(csv_path))
+    processor.load_and_validate()
+    raw = processor.df.copy()                      # prepare_data(): self.df.copy()
+    daily_pnl, original_lots, metadata = processor.prepare_data()
+    original_df = processor.get_original_df()      # get_original_df(): deep copy
+
+    optimizer = PortfolioOptimizer(daily_pnl)
+    weights = optimizer.optimize()
+    multipliers = optimizer.calculate_multipliers(weights, 100000, 0.25)
+
+    trades_original = original_df.copy()
+    trades_optimized = original_df.copy()
+    trades_optimized["Multiplier"] = trades_optimized["Strategy name (Global)"].map(multipliers)
+    trades_optimized["Profit/Loss (Global)"] = trades_optimized["Profit/Loss (Global)"] * trades_optimized["Multiplier"]
+
+    results = []
+    for trades in (trades_original, trades_optimized):
+        trades = trades.copy()                     # MetricsCalculator.__init__
+        curves = trades.copy()                     # _prepare_curves()
+        results.append(MetricsCalculator(trades, 100000).calculate_all_metrics())
+        del curves
+    del raw
+    return results
+
+
+def copy_free_pipeline(csv_path: Path):
+    """Pipeline with shared frames and lazily derived optimized P/L."""
+    processor = DataProcessor(str(csv_path))
+    processor.load_and_validate()
+    daily_pnl, original_lots, metadata = processor.prepare_data()
+    original_df = processor.get_original_df(copy=False)
+
+    optimizer = PortfolioOptimizer(daily_pnl)
+    weights = optimizer.optimize()
+    multipliers = optimizer.calculate_multipliers(weights, 100000, 0.25)
+
+    return [
+        MetricsCalculator(original_df, 100000).calculate_all_metrics(),
+        MetricsCalculator(original_df, 100000, multipliers=multipliers).calculate_all_metrics(),
+    ]
+
+
+def measure(func, *args):
+    """Returns (result, peak traced memory in MB)."""
+    tracemalloc.start()
+    result = func(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, peak / (1024 * 1024)
+
+
+def main():
+    num_trades = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = Path(tmp) / "trades.csv"
+        make_trades_csv(csv_path, num_trades)
+
+        legacy, legacy_peak = measure(legacy_pipeline, csv_path)
+        copy_free, copy_free_peak = measure(copy_free_pipeline, csv_path)
+
+    assert legacy[1]["Total Profit"] == copy_free[1]["Total Profit"]
+
+    print(f"Trades: {num_trades:,}")
+    print(f"Peak memory (legacy copies): {legacy_peak:8.1f} MB")
+    print(f"Peak memory (copy-free):     {copy_free_peak:8.1f} MB")
+    print(f"Reduction:                   {100 * (1 - copy_free_peak / legacy_peak):8.1f} %")
+
+
+if __name__ == "__main__":
+    main()
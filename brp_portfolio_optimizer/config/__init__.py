@@ -6,8 +6,15 @@ from .settings import (
     PROJECT_ROOT,
     DATA_DIR,
     OUTPUTS_DIR,
+    CACHE_DIR,
+    CACHE_MAX_SIZE_MB,
+    RESULT_CACHE_DIR,
+    RESULT_CACHE_MAX_ENTRIES,
     DEFAULT_CAPITAL_INICIAL,
     DEFAULT_RISK_TOLERANCE_DD,
+    DEFAULT_MIN_LOT,
+    DEFAULT_LOT_STEP,
+    DEFAULT_MAX_LOT,
     REQUIRED_COLUMNS,
     RISK_METRICS,
     RETURN_METRICS,
@@ -18,8 +25,15 @@ __all__ = [
     "PROJECT_ROOT",
     "DATA_DIR",
     "OUTPUTS_DIR",
+    "CACHE_DIR",
+    "CACHE_MAX_SIZE_MB",
+    "RESULT_CACHE_DIR",
+    "RESULT_CACHE_MAX_ENTRIES",
     "DEFAULT_CAPITAL_INICIAL",
     "DEFAULT_RISK_TOLERANCE_DD",
+    "DEFAULT_MIN_LOT",
+    "DEFAULT_LOT_STEP",
+    "DEFAULT_MAX_LOT",
     "REQUIRED_COLUMNS",
     "RISK_METRICS",
     "RETURN_METRICS",
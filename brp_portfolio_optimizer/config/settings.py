@@ -20,6 +20,17 @@ DEFAULT_CAPITAL_INICIAL = 100000
 DEFAULT_RISK_TOLERANCE_DD = 0.25  # 25% DD allowed per allocation
 DEFAULT_RISK_FREE_RATE = 0.0
 
+# Broker Lot Limits (MT5 volume_min / volume_step / volume_max)
+DEFAULT_MIN_LOT = 0.01
+DEFAULT_LOT_STEP = 0.01
+DEFAULT_MAX_LOT = 100.0
+
+# Cache Configuration
+CACHE_DIR = OUTPUTS_DIR / "cache"
+CACHE_MAX_SIZE_MB = 500
+RESULT_CACHE_DIR = CACHE_DIR / "results"
+RESULT_CACHE_MAX_ENTRIES = 64  # In-memory tier of the optimization result cache
+
 # Logging Configuration
 LOG_LEVEL = "INFO"
 LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
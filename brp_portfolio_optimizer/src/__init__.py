@@ -6,14 +6,44 @@ Versão: 1.0.0
 __version__ = "1.0.0"
 __author__ = "BRP Quant Capital"
 
-from .data_processor import DataProcessor
+from .data_processor import DataProcessor, DailyAggregate
 from .optimizer import PortfolioOptimizer
 from .metrics import MetricsCalculator
 from .reports import ReportGenerator
+from .data_cache import PreparedDataCache, OptimizationCache
+from .sparse_pnl import SparseDailyPnL
+from .shared_store import SharedPnLStore, PnLView
+from .qp_solver import solve_qp_active_set, max_sharpe_qp
+from .walk_forward import WalkForwardOptimizer
+from .covariance import (
+    SampleCovariance,
+    LedoitWolfCovariance,
+    ConstantCorrelationCovariance,
+    EWMACovariance,
+)
+from .hrp import hrp_weights
+from .monte_carlo import simulate_drawdowns
+from .lot_allocation import allocate_lots
 
 __all__ = [
     "DataProcessor",
+    "DailyAggregate",
     "PortfolioOptimizer",
     "MetricsCalculator",
     "ReportGenerator",
+    "PreparedDataCache",
+    "OptimizationCache",
+    "SparseDailyPnL",
+    "SharedPnLStore",
+    "PnLView",
+    "solve_qp_active_set",
+    "max_sharpe_qp",
+    "WalkForwardOptimizer",
+    "SampleCovariance",
+    "LedoitWolfCovariance",
+    "ConstantCorrelationCovariance",
+    "EWMACovariance",
+    "hrp_weights",
+    "simulate_drawdowns",
+    "allocate_lots",
 ]
@@ -0,0 +1,168 @@
+"""
+Cardinality: Max-Sharpe allocation over at most K strategies with a minimum weight.
+"""
+
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from typing import Dict, List, Optional, Sequence, Tuple
+import logging
+
+try:
+    from .qp_solver import max_sharpe_qp
+except ImportError:  # src/ imported as top-level modules (app.py, tests)
+    from qp_solver import max_sharpe_qp
+
+logger = logging.getLogger(__name__)
+
+# Annualized moments of the current process-pool worker (set once by _init_worker)
+_WORKER_MOMENTS = None
+
+
+def _sharpe(weights: np.ndarray, mean_returns: np.ndarray, cov_matrix: np.ndarray, rf: float) -> float:
+    vol = np.sqrt(weights @ cov_matrix @ weights)
+    return float((weights @ mean_returns - rf) / vol) if vol > 0 else -np.inf
+
+
+def subset_max_sharpe(mean_returns: np.ndarray, cov_matrix: np.ndarray, rf: float, subset: Sequence[int],
+                      min_weight: float = 0.0) -> Tuple[np.ndarray, float]:
+    """
+    Max-Sharpe weights restricted to a subset, with a minimum weight per holding.
+
+    Solves the long-only max-Sharpe QP on the subset, then drops the
+    holdings below min_weight and re-solves until every remaining weight
+    satisfies it.
+
+    Args:
+        mean_returns: Annualized mean returns (N)
+        cov_matrix: Annualized covariance matrix (N × N)
+        rf: Risk-free rate
+        subset: Candidate strategy positions
+        min_weight: Minimum weight of every held strategy
+
+    Returns:
+        Tuple: (weights over all N strategies, Sharpe); Sharpe is -inf when
+            no strategy of the subset has a positive excess return
+    """
+    active = np.asarray(sorted(subset))
+    weights = np.zeros(len(mean_returns))
+    while active.size:
+        try:
+            w = max_sharpe_qp(mean_returns[active], cov_matrix[np.ix_(active, active)], rf)["weights"]
+        except ValueError:
+            return weights, -np.inf
+        keep = w >= min_weight
+        if keep.all():
+            weights[active] = w
+            return weights, _sharpe(weights, mean_returns, cov_matrix, rf)
+        if not keep.any():
+            keep = w == w.max()
+        active = active[keep]
+    return weights, -np.inf
+
+
+def _init_worker(mean_returns, cov_matrix, rf, min_weight):
+    """Process-pool initializer: keeps the moments for every task of the worker."""
+    global _WORKER_MOMENTS
+    _WORKER_MOMENTS = (np.asarray(mean_returns), np.asarray(cov_matrix), rf, min_weight)
+
+
+def _evaluate_in_worker(subset: Sequence[int]) -> Tuple[np.ndarray, float]:
+    mean_returns, cov_matrix, rf, min_weight = _WORKER_MOMENTS
+    return subset_max_sharpe(mean_returns, cov_matrix, rf, subset, min_weight)
+
+
+def cardinality_search(mean_returns: np.ndarray, cov_matrix: np.ndarray, rf: float, max_assets: int,
+                       min_weight: float = 0.0, time_budget: float = 5.0, swap_candidates: int = 10,
+                       max_workers: Optional[int] = None) -> Dict:
+    """
+    Heuristic pre-selection plus swap local search over subsets of at most K strategies.
+
+    1. Pre-selection: the largest weights of the unconstrained max-Sharpe
+       solution, completed with the best stand-alone Sharpe ratios.
+    2. Local search: each round evaluates swapping every held strategy
+       for one of the `swap_candidates` outsiders with the largest Sharpe
+       gradient at the current weights (the outsiders that would most
+       improve the portfolio if added), and moves to the best improving
+       subset. Stops when no swap improves or the time budget runs out.
+
+    Args:
+        mean_returns: Annualized mean returns (N)
+        cov_matrix: Annualized covariance matrix (N × N)
+        rf: Risk-free rate
+        max_assets: Maximum number of held strategies (K)
+        min_weight: Minimum weight of every held strategy
+        time_budget: Local search time limit in seconds
+        swap_candidates: Outsiders considered per round
+        max_workers: Process pool size for the swap evaluations (None/1: in-process)
+
+    Returns:
+        Dict: weights (N), sharpe, selected (positions), evaluations, rounds
+        (ValueError when no strategy has a positive excess return)
+    """
+    mean_returns = np.asarray(mean_returns, dtype=float)
+    cov_matrix = np.asarray(cov_matrix, dtype=float)
+    num_assets = len(mean_returns)
+    if max_assets < 1:
+        raise ValueError("max_assets must be at least 1")
+    if min_weight * max_assets > 1:
+        raise ValueError(f"min_weight={min_weight} is infeasible with max_assets={max_assets}")
+    start = time.perf_counter()
+
+    # 1. Pre-selection
+    full, full_sharpe = subset_max_sharpe(mean_returns, cov_matrix, rf, range(num_assets), min_weight)
+    if not np.isfinite(full_sharpe):
+        raise ValueError("No strategy has a positive excess return: the max-Sharpe allocation is undefined")
+    if np.count_nonzero(full) <= max_assets:
+        return {"weights": full, "sharpe": full_sharpe, "selected": list(np.flatnonzero(full)),
+                "evaluations": 1, "rounds": 0}
+
+    standalone = (mean_returns - rf) / np.sqrt(np.maximum(np.diag(cov_matrix), 1e-300))
+    ranking = sorted(range(num_assets), key=lambda j: (-full[j], -standalone[j]))
+    subset = ranking[:max_assets]
+    weights, sharpe = subset_max_sharpe(mean_returns, cov_matrix, rf, subset, min_weight)
+    evaluations = 2
+
+    pool = None
+    if max_workers is not None and max_workers > 1:
+        pool = ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                                   initargs=(mean_returns, cov_matrix, rf, min_weight))
+
+    # 2. Swap local search
+    rounds = 0
+    try:
+        while time.perf_counter() - start < time_budget:
+            rounds += 1
+            held = set(np.flatnonzero(weights)) or set(subset)
+
+            # Sharpe gradient: μ/σ - (μᵀw - rf)·Σw/σ³ (stand-alone Sharpe at zero volatility)
+            cov_w = cov_matrix @ weights
+            vol = np.sqrt(max(weights @ cov_w, 0.0))
+            if vol > 0:
+                grad = mean_returns / vol - (weights @ mean_returns - rf) * cov_w / vol ** 3
+            else:
+                grad = standalone
+            outsiders = [j for j in np.argsort(-grad) if j not in held][:swap_candidates]
+
+            neighbours: List[List[int]] = []
+            if len(held) < max_assets:  # room left (min-weight trimming): try adding
+                neighbours += [sorted(held | {j}) for j in outsiders]
+            neighbours += [sorted((held - {i}) | {j}) for i in held for j in outsiders]
+
+            if pool is not None:
+                results = list(pool.map(_evaluate_in_worker, neighbours, chunksize=max(len(neighbours) // (4 * max_workers), 1)))
+            else:
+                results = [subset_max_sharpe(mean_returns, cov_matrix, rf, n, min_weight) for n in neighbours]
+            evaluations += len(neighbours)
+
+            best = int(np.argmax([r[1] for r in results])) if results else None
+            if best is None or results[best][1] <= sharpe + 1e-12:
+                break
+            weights, sharpe = results[best]
+            subset = neighbours[best]
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+    return {"weights": weights, "sharpe": sharpe, "selected": list(np.flatnonzero(weights)),
+            "evaluations": evaluations, "rounds": rounds}
@@ -0,0 +1,297 @@
+"""
+Covariance estimators: sample, shrinkage and EWMA, with O(N²) per-row updates.
+"""
+
+from abc import ABC, abstractmethod
+import numpy as np
+from math import comb
+from typing import Union
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class CovarianceEstimator(ABC):
+    """
+    Base class of the streaming covariance estimators.
+
+    fit() consumes a whole (T × N) history, update() adds one new row in
+    O(N²) without rescanning the history. covariance() returns the daily
+    (non-annualized) estimate.
+    """
+
+    name = "base"
+
+    def __init__(self):
+        self.n = 0
+
+    def fit(self, values: np.ndarray) -> "CovarianceEstimator":
+        """Resets the estimator and accumulates a (T × N) history."""
+        values = np.atleast_2d(np.asarray(values, dtype=float))
+        self._reset(values.shape[1])
+        self._accumulate(values)
+        return self
+
+    def update(self, row: np.ndarray) -> "CovarianceEstimator":
+        """Adds one or more new rows (days)."""
+        rows = np.atleast_2d(np.asarray(row, dtype=float))
+        if self.n == 0:
+            self._reset(rows.shape[1])
+        self._accumulate(rows)
+        return self
+
+    @abstractmethod
+    def _reset(self, num_assets: int):
+        """Clears the state for num_assets columns."""
+
+    @abstractmethod
+    def _accumulate(self, rows: np.ndarray):
+        """Folds a (k × N) block of rows into the state."""
+
+    @abstractmethod
+    def mean(self) -> np.ndarray:
+        """Daily mean (N)."""
+
+    @abstractmethod
+    def covariance(self) -> np.ndarray:
+        """Daily covariance (N × N)."""
+
+
+class SampleCovariance(CovarianceEstimator):
+    """Unbiased sample covariance, updated with Welford's algorithm."""
+
+    name = "sample"
+
+    @classmethod
+    def from_moments(cls, mean: np.ndarray, cov: np.ndarray, n: int) -> "SampleCovariance":
+        """Resumes from a known daily mean and sample covariance of n rows, without the history."""
+        estimator = cls()
+        estimator._reset(len(mean))
+        estimator.n = n
+        estimator._mean = np.array(mean, dtype=float)
+        estimator._m2 = np.array(cov, dtype=float) * (n - 1)
+        return estimator
+
+    def _reset(self, num_assets: int):
+        self.n = 0
+        self._mean = np.zeros(num_assets)
+        self._m2 = np.zeros((num_assets, num_assets))
+
+    def _accumulate(self, rows: np.ndarray):
+        if len(rows) == 1:
+            self.n += 1
+            delta = rows[0] - self._mean
+            self._mean += delta / self.n
+            self._m2 += np.outer(delta, rows[0] - self._mean)
+            return
+
+        # Block merge (Chan et al.): same result as row-by-row Welford
+        k = len(rows)
+        block_mean = rows.mean(axis=0)
+        centred = rows - block_mean
+        delta = block_mean - self._mean
+        total = self.n + k
+        self._m2 += centred.T @ centred + np.outer(delta, delta) * self.n * k / total
+        self._mean += delta * k / total
+        self.n = total
+
+    def remove(self, row: np.ndarray) -> "SampleCovariance":
+        """Removes one or more rows previously added (inverse of the block merge)."""
+        rows = np.atleast_2d(np.asarray(row, dtype=float))
+        k = len(rows)
+        remaining = self.n - k
+        if remaining < 1:
+            raise ValueError("Cannot remove every row from the estimator")
+
+        block_mean = rows.mean(axis=0)
+        centred = rows - block_mean
+        mean = (self._mean * self.n - block_mean * k) / remaining
+        delta = block_mean - mean
+        self._m2 -= centred.T @ centred + np.outer(delta, delta) * remaining * k / self.n
+        self._mean = mean
+        self.n = remaining
+        return self
+
+    def mean(self) -> np.ndarray:
+        return self._mean.copy()
+
+    def covariance(self) -> np.ndarray:
+        return self._m2 / (self.n - 1)
+
+
+class _ShrinkageCovariance(CovarianceEstimator):
+    """
+    Shared state of the Ledoit-Wolf estimators.
+
+    The optimal shrinkage intensity needs fourth-order centred moments
+    Σ yᵢ²yⱼ² and Σ yᵢ³yⱼ (y = x - mean). Centring on a mean that moves
+    with every new row would require rescanning the history, so raw power
+    sums Σ xᵢᵃxⱼᵇ are kept instead (N × N each) and expanded binomially
+    around the current mean on demand. Rows are shifted by the first
+    observed block's mean to keep the raw sums well conditioned.
+    """
+
+    # (a, b) exponents of the raw power sums Σ xᵢᵃ xⱼᵇ kept as N × N matrices
+    _POWERS = ((1, 1), (2, 1), (1, 2), (2, 2), (3, 1))
+
+    def _reset(self, num_assets: int):
+        self.n = 0
+        self._shift = None
+        self._vec = np.zeros((5, num_assets))  # Σ xᵃ for a = 0..4 (row 0 unused)
+        self._mat = {p: np.zeros((num_assets, num_assets)) for p in self._POWERS}
+
+    def _accumulate(self, rows: np.ndarray):
+        if self._shift is None:
+            self._shift = rows.mean(axis=0)
+        x = rows - self._shift
+        powers = [np.ones_like(x), x, x * x, x * x * x, x ** 4]
+        for a in range(1, 5):
+            self._vec[a] += powers[a].sum(axis=0)
+        for a, b in self._POWERS:
+            self._mat[(a, b)] += powers[a].T @ powers[b]
+        self.n += len(rows)
+
+    def _raw(self, a: int, b: int) -> np.ndarray:
+        """Σ xᵢᵃ xⱼᵇ as an N × N matrix (broadcast when an exponent is zero)."""
+        if a == 0 and b == 0:
+            return np.full((len(self._vec[0]), len(self._vec[0])), float(self.n))
+        if b == 0:
+            return np.broadcast_to(self._vec[a][:, None], (len(self._vec[0]),) * 2)
+        if a == 0:
+            return np.broadcast_to(self._vec[b][None, :], (len(self._vec[0]),) * 2)
+        return self._mat[(a, b)]
+
+    def _centred(self, p: int, q: int) -> np.ndarray:
+        """Σ (xᵢ - μᵢ)ᵖ (xⱼ - μⱼ)ᵠ from the raw sums (binomial expansion)."""
+        mu = self._vec[1] / self.n
+        total = np.zeros((len(mu), len(mu)))
+        for a in range(p + 1):
+            for b in range(q + 1):
+                coef = comb(p, a) * comb(q, b)
+                total += coef * np.outer((-mu) ** (p - a), (-mu) ** (q - b)) * self._raw(a, b)
+        return total
+
+    def mean(self) -> np.ndarray:
+        return self._vec[1] / self.n + self._shift
+
+    def _sample_moments(self):
+        """Biased sample covariance S and the π matrix of Ledoit-Wolf."""
+        s = self._centred(1, 1) / self.n
+        pi = self._centred(2, 2) / self.n - s ** 2
+        return s, pi
+
+    @abstractmethod
+    def _target(self, s: np.ndarray) -> np.ndarray:
+        """Shrinkage target F for the biased sample covariance S."""
+
+    @abstractmethod
+    def _rho(self, s: np.ndarray, pi: np.ndarray) -> float:
+        """The ρ term of the optimal shrinkage intensity (Σ AsyCov(√T fᵢⱼ, √T sᵢⱼ))."""
+
+    def shrinkage(self) -> float:
+        """Optimal shrinkage intensity δ in [0, 1]."""
+        s, pi = self._sample_moments()
+        gamma = np.sum((self._target(s) - s) ** 2)
+        if gamma <= 0:
+            return 0.0
+        kappa = (pi.sum() - self._rho(s, pi)) / gamma
+        return float(min(max(kappa / self.n, 0.0), 1.0))
+
+    def covariance(self) -> np.ndarray:
+        s, _ = self._sample_moments()
+        delta = self.shrinkage()
+        return (delta * self._target(s) + (1.0 - delta) * s) * self.n / (self.n - 1)
+
+
+class LedoitWolfCovariance(_ShrinkageCovariance):
+    """Ledoit-Wolf (2004) shrinkage towards a scaled identity."""
+
+    name = "ledoit_wolf"
+
+    def _target(self, s: np.ndarray) -> np.ndarray:
+        return np.trace(s) / len(s) * np.eye(len(s))
+
+    def _rho(self, s: np.ndarray, pi: np.ndarray) -> float:
+        # The identity target is deterministic given tr(S): no covariance term
+        return 0.0
+
+
+class ConstantCorrelationCovariance(_ShrinkageCovariance):
+    """Ledoit-Wolf (2003) shrinkage towards the constant-correlation matrix."""
+
+    name = "constant_correlation"
+
+    def _target(self, s: np.ndarray) -> np.ndarray:
+        std = np.sqrt(np.diag(s))
+        corr = s / np.outer(std, std)
+        num_assets = len(s)
+        r_bar = (corr.sum() - num_assets) / (num_assets * (num_assets - 1))
+        target = r_bar * np.outer(std, std)
+        np.fill_diagonal(target, np.diag(s))
+        return target
+
+    def _rho(self, s: np.ndarray, pi: np.ndarray) -> float:
+        std = np.sqrt(np.diag(s))
+        corr = s / np.outer(std, std)
+        num_assets = len(s)
+        r_bar = (corr.sum() - num_assets) / (num_assets * (num_assets - 1))
+
+        # θ_ii,ij = Σ (yᵢ² - sᵢᵢ)(yᵢyⱼ - sᵢⱼ) / T
+        theta = self._centred(3, 1) / self.n - np.diag(s)[:, None] * s
+        ratio = std[None, :] / std[:, None]  # sqrt(sⱼⱼ / sᵢᵢ)
+        off = r_bar / 2 * (ratio * theta + ratio.T * theta.T)
+        np.fill_diagonal(off, 0.0)
+        return float(np.trace(pi) + off.sum())
+
+
+class EWMACovariance(CovarianceEstimator):
+    """Exponentially weighted covariance (RiskMetrics-style decay)."""
+
+    name = "ewma"
+
+    def __init__(self, decay: float = 0.94):
+        """
+        Args:
+            decay (float): Weight of the previous estimate (λ); halflife = ln 2 / -ln λ
+        """
+        super().__init__()
+        if not 0 < decay < 1:
+            raise ValueError("decay must be in (0, 1)")
+        self.decay = decay
+
+    def _reset(self, num_assets: int):
+        self.n = 0
+        self._mean = np.zeros(num_assets)
+        self._cov = np.zeros((num_assets, num_assets))
+
+    def _accumulate(self, rows: np.ndarray):
+        alpha = 1.0 - self.decay
+        for row in rows:
+            if self.n == 0:
+                self._mean = row.copy()
+            else:
+                delta = row - self._mean
+                self._mean += alpha * delta
+                self._cov = self.decay * (self._cov + alpha * np.outer(delta, delta))
+            self.n += 1
+
+    def mean(self) -> np.ndarray:
+        return self._mean.copy()
+
+    def covariance(self) -> np.ndarray:
+        return self._cov.copy()
+
+
+COV_ESTIMATORS = {
+    cls.name: cls
+    for cls in (SampleCovariance, LedoitWolfCovariance, ConstantCorrelationCovariance, EWMACovariance)
+}
+
+
+def make_estimator(estimator: Union[str, CovarianceEstimator]) -> CovarianceEstimator:
+    """Returns an estimator instance from its name (see COV_ESTIMATORS) or the instance itself."""
+    if isinstance(estimator, CovarianceEstimator):
+        return estimator
+    if estimator not in COV_ESTIMATORS:
+        raise ValueError(f"Unknown covariance estimator: {estimator}. Use one of {tuple(COV_ESTIMATORS)}.")
+    return COV_ESTIMATORS[estimator]()
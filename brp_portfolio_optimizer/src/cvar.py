@@ -0,0 +1,89 @@
+"""
+CVaR: Scenario-based minimum-CVaR allocation as a sparse linear program (HiGHS).
+"""
+
+import numpy as np
+from scipy import sparse
+from scipy.optimize import linprog
+from typing import Dict, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def cvar_lp(scenarios, alpha: float = 0.95, objective: str = "min_cvar",
+            mean_returns: Optional[np.ndarray] = None, target_return: Optional[float] = None) -> Dict:
+    """
+    Long-only CVaR optimization over historical scenarios (Rockafellar-Uryasev).
+
+    Each row of `scenarios` is one day of strategy PnL. With variables
+    w (N), ζ (VaR) and one shortfall u_t ≥ 0 per day:
+
+        min  ζ + Σ u_t / ((1 - α)·T)
+        s.t. u_t ≥ -r_tᵀw - ζ
+
+    "min_cvar" adds 1ᵀw = 1 (and μᵀw ≥ target_return if given).
+    "return_per_cvar" maximizes μᵀw / CVaR(w) through the homogeneous
+    form μᵀy = 1, y ≥ 0 (CVaR is positively homogeneous), then w = y/1ᵀy.
+
+    The constraint matrix is [-R, -1, -I] in sparse form: besides the
+    scenario data itself, only O(T) non-zeros are added.
+
+    Args:
+        scenarios: (T × N) dense array or scipy.sparse matrix of daily PnL
+        alpha: CVaR confidence level (e.g., 0.95 = mean of the worst 5% days)
+        objective: "min_cvar" or "return_per_cvar"
+        mean_returns: Expected returns (N); default: scenario means
+        target_return: Minimum expected return for "min_cvar"
+
+    Returns:
+        Dict: weights, cvar, var, status, iterations and problem size
+            (num_variables, num_constraints, nnz)
+    """
+    if objective not in ("min_cvar", "return_per_cvar"):
+        raise ValueError(f"Unknown CVaR objective: {objective}. Use 'min_cvar' or 'return_per_cvar'.")
+    if not 0 < alpha < 1:
+        raise ValueError("alpha must be in (0, 1)")
+
+    R = sparse.csr_matrix(scenarios, dtype=float)
+    num_days, num_assets = R.shape
+    if mean_returns is None:
+        mean_returns = np.asarray(R.mean(axis=0)).ravel()
+    mean_returns = np.asarray(mean_returns, dtype=float)
+
+    c = np.concatenate((np.zeros(num_assets), [1.0], np.full(num_days, 1.0 / ((1.0 - alpha) * num_days))))
+    A_ub = sparse.hstack([-R, -np.ones((num_days, 1)), -sparse.identity(num_days)], format="csr")
+    b_ub = np.zeros(num_days)
+    weight_bounds = (0, 1) if objective == "min_cvar" else (0, None)
+    bounds = [weight_bounds] * num_assets + [(None, None)] + [(0, None)] * num_days
+
+    if objective == "min_cvar":
+        A_eq = sparse.hstack([np.ones((1, num_assets)), sparse.csr_matrix((1, 1 + num_days))], format="csr")
+        if target_return is not None:
+            target_row = sparse.hstack([-mean_returns[None, :], sparse.csr_matrix((1, 1 + num_days))])
+            A_ub = sparse.vstack([A_ub, target_row], format="csr")
+            b_ub = np.append(b_ub, -target_return)
+    else:
+        if not np.any(mean_returns > 0):
+            raise ValueError("No strategy with a positive expected return: return per CVaR is not defined.")
+        A_eq = sparse.hstack([mean_returns[None, :], sparse.csr_matrix((1, 1 + num_days))], format="csr")
+
+    result = linprog(c, A_ub=A_ub, b_ub=b_ub, A_eq=A_eq, b_eq=[1.0], bounds=bounds, method="highs")
+    if result.x is None:
+        raise ValueError(f"CVaR LP failed: {result.message}")
+
+    y = result.x[:num_assets]
+    scale = y.sum() if objective == "return_per_cvar" else 1.0
+    if scale <= 0:
+        raise ValueError("CVaR LP returned an empty portfolio.")
+
+    return {
+        "weights": y / scale,
+        "cvar": float(result.fun / scale),
+        "var": float(result.x[num_assets] / scale),
+        "status": "optimal" if result.status == 0 else result.message,
+        "iterations": int(result.nit),
+        "num_variables": len(c),
+        "num_constraints": A_ub.shape[0] + A_eq.shape[0],
+        "nnz": A_ub.nnz + A_eq.nnz,
+    }
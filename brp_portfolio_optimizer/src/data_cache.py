@@ -0,0 +1,400 @@
+"""
+PreparedDataCache: Content-addressed on-disk cache of prepared daily PnL matrices.
+"""
+
+import hashlib
+import json
+import os
+import sys
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import Tuple, Dict, Optional, Any
+import logging
+
+try:
+    from ..config.settings import CACHE_DIR, CACHE_MAX_SIZE_MB, RESULT_CACHE_DIR, RESULT_CACHE_MAX_ENTRIES
+except ImportError:  # src/ imported as top-level modules (app.py, tests)
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+    from config.settings import CACHE_DIR, CACHE_MAX_SIZE_MB, RESULT_CACHE_DIR, RESULT_CACHE_MAX_ENTRIES
+
+logger = logging.getLogger(__name__)
+
+_HASH_BLOCK_SIZE = 1 << 20
+
+
+class PreparedDataCache:
+    """
+    Stores (daily_pnl, original_lots, metadata) keyed by file content and parse options.
+
+    Entries are uncompressed NumPy .npz archives (one array per column block),
+    so a hit is a straight binary read with no CSV parsing or pivoting.
+    The cache is bounded in size; the least recently used entries are evicted.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, max_size_mb: float = CACHE_MAX_SIZE_MB):
+        """
+        Initializes the cache.
+
+        Args:
+            cache_dir: Directory for cache entries (default: CACHE_DIR)
+            max_size_mb: Maximum total size of the cache on disk
+        """
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else CACHE_DIR
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = int(max_size_mb * 1024 * 1024)
+
+    @staticmethod
+    def make_key(filepath, options: Optional[Dict] = None) -> str:
+        """
+        Builds the cache key from the file content and the parse options.
+
+        Args:
+            filepath: Source CSV file, or a list of files (hashed in order)
+            options: JSON-serializable parse options that affect the result
+
+        Returns:
+            str: Hex digest identifying the prepared data
+        """
+        filepaths = filepath if isinstance(filepath, (list, tuple)) else [filepath]
+
+        digest = hashlib.blake2b(digest_size=20)
+        for path in filepaths:
+            with open(path, "rb") as f:
+                for block in iter(lambda: f.read(_HASH_BLOCK_SIZE), b""):
+                    digest.update(block)
+        digest.update(json.dumps(options or {}, sort_keys=True, default=str).encode("utf-8"))
+        return digest.hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.npz"
+
+    def get(self, key: str) -> Optional[Tuple[pd.DataFrame, pd.Series, Dict]]:
+        """
+        Loads a cached entry.
+
+        Args:
+            key: Cache key from make_key()
+
+        Returns:
+            Tuple or None: (daily_pnl_matrix, original_lots, metadata) on a hit
+        """
+        path = self._entry_path(key)
+        if not path.exists():
+            return None
+
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                values = data["values"]
+                dates = data["dates"]
+                lots = data["lots"]
+                info = json.loads(str(data["info"]))
+                trades = self._read_trades(data, info) if "trade_columns" in info else None
+        except Exception as e:
+            logger.warning(f"Discarding unreadable cache entry {path.name}: {e}")
+            path.unlink(missing_ok=True)
+            return None
+
+        # Refresh the entry's position in the LRU order
+        os.utime(path)
+
+        strategies = info["strategies"]
+        daily_pnl = pd.DataFrame(
+            values,
+            index=pd.Index(pd.DatetimeIndex(dates).date, name="Date"),
+            columns=pd.Index(strategies, name=info["columns_name"])
+        )
+        original_lots = pd.Series(lots, index=daily_pnl.columns.copy(), name=info["lots_name"])
+
+        metadata = {
+            "num_trades": info["num_trades"],
+            "num_strategies": len(strategies),
+            "date_range": tuple(pd.Timestamp(t) for t in info["date_range"]),
+            "strategies": list(strategies),
+            "original_df": trades,
+            "failed_files": info.get("failed_files", {})
+        }
+
+        logger.info(f"✅ Cache hit: {path.name}")
+        return daily_pnl, original_lots, metadata
+
+    @staticmethod
+    def _read_trades(data, info: Dict) -> pd.DataFrame:
+        """Rebuilds the trade-level frame stored by put(trades=...)."""
+        strategy = pd.Categorical.from_codes(data["trade_strategy"], info["trade_strategies"])
+        columns = {
+            "Open time": pd.Series(data["trade_time"]),
+            "Strategy name (Global)": pd.Series(strategy).astype(info["trade_strategy_dtype"]),
+            "Profit/Loss (Global)": pd.Series(data["trade_pnl"]),
+            "Size": pd.Series(data["trade_size"]),
+        }
+        return pd.DataFrame({col: columns[col] for col in info["trade_columns"]})
+
+    def put(self, key: str, daily_pnl: pd.DataFrame, original_lots: pd.Series, metadata: Dict,
+            trades: Optional[pd.DataFrame] = None) -> Path:
+        """
+        Stores a prepared result and evicts old entries if over the size limit.
+
+        Args:
+            key: Cache key from make_key()
+            daily_pnl: Daily PnL matrix (Date × Strategy)
+            original_lots: Median lot per strategy
+            metadata: Metadata dict from prepare_data()
+            trades: Optional trade-level frame (required columns, parsed
+                Open time); returned as metadata["original_df"] on a hit
+
+        Returns:
+            Path: Path of the stored entry
+        """
+        info = {
+            "strategies": list(daily_pnl.columns),
+            "columns_name": daily_pnl.columns.name,
+            "lots_name": original_lots.name,
+            "num_trades": int(metadata["num_trades"]),
+            "date_range": [pd.Timestamp(t).isoformat() for t in metadata["date_range"]],
+            "failed_files": metadata.get("failed_files", {}),
+        }
+
+        arrays = {}
+        if trades is not None:
+            codes, strategies = pd.factorize(trades["Strategy name (Global)"], sort=True)
+            info.update({
+                "trade_columns": list(trades.columns),
+                "trade_strategies": [str(s) for s in strategies],
+                "trade_strategy_dtype": str(trades["Strategy name (Global)"].dtype),
+            })
+            arrays = {
+                "trade_time": trades["Open time"].to_numpy(),
+                "trade_strategy": codes.astype(np.int32),
+                "trade_pnl": trades["Profit/Loss (Global)"].to_numpy(),
+                "trade_size": trades["Size"].to_numpy(),
+            }
+
+        path = self._entry_path(key)
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "wb") as f:
+            np.savez(
+                f,
+                values=np.ascontiguousarray(daily_pnl.to_numpy(dtype=float)),
+                dates=np.asarray(pd.to_datetime(daily_pnl.index), dtype="datetime64[D]"),
+                lots=original_lots.reindex(daily_pnl.columns).to_numpy(dtype=float),
+                info=np.array(json.dumps(info, default=str)),
+                **arrays
+            )
+        os.replace(tmp_path, path)
+
+        self._evict()
+        return path
+
+    def _evict(self):
+        """Removes least recently used entries until the cache fits max_bytes."""
+        entries = sorted(self.cache_dir.glob("*.npz"), key=lambda p: p.stat().st_mtime)
+        total = sum(p.stat().st_size for p in entries)
+
+        while entries and total > self.max_bytes:
+            oldest = entries.pop(0)
+            total -= oldest.stat().st_size
+            oldest.unlink(missing_ok=True)
+            logger.info(f"Cache entry evicted: {oldest.name}")
+
+    def clear(self):
+        """Removes all cache entries."""
+        for path in self.cache_dir.glob("*.npz"):
+            path.unlink(missing_ok=True)
+
+
+def _json_default(value: Any):
+    """JSON fallback for NumPy scalars/arrays and other solver diagnostics."""
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    return str(value)
+
+
+class OptimizationCache:
+    """
+    Two-tier (memory + disk) LRU cache of optimization results.
+
+    Keyed on the daily PnL matrix bytes and the optimizer parameters; an
+    entry holds the weights, the solver diagnostics and the multipliers
+    computed for each (capital, DD tolerance) pair. The memory tier is an
+    LRU of at most max_entries results; the disk tier stores one .npz per
+    key and is bounded in size like PreparedDataCache.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, max_entries: int = RESULT_CACHE_MAX_ENTRIES,
+                 max_size_mb: float = CACHE_MAX_SIZE_MB):
+        """
+        Initializes the cache.
+
+        Args:
+            cache_dir: Directory for the disk tier (default: RESULT_CACHE_DIR)
+            max_entries: Maximum number of results kept in memory
+            max_size_mb: Maximum total size of the disk tier
+        """
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else RESULT_CACHE_DIR
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self.max_bytes = int(max_size_mb * 1024 * 1024)
+        self._memory: "OrderedDict[str, Dict]" = OrderedDict()
+
+    @staticmethod
+    def data_digest(daily_pnl) -> str:
+        """
+        Fast content hash of a daily PnL matrix (values, dates and strategy labels).
+
+        Args:
+            daily_pnl: DataFrame, PnLView or SparseDailyPnL
+
+        Returns:
+            str: Hex digest of the matrix
+        """
+        digest = hashlib.blake2b(digest_size=20)
+        if hasattr(daily_pnl, "matrix"):  # SparseDailyPnL: hash the CSC buffers
+            matrix = daily_pnl.matrix
+            for array in (matrix.data, matrix.indices, matrix.indptr):
+                digest.update(np.ascontiguousarray(array).data)
+            digest.update(str(matrix.shape).encode("utf-8"))
+        else:
+            values = np.ascontiguousarray(np.asarray(daily_pnl.values, dtype=float))
+            digest.update(str(values.shape).encode("utf-8"))
+            digest.update(values.data)
+        digest.update(json.dumps([list(map(str, daily_pnl.index)), list(map(str, daily_pnl.columns))]).encode("utf-8"))
+        return digest.hexdigest()
+
+    @staticmethod
+    def make_key(data_digest: str, params: Optional[Dict] = None) -> str:
+        """
+        Builds the cache key from the matrix digest and the optimizer parameters.
+
+        Args:
+            data_digest: Digest from data_digest()
+            params: JSON-serializable parameters that affect the result
+
+        Returns:
+            str: Hex digest identifying the result
+        """
+        digest = hashlib.blake2b(data_digest.encode("utf-8"), digest_size=20)
+        digest.update(json.dumps(params or {}, sort_keys=True, default=_json_default).encode("utf-8"))
+        return digest.hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.npz"
+
+    def get(self, key: str) -> Optional[Dict]:
+        """
+        Looks a result up in memory, then on disk (promoting it to memory).
+
+        Args:
+            key: Cache key from make_key()
+
+        Returns:
+            Dict or None: {"weights", "solver_info", "multipliers"} on a hit
+        """
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            # Memory hits are uses too: keep the disk entry out of the LRU eviction
+            try:
+                os.utime(self._entry_path(key))
+            except FileNotFoundError:
+                pass
+            return self._memory[key]
+
+        path = self._entry_path(key)
+        if not path.exists():
+            return None
+
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                weights = data["weights"]
+                info = json.loads(str(data["info"]))
+        except Exception as e:
+            logger.warning(f"Discarding unreadable cache entry {path.name}: {e}")
+            path.unlink(missing_ok=True)
+            return None
+
+        os.utime(path)
+        entry = {
+            "weights": weights,
+            "solver_info": info["solver_info"],
+            "multipliers": {k: np.asarray(v) for k, v in info["multipliers"].items()},
+        }
+        self._remember(key, entry)
+        logger.info(f"✅ Result cache hit (disk): {path.name}")
+        return entry
+
+    def put(self, key: str, weights: np.ndarray, solver_info: Dict,
+            multipliers: Optional[Dict[str, np.ndarray]] = None) -> Path:
+        """
+        Stores a result in both tiers.
+
+        Args:
+            key: Cache key from make_key()
+            weights: Optimal weights
+            solver_info: Solver diagnostics
+            multipliers: {multiplier_key(capital, dd): multipliers array}
+
+        Returns:
+            Path: Path of the disk entry
+        """
+        entry = {
+            "weights": np.asarray(weights, dtype=float),
+            "solver_info": dict(solver_info),
+            "multipliers": {k: np.array(v, dtype=float) for k, v in (multipliers or {}).items()},
+        }
+        self._remember(key, entry)
+
+        info = json.dumps({"solver_info": entry["solver_info"], "multipliers": entry["multipliers"]},
+                          default=_json_default)
+        path = self._entry_path(key)
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "wb") as f:
+            np.savez(f, weights=entry["weights"], info=np.array(info))
+        os.replace(tmp_path, path)
+
+        self._evict()
+        return path
+
+    @staticmethod
+    def multiplier_key(capital_inicial: float, risk_tolerance_dd: float) -> str:
+        """Entry key of the multipliers for one (capital, DD tolerance) pair."""
+        return f"{float(capital_inicial)!r}|{float(risk_tolerance_dd)!r}"
+
+    def _remember(self, key: str, entry: Dict):
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _evict(self):
+        """Removes least recently used disk entries until the tier fits max_bytes."""
+        entries = sorted(self.cache_dir.glob("*.npz"), key=lambda p: p.stat().st_mtime)
+        total = sum(p.stat().st_size for p in entries)
+
+        while entries and total > self.max_bytes:
+            oldest = entries.pop(0)
+            total -= oldest.stat().st_size
+            oldest.unlink(missing_ok=True)
+            logger.info(f"Result cache entry evicted: {oldest.name}")
+
+    def invalidate(self, key: str) -> bool:
+        """
+        Removes one result from both tiers.
+
+        Args:
+            key: Cache key from make_key()
+
+        Returns:
+            bool: True if the entry existed in either tier
+        """
+        in_memory = self._memory.pop(key, None) is not None
+        path = self._entry_path(key)
+        on_disk = path.exists()
+        path.unlink(missing_ok=True)
+        return in_memory or on_disk
+
+    def clear(self):
+        """Removes all results from both tiers."""
+        self._memory.clear()
+        for path in self.cache_dir.glob("*.npz"):
+            path.unlink(missing_ok=True)
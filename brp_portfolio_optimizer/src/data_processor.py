@@ -4,54 +4,551 @@ DataProcessor: Module for loading, validating, and processing trade data.
 
 import pandas as pd
 import numpy as np
+import csv
+import glob
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 from pathlib import Path
-from typing import Tuple, Dict
+from typing import Tuple, Dict, List, Optional
 import logging
 
+try:
+    from ..config.settings import REQUIRED_COLUMNS, ALLOWED_EXTENSIONS, MAX_FILE_SIZE_MB
+except ImportError:  # src/ imported as top-level modules (app.py, tests)
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+    from config.settings import REQUIRED_COLUMNS, ALLOWED_EXTENSIONS, MAX_FILE_SIZE_MB
+
+try:
+    from .data_cache import PreparedDataCache
+    from .sparse_pnl import SparseDailyPnL
+    from .timestamps import parse_open_time, sniff_datetime_format
+except ImportError:
+    from data_cache import PreparedDataCache
+    from sparse_pnl import SparseDailyPnL
+    from timestamps import parse_open_time, sniff_datetime_format
+
 logger = logging.getLogger(__name__)
 
+TIME_COL = "Open time"
+STRATEGY_COL = "Strategy name (Global)"
+PNL_COL = "Profit/Loss (Global)"
+SIZE_COL = "Size"
+
+# Bytes read from the start of the file to sniff the delimiter and header
+SNIFF_BYTES = 64 * 1024
+CANDIDATE_DELIMITERS = ",;\t|"
+
+
+def sniff_csv(filepath, max_size_mb: Optional[float] = None) -> Tuple[str, List[str]]:
+    """
+    Pre-flight check of a CSV file without parsing its body.
+
+    Checks the extension against ALLOWED_EXTENSIONS and, optionally, the
+    size, then sniffs the delimiter and header from the first bytes and
+    checks the header against REQUIRED_COLUMNS.
+
+    Args:
+        filepath: Path to the CSV file
+        max_size_mb: Maximum file size (None = no limit)
+
+    Returns:
+        Tuple: (delimiter, header_columns as written in the file; see
+            required_columns() for the mapping to REQUIRED_COLUMNS)
+    """
+    filepath = Path(filepath)
+    if not filepath.exists():
+        raise FileNotFoundError(f"File not found: {filepath}")
+
+    if filepath.suffix.lower() not in ALLOWED_EXTENSIONS:
+        raise ValueError(f"Extension not allowed: '{filepath.suffix}' (allowed: {ALLOWED_EXTENSIONS})")
+
+    size_mb = filepath.stat().st_size / (1024 * 1024)
+    if max_size_mb is not None and size_mb > max_size_mb:
+        raise ValueError(f"File too large: {size_mb:.1f} MB (limit: {max_size_mb} MB)")
+
+    with open(filepath, "r", encoding="utf-8-sig", errors="replace", newline="") as f:
+        sample = f.read(SNIFF_BYTES)
+
+    lines = sample.splitlines()
+    if not lines or not lines[0].strip():
+        raise ValueError("Empty file")
+
+    try:
+        delimiter = csv.Sniffer().sniff("\n".join(lines[:20]), delimiters=CANDIDATE_DELIMITERS).delimiter
+    except csv.Error:
+        delimiter = ","
+
+    header = next(csv.reader([lines[0]], delimiter=delimiter))
+    found = set(required_columns(header).values())
+    missing_cols = [col for col in REQUIRED_COLUMNS if col not in found]
+    if missing_cols:
+        raise ValueError(f"Missing columns: {missing_cols}")
+
+    return delimiter, header
+
+
+def required_columns(header: List[str]) -> Dict[str, str]:
+    """
+    Maps the header names as written in the file to REQUIRED_COLUMNS.
+
+    Names are matched after stripping surrounding whitespace, so padded
+    headers (" Size") are read and renamed to the canonical names.
+    """
+    return {col: col.strip() for col in header if col.strip() in REQUIRED_COLUMNS}
+
+
+def read_dtypes(compact: bool = False, float32_pnl: bool = False) -> Dict:
+    """Explicit dtypes for the required columns (no per-column inference)."""
+    return {
+        TIME_COL: str,
+        STRATEGY_COL: "category" if compact else str,
+        PNL_COL: np.float32 if (compact and float32_pnl) else np.float64,
+        SIZE_COL: np.float64,
+    }
+
+
+def read_trade_chunks(filepath, chunksize: int = 200_000):
+    """
+    Validates the CSV header and yields the required columns in chunks.
+
+    Args:
+        filepath: Path to the CSV file
+        chunksize: Number of CSV rows per chunk
+
+    Yields:
+        pd.DataFrame: Chunks with the REQUIRED_COLUMNS only
+    """
+    delimiter, header = sniff_csv(filepath)
+    columns = required_columns(header)
+    dtypes = read_dtypes()
+    for chunk in pd.read_csv(filepath, sep=delimiter, usecols=list(columns),
+                             dtype={raw: dtypes[name] for raw, name in columns.items()}, chunksize=chunksize):
+        yield chunk.rename(columns=columns)
+
+
+def _add_by_key(total: Optional[pd.Series], part: pd.Series, disjoint: bool = False) -> pd.Series:
+    """
+    Adds part into total key by key, touching only the keys of part.
+
+    Keys already in total are incremented in place; new keys are
+    concatenated at the end (the stored order is not sorted). Unlike
+    Series.add(fill_value=0), no union of the two indexes is built, so the
+    cost follows part rather than the accumulated state. With disjoint
+    (e.g. only days after the stored ones) the key lookup is skipped.
+    """
+    if total is None:
+        return part.copy()
+    if disjoint:
+        return pd.concat([total, part])
+
+    positions = total.index.get_indexer(part.index)
+    hit = positions >= 0
+    if hit.any():
+        total.iloc[positions[hit]] = total.to_numpy()[positions[hit]] + part.to_numpy()[hit]
+    if hit.all():
+        return total
+    return pd.concat([total, part[~hit]])
+
+
+class DailyAggregate:
+    """
+    Mergeable running aggregate of a trade log.
+
+    Holds the (Date × Strategy) PnL sums in long format and the per-strategy
+    count of each distinct Size value, so memory depends on days × strategies
+    (and on the number of distinct lot sizes), never on the trade count.
+    Lot sizes are quantized by the broker's lot step, which keeps the Size
+    counts small while still giving the exact median.
+    """
+
+    def __init__(self):
+        self.pnl = None          # (Date, Strategy) -> summed P/L
+        self.size_counts = None  # (Strategy, Size) -> number of trades
+        self.num_trades = 0
+        self.first_time = None
+        self.last_time = None
+        self.time_format = None  # Sniffed once, reused for every chunk
+
+    def update(self, trades: pd.DataFrame) -> "DailyAggregate":
+        """
+        Folds a chunk of raw trades into the aggregate.
+
+        Args:
+            trades: DataFrame with the REQUIRED_COLUMNS
+
+        Returns:
+            DailyAggregate: self, for chaining
+        """
+        if trades.empty:
+            return self
+
+        if self.time_format is None and not pd.api.types.is_datetime64_any_dtype(trades[TIME_COL]):
+            self.time_format = sniff_datetime_format(trades[TIME_COL])
+        open_time = parse_open_time(trades[TIME_COL], fmt=self.time_format)
+        days = open_time.dt.normalize().rename("Date")
+
+        pnl = trades[PNL_COL].groupby([days, trades[STRATEGY_COL]]).sum()
+        sizes = trades.groupby([STRATEGY_COL, SIZE_COL]).size()
+
+        chunk_first, chunk_last = open_time.min(), open_time.max()
+        later_days = self.last_time is not None and chunk_first.normalize() > self.last_time.normalize()
+        self.pnl = _add_by_key(self.pnl, pnl, disjoint=later_days)
+        self.size_counts = _add_by_key(self.size_counts, sizes)
+        self.num_trades += len(trades)
+
+        if self.first_time is None or chunk_first < self.first_time:
+            self.first_time = chunk_first
+        if self.last_time is None or chunk_last > self.last_time:
+            self.last_time = chunk_last
+
+        return self
+
+    def merge(self, other: "DailyAggregate") -> "DailyAggregate":
+        """
+        Merges another aggregate (e.g. from a different file) into this one.
+
+        Args:
+            other: Aggregate to fold in
+
+        Returns:
+            DailyAggregate: self, for chaining
+        """
+        if other.num_trades == 0:
+            return self
+
+        later_days = self.last_time is not None and other.first_time.normalize() > self.last_time.normalize()
+        self.pnl = _add_by_key(self.pnl, other.pnl, disjoint=later_days)
+        self.size_counts = _add_by_key(self.size_counts, other.size_counts)
+
+        self.num_trades += other.num_trades
+        if self.time_format is None:
+            self.time_format = other.time_format
+        if self.first_time is None or other.first_time < self.first_time:
+            self.first_time = other.first_time
+        if self.last_time is None or other.last_time > self.last_time:
+            self.last_time = other.last_time
+
+        return self
+
+    def append(self, delta, chunksize: int = 200_000) -> "DailyAggregate":
+        """
+        Appends new trades without reprocessing the history.
+
+        The cost is proportional to the delta. Appending the same trades
+        twice counts them twice: callers pass only trades not yet folded in.
+
+        Args:
+            delta: CSV path or DataFrame of new trades
+            chunksize: Number of CSV rows per chunk when delta is a path
+
+        Returns:
+            DailyAggregate: self, for chaining
+        """
+        if isinstance(delta, pd.DataFrame):
+            missing_cols = [col for col in REQUIRED_COLUMNS if col not in delta.columns]
+            if missing_cols:
+                raise ValueError(f"Missing columns: {missing_cols}")
+            self.update(delta[REQUIRED_COLUMNS])
+        else:
+            for chunk in read_trade_chunks(delta, chunksize):
+                self.update(chunk)
+
+        logger.info(f"✅ Trades appended: {self.num_trades} trades in state")
+        return self
+
+    def save(self, path) -> Path:
+        """
+        Persists the aggregate as a NumPy .npz archive.
+
+        Args:
+            path: Destination file
+
+        Returns:
+            Path: Path of the saved state
+        """
+        if self.pnl is None:
+            raise ValueError("No trades aggregated.")
+
+        pnl_strategies = self.pnl.index.get_level_values(1)
+        size_strategies = self.size_counts.index.get_level_values(0)
+        labels = pnl_strategies.append(size_strategies).unique()
+
+        info = {
+            "labels": labels.tolist(),
+            "num_trades": int(self.num_trades),
+            "first_time": self.first_time.isoformat(),
+            "last_time": self.last_time.isoformat(),
+            "time_format": self.time_format,
+        }
+
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, "wb") as f:
+            np.savez(
+                f,
+                pnl_days=np.asarray(self.pnl.index.get_level_values(0), dtype="datetime64[ns]"),
+                pnl_codes=labels.get_indexer(pnl_strategies),
+                pnl_values=self.pnl.to_numpy(dtype=float),
+                size_codes=labels.get_indexer(size_strategies),
+                size_values=self.size_counts.index.get_level_values(1).to_numpy(dtype=float),
+                size_counts=self.size_counts.to_numpy().round().astype(np.int64),
+                info=np.array(json.dumps(info))
+            )
+        os.replace(tmp_path, path)
+
+        logger.info(f"✅ State saved: {path}")
+        return path
+
+    @classmethod
+    def load(cls, path) -> "DailyAggregate":
+        """
+        Loads an aggregate saved with save().
+
+        Args:
+            path: State file
+
+        Returns:
+            DailyAggregate: The restored aggregate
+        """
+        with np.load(path, allow_pickle=False) as data:
+            info = json.loads(str(data["info"]))
+            labels = pd.Index(info["labels"])
+
+            aggregate = cls()
+            aggregate.pnl = pd.Series(
+                data["pnl_values"],
+                index=pd.MultiIndex.from_arrays(
+                    [pd.DatetimeIndex(data["pnl_days"]), labels.take(data["pnl_codes"])],
+                    names=["Date", STRATEGY_COL]
+                ),
+                name=PNL_COL
+            )
+            aggregate.size_counts = pd.Series(
+                data["size_counts"],
+                index=pd.MultiIndex.from_arrays(
+                    [labels.take(data["size_codes"]), data["size_values"]],
+                    names=[STRATEGY_COL, SIZE_COL]
+                )
+            )
+
+        aggregate.num_trades = info["num_trades"]
+        aggregate.first_time = pd.Timestamp(info["first_time"])
+        aggregate.last_time = pd.Timestamp(info["last_time"])
+        aggregate.time_format = info["time_format"]
+        return aggregate
+
+    def original_lots(self, strategies) -> pd.Series:
+        """
+        Computes the median Size per strategy from the Size counts.
+
+        Args:
+            strategies: Strategy labels to report, in order
+
+        Returns:
+            pd.Series: Median lot per strategy (NaN when no Size was seen)
+        """
+        medians = {}
+        if self.size_counts is not None:
+            counts = self.size_counts.sort_index()
+            for strategy, group in counts.groupby(level=0, sort=False):
+                values = group.index.get_level_values(1).to_numpy(dtype=float)
+                cum = np.cumsum(group.to_numpy())
+                total = cum[-1]
+                # Same convention as Series.median(): average the two middle ranks
+                lo = np.searchsorted(cum, (total - 1) // 2 + 1)
+                hi = np.searchsorted(cum, total // 2 + 1)
+                medians[strategy] = (values[lo] + values[hi]) / 2
+
+        lots = pd.Series(medians, dtype=float, name=SIZE_COL).reindex(strategies)
+        lots.index.name = STRATEGY_COL
+        return lots
+
+    def to_outputs(self, sparse: bool = False) -> Tuple[pd.DataFrame, pd.Series, Dict]:
+        """
+        Materializes the aggregate in the same shape as prepare_data().
+
+        Args:
+            sparse: Return the daily PnL as a SparseDailyPnL, built from the
+                non-zero cells without a dense pivot
+
+        Returns:
+            Tuple: (daily_pnl_matrix, original_lots, metadata)
+        """
+        if self.pnl is None:
+            raise ValueError("No trades aggregated.")
+
+        if sparse:
+            daily_pnl = SparseDailyPnL.from_long(self.pnl)
+        else:
+            daily_pnl = self.pnl.unstack(fill_value=0.0).sort_index()
+            daily_pnl.index = pd.Index(daily_pnl.index.date, name="Date")
+            daily_pnl.columns.name = STRATEGY_COL
+            daily_pnl = daily_pnl.astype(float)
+
+        original_lots = self.original_lots(daily_pnl.columns)
+
+        metadata = {
+            "num_trades": self.num_trades,
+            "num_strategies": len(daily_pnl.columns),
+            "date_range": (self.first_time, self.last_time),
+            "strategies": list(daily_pnl.columns),
+            "original_df": None  # Trade-level frame is not kept in streaming mode
+        }
+
+        return daily_pnl, original_lots, metadata
+
+
+def period_codes(open_time: pd.Series) -> Tuple[pd.Series, pd.Series]:
+    """
+    Computes int32 month and week codes instead of Period objects.
+
+    Month codes equal the monthly Period ordinal (months since 1970-01);
+    week codes count Monday-based weeks since the epoch.
+
+    Args:
+        open_time: datetime64 series
+
+    Returns:
+        Tuple: (month_codes, week_codes)
+    """
+    days = open_time.to_numpy(dtype="datetime64[D]").astype(np.int64)
+    # 1970-01-01 was a Thursday: shift by 3 days so weeks start on Monday
+    week = ((days + 3) // 7).astype(np.int32)
+    month = ((open_time.dt.year - 1970) * 12 + open_time.dt.month - 1).astype(np.int32)
+    return month, pd.Series(week, index=open_time.index)
+
+
+def _aggregate_file(filepath: str, chunksize: int) -> Tuple[str, Optional[DailyAggregate], Optional[str]]:
+    """
+    Worker for multi-file ingestion: aggregates one file, capturing its error.
+
+    Returns:
+        Tuple: (filepath, aggregate or None, error message or None)
+    """
+    try:
+        aggregate = DailyAggregate()
+        for chunk in read_trade_chunks(filepath, chunksize):
+            aggregate.update(chunk)
+        return filepath, aggregate, None
+    except Exception as e:
+        return filepath, None, str(e)
+
 
 class DataProcessor:
     """Processes and validates trade data for portfolio analysis."""
 
-    def __init__(self, filepath: str):
+    def __init__(self, filepath: str, cache: Optional[PreparedDataCache] = None,
+                 compact: bool = False, float32_pnl: bool = False):
         """
         Initializes the processor with a CSV file.
 
         Args:
-            filepath (str): Path to the CSV file
+            filepath (str): Path to the CSV file. The streaming methods also
+                accept a directory or a glob pattern of CSV files.
+            cache (PreparedDataCache): Optional cache of prepared results
+            compact (bool): Load trades with the compact schema (categorical
+                strategies, int32 Month/Week codes, datetime64 Date)
+            float32_pnl (bool): In compact mode, store P/L as float32
         """
         self.filepath = Path(filepath)
+        self.cache = cache
+        self.compact = compact
+        self.float32_pnl = float32_pnl
         self.df = None
         self.daily_pnl = None
+        self.failed_files = {}
+        self.delimiter = ","
+        self.header = None
+        self.validation_error = None
+        self._cache_key = None
+        self._cached = None
+
+    def resolve_sources(self) -> List[Path]:
+        """
+        Lists the CSV files behind filepath (a file, a directory or a glob).
+
+        Returns:
+            List[Path]: Sorted source files
+        """
+        if self.filepath.is_dir():
+            return sorted(p for p in self.filepath.iterdir()
+                          if p.is_file() and p.suffix.lower() in ALLOWED_EXTENSIONS)
+        if glob.has_magic(str(self.filepath)):
+            return sorted(Path(p) for p in glob.glob(str(self.filepath)) if Path(p).is_file())
+        return [self.filepath] if self.filepath.exists() else []
+
+    def _cache_options(self) -> Dict:
+        """Parse options that affect the prepared result (part of the cache key)."""
+        return {
+            "columns": REQUIRED_COLUMNS,
+            "dayfirst": True,
+        }
+
+    def preflight(self, max_size_mb: Optional[float] = MAX_FILE_SIZE_MB) -> bool:
+        """
+        Checks extension, size, delimiter and header without parsing the body.
+
+        Args:
+            max_size_mb: Maximum file size (None = no limit)
+
+        Returns:
+            bool: True if the file can be loaded, False otherwise
+                (the reason is kept in self.validation_error)
+        """
+        try:
+            self.delimiter, self.header = sniff_csv(self.filepath, max_size_mb)
+            self.validation_error = None
+            return True
+        except Exception as e:
+            self.validation_error = str(e)
+            logger.error(f"Pre-flight check failed: {e}")
+            return False
 
     def load_and_validate(self) -> bool:
         """
         Loads and validates the CSV file.
 
+        Runs preflight() first, then reads only REQUIRED_COLUMNS with
+        explicit dtypes. If a cache is configured, a hit restores the
+        trades and the prepare_data() outputs without reading the CSV.
+
         Returns:
             bool: True if successfully validated, False otherwise
         """
-        try:
-            # Check file existence
-            if not self.filepath.exists():
-                logger.error(f"File not found: {self.filepath}")
-                return False
-
-            # Load file
-            self.df = pd.read_csv(self.filepath)
-            logger.info(f"File loaded: {self.filepath}")
+        if not self.preflight():
+            return False
 
-            # Validate required columns
-            required_columns = ["Open time", "Strategy name (Global)", "Profit/Loss (Global)", "Size"]
-            missing_cols = [col for col in required_columns if col not in self.df.columns]
+        self._cached = None
+        if self.cache is not None:
+            self._cache_key = self.cache.make_key(self.filepath, {
+                **self._cache_options(), "trades": True, "compact": self.compact, "float32_pnl": self.float32_pnl
+            })
+            cached = self.cache.get(self._cache_key)
+            if cached is not None and cached[2]["original_df"] is not None:
+                self.df = cached[2]["original_df"]
+                self._cached = cached
+                logger.info(f"✅ Validation OK. {len(self.df)} trades loaded from cache.")
+                return True
 
-            if missing_cols:
-                logger.error(f"Missing columns: {missing_cols}")
-                return False
+        try:
+            # Load file (padded header names are renamed to REQUIRED_COLUMNS)
+            columns = required_columns(self.header)
+            dtypes = read_dtypes(self.compact, self.float32_pnl)
+            self.df = pd.read_csv(
+                self.filepath,
+                sep=self.delimiter,
+                usecols=list(columns),
+                dtype={raw: dtypes[name] for raw, name in columns.items()}
+            ).rename(columns=columns)
+            logger.info(f"File loaded: {self.filepath}")
 
             # Validate data types
             if self.df.empty:
+                self.validation_error = "Empty DataFrame"
                 logger.error("Empty DataFrame")
                 return False
 
@@ -59,6 +556,7 @@ class DataProcessor:
             return True
 
         except Exception as e:
+            self.validation_error = f"Error loading file: {e}"
             logger.error(f"Error loading file: {e}")
             return False
 
@@ -72,25 +570,47 @@ class DataProcessor:
         if self.df is None:
             raise ValueError("Data not loaded. Execute load_and_validate() first.")
 
-        df = self.df.copy()
+        # Date conversion (parsed once, in place, so get_original_df() and
+        # MetricsCalculator reuse the datetime column)
+        self.df["Open time"] = parse_open_time(self.df["Open time"])
 
-        # Date conversion
-        df["Open time"] = pd.to_datetime(df["Open time"], dayfirst=True)
-        df["Date"] = df["Open time"].dt.date
+        # Shallow copy: the derived columns below are added to df only and
+        # the trade data buffers stay shared with self.df
+        df = self.df.copy(deep=False)
         df["Year"] = df["Open time"].dt.year
-        df["Month"] = df["Open time"].dt.to_period("M")
-        df["Week"] = df["Open time"].dt.to_period("W")
+        if self.compact:
+            df["Date"] = df["Open time"].dt.normalize()
+            df["Month"], df["Week"] = period_codes(df["Open time"])
+        else:
+            df["Date"] = df["Open time"].dt.date
+            df["Month"] = df["Open time"].dt.to_period("M")
+            df["Week"] = df["Open time"].dt.to_period("W")
+
+        if self._cached is not None:
+            daily_pnl, original_lots, metadata = self._cached
+            metadata = {**metadata, "original_df": df}
+            self.daily_pnl = daily_pnl
+            logger.info(f"✅ Data prepared from cache: {metadata['num_strategies']} strategies, {metadata['num_trades']} trades")
+            return daily_pnl, original_lots, metadata
 
         # Daily pivot (Date × Strategy → PnL)
         daily_pnl = df.pivot_table(
             index="Date",
             columns="Strategy name (Global)",
             values="Profit/Loss (Global)",
-            aggfunc="sum"
+            aggfunc="sum",
+            observed=True
         ).fillna(0)
 
         # Original lots (median per strategy)
-        original_lots = df.groupby("Strategy name (Global)")["Size"].median()
+        original_lots = df.groupby("Strategy name (Global)", observed=True)["Size"].median()
+
+        if self.compact:
+            # Same labels and dtypes as the default schema
+            daily_pnl.index = pd.Index(daily_pnl.index.date, name="Date")
+            daily_pnl.columns = pd.Index(daily_pnl.columns.tolist(), name=STRATEGY_COL)
+            daily_pnl = daily_pnl.astype(float)
+            original_lots.index = pd.Index(original_lots.index.tolist(), name=STRATEGY_COL)
 
         # Metadata
         metadata = {
@@ -98,22 +618,125 @@ class DataProcessor:
             "num_strategies": len(daily_pnl.columns),
             "date_range": (df["Open time"].min(), df["Open time"].max()),
             "strategies": list(daily_pnl.columns),
-            "original_df": df  # Keep for metrics later
+            "original_df": df,  # Keep for metrics later
+            "failed_files": {}
         }
 
+        if self.cache is not None and self._cache_key is not None:
+            self.cache.put(self._cache_key, daily_pnl, original_lots, metadata, trades=self.df)
+
         self.daily_pnl = daily_pnl
         logger.info(f"✅ Data prepared: {metadata['num_strategies']} strategies, {metadata['num_trades']} trades")
 
         return daily_pnl, original_lots, metadata
 
+    def build_state(self, chunksize: int = 200_000, max_workers: Optional[int] = None) -> DailyAggregate:
+        """
+        Reads the CSV in chunks into a DailyAggregate.
+
+        The aggregate can be saved, extended later with append() and turned
+        into the prepare_data() outputs with to_outputs().
+
+        When filepath is a directory or a glob, each file is aggregated in a
+        process pool and the partial aggregates are merged here. A file that
+        fails validation is recorded in self.failed_files and skipped.
+
+        Args:
+            chunksize: Number of CSV rows per chunk
+            max_workers: Process pool size for multiple files (1 = in-process)
+
+        Returns:
+            DailyAggregate: Aggregate of all trades in the file(s)
+        """
+        sources = self.resolve_sources()
+        if not sources:
+            raise FileNotFoundError(f"File not found: {self.filepath}")
+
+        self.failed_files = {}
+        if sources == [self.filepath]:
+            aggregate = DailyAggregate()
+            for chunk in read_trade_chunks(self.filepath, chunksize):
+                aggregate.update(chunk)
+        else:
+            paths = [str(p) for p in sources]
+            if max_workers == 1:
+                results = map(_aggregate_file, paths, repeat(chunksize))
+            else:
+                with ProcessPoolExecutor(max_workers=max_workers) as pool:
+                    results = list(pool.map(_aggregate_file, paths, repeat(chunksize)))
+
+            aggregate = DailyAggregate()
+            for path, partial, error in results:
+                if error is not None:
+                    self.failed_files[path] = error
+                    logger.error(f"Skipping {path}: {error}")
+                else:
+                    aggregate.merge(partial)
+
+            logger.info(f"✅ {len(paths) - len(self.failed_files)}/{len(paths)} files aggregated")
+
+        if aggregate.num_trades == 0:
+            raise ValueError("Empty DataFrame")
+
+        return aggregate
+
+    def prepare_data_streaming(self, chunksize: int = 200_000, max_workers: Optional[int] = None,
+                               sparse: bool = False) -> Tuple[pd.DataFrame, pd.Series, Dict]:
+        """
+        Prepares data by reading the CSV in chunks, without loading the trade log.
+
+        Each chunk is folded into a DailyAggregate, so peak memory depends on
+        days × strategies instead of the number of trades. The trade-level
+        DataFrame is not kept: metadata["original_df"] is None.
+        If a cache is configured, a hit skips reading the CSV entirely
+        (dense results only).
+
+        Args:
+            chunksize: Number of CSV rows per chunk
+            max_workers: Process pool size when filepath names several files
+            sparse: Return the daily PnL as a SparseDailyPnL
+
+        Returns:
+            Tuple: (daily_pnl_matrix, original_lots, metadata)
+        """
+        sources = self.resolve_sources()
+        if not sources:
+            raise FileNotFoundError(f"File not found: {self.filepath}")
+
+        cache_key = None
+        if self.cache is not None and not sparse:
+            cache_key = self.cache.make_key(sources, self._cache_options())
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                self.daily_pnl = cached[0]
+                return cached
+
+        daily_pnl, original_lots, metadata = self.build_state(chunksize, max_workers).to_outputs(sparse)
+        metadata["failed_files"] = dict(self.failed_files)
+
+        if cache_key is not None:
+            self.cache.put(cache_key, daily_pnl, original_lots, metadata)
+
+        self.daily_pnl = daily_pnl
+        logger.info(f"✅ Data prepared (streaming): {metadata['num_strategies']} strategies, {metadata['num_trades']} trades")
+
+        return daily_pnl, original_lots, metadata
+
     def get_daily_pnl(self) -> pd.DataFrame:
         """Returns the daily PnL matrix."""
         if self.daily_pnl is None:
             raise ValueError("Data not prepared. Execute prepare_data() first.")
         return self.daily_pnl
 
-    def get_original_df(self) -> pd.DataFrame:
-        """Returns the complete original DataFrame."""
+    def get_original_df(self, copy: bool = True) -> pd.DataFrame:
+        """
+        Returns the complete original DataFrame.
+
+        Args:
+            copy (bool): Deep copy (default). With copy=False a shallow copy
+                is returned: no data is duplicated, and with pandas
+                copy-on-write enabled writes to it never reach self.df.
+        """
         if self.df is None:
             raise ValueError("Data not loaded.")
-        return self.df.copy()
+        return self.df.copy(deep=copy)
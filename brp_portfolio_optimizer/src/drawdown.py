@@ -0,0 +1,60 @@
+"""
+Drawdown: Blocked NumPy kernel for the per-strategy maximum drawdown.
+"""
+
+import numpy as np
+
+# Rows per block: bounds the temporary cumulative sums to block × N
+_BLOCK_ROWS = 4096
+
+
+def max_drawdowns(values: np.ndarray, block_rows: int = _BLOCK_ROWS) -> np.ndarray:
+    """
+    Maximum drawdown (absolute, in money) of every column's cumulative sum.
+
+    Equivalent to -(cumsum - cummax(cumsum)).min() per column, in one
+    pass over the rows: the running total, running peak and worst
+    drawdown are carried across blocks, so no full-size cumulative,
+    peak or drawdown matrices are built. Works on memory-mapped arrays.
+
+    Args:
+        values: Daily PnL matrix (T × N)
+        block_rows: Rows per block
+
+    Returns:
+        np.ndarray: Maximum drawdown per column (N), ≥ 0
+    """
+    values = np.asarray(values)
+    num_assets = values.shape[1]
+    total = np.zeros(num_assets)
+    peak = np.full(num_assets, -np.inf)
+    worst = np.zeros(num_assets)
+
+    for lo in range(0, len(values), block_rows):
+        cum = np.cumsum(values[lo:lo + block_rows], axis=0, dtype=float)
+        cum += total
+        total = cum[-1].copy()
+
+        running_peak = np.maximum.accumulate(cum, axis=0)
+        np.maximum(running_peak, peak, out=running_peak)
+        peak = running_peak[-1].copy()
+
+        running_peak -= cum  # drawdown depth, in place
+        np.maximum(worst, running_peak.max(axis=0), out=worst)
+
+    return worst
+
+
+def multipliers_from_drawdowns(weights: np.ndarray, max_dd: np.ndarray, capital_inicial,
+                               risk_tolerance_dd) -> np.ndarray:
+    """
+    Lot multipliers risk_budget / max_drawdown, vectorized.
+
+    capital_inicial and risk_tolerance_dd may be scalars or arrays of P
+    parameter pairs, giving a (P × N) matrix. Zero drawdowns count as 1
+    (no division by zero), as in calculate_multipliers.
+    """
+    max_dd = np.where(max_dd == 0, 1.0, max_dd)
+    budget = np.multiply.outer(np.asarray(capital_inicial, dtype=float) * np.asarray(risk_tolerance_dd, dtype=float),
+                               np.asarray(weights, dtype=float))
+    return budget / max_dd
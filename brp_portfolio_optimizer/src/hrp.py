@@ -0,0 +1,78 @@
+"""
+HRP: Hierarchical Risk Parity allocation (López de Prado), inversion-free.
+"""
+
+import numpy as np
+from scipy.cluster.hierarchy import linkage, leaves_list
+from scipy.spatial.distance import squareform
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def correlation_distance(cov_matrix: np.ndarray) -> np.ndarray:
+    """
+    Correlation distance d = sqrt((1 - ρ) / 2) as a condensed vector.
+
+    Zero-variance strategies get a tiny variance floor instead of NaN
+    correlations, so near-singular inputs still cluster.
+    """
+    std = np.sqrt(np.maximum(np.diag(cov_matrix), 1e-300))
+    corr = np.clip(cov_matrix / np.outer(std, std), -1.0, 1.0)
+    dist = np.sqrt(np.maximum(0.5 * (1.0 - corr), 0.0))
+    np.fill_diagonal(dist, 0.0)
+    return squareform(dist, checks=False)
+
+
+def hrp_weights(cov_matrix: np.ndarray, method: str = "single") -> np.ndarray:
+    """
+    Long-only Hierarchical Risk Parity weights.
+
+    1. Clusters the strategies on correlation distance.
+    2. Quasi-diagonalizes: reorders them by the dendrogram leaves, so
+       similar strategies are adjacent.
+    3. Recursive bisection: splits each contiguous range in two halves
+       and divides its weight in inverse proportion to the halves'
+       inverse-variance portfolio variances.
+
+    Only variances and block quadratic forms are used (no inversion), so
+    singular or near-singular covariances are fine.
+
+    Args:
+        cov_matrix: Covariance matrix (N × N)
+        method: scipy linkage method ("single" as in the original HRP)
+
+    Returns:
+        np.ndarray: Weights in the original strategy order, summing to 1
+    """
+    cov_matrix = np.asarray(cov_matrix, dtype=float)
+    num_assets = len(cov_matrix)
+    if num_assets == 1:
+        return np.ones(1)
+
+    order = leaves_list(linkage(correlation_distance(cov_matrix), method=method))
+    ordered = cov_matrix[np.ix_(order, order)]
+    inv_var = 1.0 / np.maximum(np.diag(ordered), 1e-300)
+
+    def cluster_variance(lo: int, hi: int) -> float:
+        w = inv_var[lo:hi] / inv_var[lo:hi].sum()
+        return float(w @ ordered[lo:hi, lo:hi] @ w)
+
+    weights = np.ones(num_assets)
+    ranges = [(0, num_assets)]
+    while ranges:
+        next_ranges = []
+        for lo, hi in ranges:
+            if hi - lo < 2:
+                continue
+            mid = (lo + hi) // 2
+            left, right = cluster_variance(lo, mid), cluster_variance(mid, hi)
+            alpha = 1.0 - left / (left + right) if left + right > 0 else 0.5
+            weights[lo:mid] *= alpha
+            weights[mid:hi] *= 1.0 - alpha
+            next_ranges += [(lo, mid), (mid, hi)]
+        ranges = next_ranges
+
+    result = np.empty(num_assets)
+    result[order] = weights
+    return result
@@ -0,0 +1,180 @@
+"""
+LotAllocation: Discrete MT5 lot sizes tracking the optimized risk budget.
+"""
+
+import sys
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import Dict, Optional, Sequence, Union
+import logging
+
+try:
+    from ..config.settings import DEFAULT_MIN_LOT, DEFAULT_LOT_STEP, DEFAULT_MAX_LOT
+except ImportError:  # src/ imported as top-level modules (app.py, tests)
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+    from config.settings import DEFAULT_MIN_LOT, DEFAULT_LOT_STEP, DEFAULT_MAX_LOT
+
+logger = logging.getLogger(__name__)
+
+ArrayLike = Union[float, Sequence[float], np.ndarray]
+
+
+def _moves(units, unit_risk, target, min_units, max_units):
+    """
+    Error change, unit change and feasibility of one step up / down per strategy.
+
+    A step up from 0 jumps to the minimum lot; a step down from the
+    minimum lot drops to 0.
+    """
+    error = (units * unit_risk - target) ** 2
+
+    up = np.where(units == 0, min_units, 1)
+    up_ok = units + up <= max_units
+    d_up = ((units + up) * unit_risk - target) ** 2 - error
+
+    down = np.where(units == min_units, units, 1)
+    down_ok = units > 0
+    d_down = ((units - down) * unit_risk - target) ** 2 - error
+    return up, up_ok, d_up, down, down_ok, d_down
+
+
+def allocate_lots(original_lots: ArrayLike, max_drawdowns: ArrayLike, weights: ArrayLike,
+                  capital_inicial: float, risk_tolerance_dd: float = 0.25,
+                  min_lot: ArrayLike = DEFAULT_MIN_LOT, lot_step: ArrayLike = DEFAULT_LOT_STEP,
+                  max_lot: ArrayLike = DEFAULT_MAX_LOT, groups: Optional[Sequence] = None,
+                  group_max_lots: Optional[Dict] = None, max_rounds: int = 1000) -> Dict:
+    """
+    Integer lot-step counts per strategy closest to the optimized risk budget.
+
+    Each strategy's risk at lot L is L / original_lot × max_drawdown (the
+    drawdown scaled from the traded size), and its target is its share
+    capital_inicial × risk_tolerance_dd × weight of the risk budget, i.e.
+    the risk of the continuous calculate_multipliers() lot. Lots are
+    either 0 or in [min_lot, max_lot] on the lot_step grid. The squared
+    tracking error Σ (risk - target)² is minimized subject to:
+
+    - total risk ≤ capital_inicial × risk_tolerance_dd;
+    - total lots of each group (e.g. symbol) ≤ group_max_lots[group].
+
+    Starts from the continuous targets rounded down (feasible by
+    construction, groups over their cap scaled down), then:
+
+    1. Greedy: applies the best improving single step up or down while
+       one exists.
+    2. Local search: also tries every pair (one strategy a step down,
+       another a step up), which moves budget between strategies once
+       single steps are blocked by the constraints; stops when no move
+       improves or after max_rounds.
+
+    Args:
+        original_lots: Traded lot of each strategy (N)
+        max_drawdowns: Maximum drawdown of each strategy at its traded lot (N)
+        weights: Optimal weights (N)
+        capital_inicial: Total capital
+        risk_tolerance_dd: DD tolerance (e.g., 0.25 = 25%)
+        min_lot, lot_step, max_lot: Broker volume limits, scalars or per strategy (N)
+        groups: Group label of each strategy (N), e.g. its symbol
+        group_max_lots: {group label: maximum total lots}; groups not listed are uncapped
+        max_rounds: Local search rounds limit
+
+    Returns:
+        Dict: lots (N), multipliers (lots / original_lots), risk (N),
+            target_risk (N), tracking_error (√Σ (risk - target)²), moves
+    """
+    original_lots = np.asarray(original_lots, dtype=float)
+    num_assets = len(original_lots)
+    weights = np.asarray(weights, dtype=float)
+    max_dd = np.asarray(max_drawdowns, dtype=float)
+    max_dd = np.where(max_dd == 0, 1.0, max_dd)  # as in multipliers_from_drawdowns
+    step = np.broadcast_to(np.asarray(lot_step, dtype=float), (num_assets,))
+    min_lot = np.broadcast_to(np.asarray(min_lot, dtype=float), (num_assets,))
+    max_lot = np.broadcast_to(np.asarray(max_lot, dtype=float), (num_assets,))
+
+    if np.any(step <= 0):
+        raise ValueError("lot_step must be positive")
+    if np.any(min_lot > max_lot):
+        raise ValueError("min_lot must not exceed max_lot")
+    tradable = weights > 0
+    if np.any(tradable & ~(original_lots > 0)):
+        raise ValueError("Strategies with a positive weight need a positive original lot")
+
+    budget = capital_inicial * risk_tolerance_dd
+    target = budget * weights
+    unit_risk = np.where(tradable, step * max_dd / np.where(original_lots > 0, original_lots, 1.0), 0.0)
+    min_units = np.maximum(np.ceil(min_lot / step - 1e-9), 1).astype(np.int64)
+    max_units = np.where(tradable, np.floor(max_lot / step + 1e-9), 0).astype(np.int64)
+
+    # Group caps, in lots (one uncapped group when none are given)
+    if groups is None:
+        codes = np.zeros(num_assets, dtype=np.int64)
+        caps = np.array([np.inf])
+    else:
+        codes, labels = pd.factorize(pd.Series(groups, dtype=object))
+        caps = np.array([float((group_max_lots or {}).get(label, np.inf)) for label in labels])
+
+    # Start: targets rounded down on the lot grid, then scaled into the group caps
+    with np.errstate(divide="ignore", invalid="ignore"):
+        units = np.where(tradable, np.floor(target / unit_risk + 1e-9), 0)
+    units = np.minimum(units, max_units).astype(np.int64)
+    group_lots = np.bincount(codes, weights=units * step, minlength=len(caps))
+    for g in np.flatnonzero(group_lots > caps):
+        members = codes == g
+        units[members] = np.floor(units[members] * caps[g] / group_lots[g] + 1e-9)
+    units[units < min_units] = 0
+
+    risk_used = float(units @ unit_risk)
+    group_lots = np.bincount(codes, weights=units * step, minlength=len(caps))
+    eps = 1e-9 * max(budget, 1.0)
+    moves = 0
+
+    for phase in ("greedy", "swap"):
+        for _ in range(max_rounds):
+            up, up_ok, d_up, down, down_ok, d_down = _moves(units, unit_risk, target, min_units, max_units)
+            up_ok &= risk_used + up * unit_risk <= budget + eps
+            up_ok &= group_lots[codes] + up * step <= caps[codes] + 1e-9
+
+            best_up = np.where(up_ok, d_up, np.inf)
+            best_down = np.where(down_ok, d_down, np.inf)
+            i_up, i_down = int(np.argmin(best_up)), int(np.argmin(best_down))
+            candidates = [(best_up[i_up], None, i_up), (best_down[i_down], i_down, None)]
+
+            if phase == "swap":
+                # i one step down, j one step up
+                freed = down * unit_risk
+                pair_ok = down_ok[:, None] & (units + up <= max_units)[None, :]
+                pair_ok &= risk_used - freed[:, None] + (up * unit_risk)[None, :] <= budget + eps
+                same_group = codes[:, None] == codes[None, :]
+                lots_after = (group_lots[codes] + up * step)[None, :] - same_group * (down * step)[:, None]
+                pair_ok &= lots_after <= caps[codes][None, :] + 1e-9
+                np.fill_diagonal(pair_ok, False)
+                pair = np.where(pair_ok, d_down[:, None] + d_up[None, :], np.inf)
+                flat = int(np.argmin(pair))
+                i, j = divmod(flat, num_assets)
+                candidates.append((pair[i, j], i, j))
+
+            delta, i, j = min(candidates, key=lambda c: c[0])
+            if not delta < -1e-12 * max(budget, 1.0) ** 2:
+                break
+            # Both step sizes come from the same state, before either is applied
+            down_units = down[i] if i is not None else 0
+            up_units = up[j] if j is not None else 0
+            if i is not None:
+                units[i] -= down_units
+                risk_used -= down_units * unit_risk[i]
+                group_lots[codes[i]] -= down_units * step[i]
+            if j is not None:
+                units[j] += up_units
+                risk_used += up_units * unit_risk[j]
+                group_lots[codes[j]] += up_units * step[j]
+            moves += 1
+
+    lots = np.round(units * step, 8)
+    risk = units * unit_risk
+    multipliers = np.divide(lots, original_lots, out=np.zeros(num_assets), where=original_lots > 0)
+    tracking_error = float(np.sqrt(np.sum((risk - target) ** 2)))
+
+    logger.info(f"✅ Lots allocated for {int(np.count_nonzero(units))} strategies "
+                f"(tracking error: {tracking_error:.2f}, {moves} moves)")
+    return {"lots": lots, "multipliers": multipliers, "risk": risk, "target_risk": target,
+            "tracking_error": tracking_error, "moves": moves}
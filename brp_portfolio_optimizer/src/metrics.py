@@ -7,34 +7,119 @@ import numpy as np
 from typing import Dict, Tuple
 import logging
 
+try:
+    from .timestamps import parse_open_time
+except ImportError:  # src/ imported as top-level modules (app.py, tests)
+    from timestamps import parse_open_time
+
 logger = logging.getLogger(__name__)
 
 
+def _as_float64(values: pd.Series) -> pd.Series:
+    """Returns the series as float64, without copying when it already is."""
+    return values if values.dtype == np.float64 else values.astype(np.float64)
+
+
 class MetricsCalculator:
     """Calculates performance and risk metrics for portfolios."""
 
-    def __init__(self, trades_df: pd.DataFrame, capital_inicial: float):
+    def __init__(self, trades_df: pd.DataFrame, capital_inicial: float, multipliers: Dict = None):
         """
         Initializes the metrics calculator.
 
+        The trade frame is not copied: columns added here ('Open time'
+        parsing, 'Date') go to a shallow copy, so the caller's frame and its
+        data buffers are shared, never modified.
+
         Args:
             trades_df: DataFrame with trades (must have 'Profit/Loss (Global)' column and preferably 'Date')
             capital_inicial: Initial capital for return calculations
+            multipliers: Optional {strategy: lot multiplier}. The metrics are then
+                computed on P/L × multiplier, derived lazily from trades_df
+                instead of a materialized optimized frame.
         """
-        self.trades_df = trades_df.copy()
+        self.trades_df = trades_df.copy(deep=False)
         self.capital_inicial = capital_inicial
+        self.multipliers = multipliers
         self.daily_pnl = None
         self.equity_curve = None
+        self._pnl = None
         
         # Ensure 'Date' column exists for grouping
         if 'Date' not in self.trades_df.columns:
             if 'Open time' in self.trades_df.columns:
-                self.trades_df['Open time'] = pd.to_datetime(self.trades_df['Open time'], dayfirst=True)
-                self.trades_df['Date'] = self.trades_df['Open time'].dt.date
+                self.trades_df['Open time'] = parse_open_time(self.trades_df['Open time'])
+                self.trades_df['Date'] = self.trades_df['Open time'].dt.normalize()
             else:
                 logger.warning("Columns 'Date' and 'Open time' not found. Creating index as date.")
                 self.trades_df['Date'] = pd.date_range(start='2025-01-01', periods=len(self.trades_df), freq='D').date
 
+    @classmethod
+    def from_daily_pnl(cls, daily_pnl, capital_inicial: float, multipliers=None) -> "MetricsCalculator":
+        """
+        Builds a calculator from a daily PnL matrix instead of a trade log.
+
+        Accepts a DataFrame or a read-only PnLView (e.g. attached from a
+        SharedPnLStore in a worker process); the matrix is reduced to one
+        portfolio PnL per day without copying it. Trade-level metrics
+        (counts, win rate, averages) are then computed per day.
+
+        Args:
+            daily_pnl: Daily PnL matrix (Date × Strategy)
+            capital_inicial: Initial capital for return calculations
+            multipliers: Optional lot multiplier per strategy (dict or array)
+
+        Returns:
+            MetricsCalculator: Calculator over the daily portfolio PnL
+        """
+        values = daily_pnl.values if hasattr(daily_pnl, "values") else np.asarray(daily_pnl)
+
+        if multipliers is None:
+            portfolio_pnl = values.sum(axis=1)
+        else:
+            if isinstance(multipliers, dict):
+                multipliers = [multipliers[strategy] for strategy in daily_pnl.columns]
+            portfolio_pnl = values @ np.asarray(multipliers, dtype=float)
+
+        dates = pd.to_datetime(pd.Index(daily_pnl.index))
+        trades_df = pd.DataFrame({
+            "Open time": dates,
+            "Date": dates,
+            "Profit/Loss (Global)": portfolio_pnl,
+        })
+        return cls(trades_df, capital_inicial)
+
+    def get_trade_pnl(self) -> pd.Series:
+        """
+        Returns the trade P/L used by the metrics, in float64.
+
+        With multipliers, this is the original P/L × the strategy's
+        multiplier, computed once on first use (one column, not a frame).
+        """
+        if self._pnl is None:
+            pnl = _as_float64(self.trades_df["Profit/Loss (Global)"])
+            if self.multipliers is not None:
+                strategies = self.trades_df["Strategy name (Global)"]
+                pnl = pnl * strategies.map(self.multipliers).astype(float).to_numpy()
+            self._pnl = pnl
+        return self._pnl
+
+    def get_trades(self) -> pd.DataFrame:
+        """
+        Returns the trade frame the metrics describe.
+
+        Without multipliers this is the input frame itself; with multipliers
+        the optimized frame ('Multiplier' column and scaled P/L) is
+        materialized on demand, e.g. for the Excel report.
+        """
+        if self.multipliers is None:
+            return self.trades_df
+
+        trades = self.trades_df.copy(deep=False)
+        trades["Multiplier"] = trades["Strategy name (Global)"].map(self.multipliers).astype(float)
+        trades["Profit/Loss (Global)"] = self.get_trade_pnl()
+        return trades
+
     def _prepare_curves(self):
         """Prepares PnL and Equity curves."""
         if self.daily_pnl is not None:
@@ -43,27 +128,21 @@ class MetricsCalculator:
         # Group PnL by day
         if 'Date' not in self.trades_df.columns:
             raise KeyError("Column 'Date' not found in DataFrame. Check input data.")
-        
-        # Create a copy of the dataframe for manipulation
-        df_temp = self.trades_df.copy()
-        
-        # Convert Date column to datetime safely
+
+        # Convert Date column to datetime safely (no copy of the trade frame)
+        dates = self.trades_df["Date"]
         try:
-            if df_temp["Date"].dtype == 'object':
+            if dates.dtype == 'object':
                 # Try to convert Period or date objects to datetime
-                df_temp["Date"] = pd.to_datetime(df_temp["Date"].astype(str))
+                dates = pd.to_datetime(dates.astype(str))
             else:
-                df_temp["Date"] = pd.to_datetime(df_temp["Date"])
+                dates = pd.to_datetime(dates)
         except Exception as e:
             logger.warning(f"Failed to convert Date, creating sequential index: {e}")
-            df_temp["Date"] = pd.date_range(start='2025-01-01', periods=len(df_temp), freq='D')
-        
-        # Group PnL by day
-        self.daily_pnl = df_temp.groupby(df_temp["Date"].dt.date)["Profit/Loss (Global)"].sum()
-        # Convert index to datetime for numeric operations
-        self.daily_pnl.index = pd.to_datetime(self.daily_pnl.index)
-        # Ensure values are numeric
-        self.daily_pnl = self.daily_pnl.astype(float)
+            dates = pd.Series(pd.date_range(start='2025-01-01', periods=len(dates), freq='D'), index=dates.index)
+
+        # Group PnL by day (in float64 even for compact float32 frames)
+        self.daily_pnl = self.get_trade_pnl().groupby(dates.dt.normalize().rename("Date")).sum()
         self.equity_curve = self.daily_pnl.cumsum() + float(self.capital_inicial)
 
     def calculate_all_metrics(self) -> Dict:
@@ -78,15 +157,18 @@ class MetricsCalculator:
         equity_series = pd.concat([pd.Series([self.capital_inicial]), self.equity_curve])
         daily_returns = equity_series.pct_change().dropna()
 
+        # Trade P/L in float64 (scaled by the multipliers, if any)
+        pnl = self.get_trade_pnl()
+
         # --- COUNTERS ---
         num_trades = len(self.trades_df)
-        num_winning_trades = len(self.trades_df[self.trades_df["Profit/Loss (Global)"] > 0])
-        num_losing_trades = len(self.trades_df[self.trades_df["Profit/Loss (Global)"] <= 0])
+        num_winning_trades = int((pnl > 0).sum())
+        num_losing_trades = int((pnl <= 0).sum())
 
         # --- PROFIT/LOSS ---
-        total_profit = self.trades_df["Profit/Loss (Global)"].sum()
-        gross_profit = self.trades_df[self.trades_df["Profit/Loss (Global)"] > 0]["Profit/Loss (Global)"].sum()
-        gross_loss = self.trades_df[self.trades_df["Profit/Loss (Global)"] <= 0]["Profit/Loss (Global)"].sum()
+        total_profit = pnl.sum()
+        gross_profit = pnl[pnl > 0].sum()
+        gross_loss = pnl[pnl <= 0].sum()
 
         # --- VOLATILITY AND SHARPE ---
         daily_vol = daily_returns.std()
@@ -134,18 +216,19 @@ class MetricsCalculator:
         total_return_pct = ((self.equity_curve.iloc[-1] / self.capital_inicial) - 1) * 100
 
         # --- TEMPORAL AVERAGES ---
+        # Month/Week may be Period objects or compact int32 codes
         if "Month" in self.trades_df.columns:
-            avg_monthly = self.trades_df.groupby("Month")["Profit/Loss (Global)"].sum().mean()
+            avg_monthly = pnl.groupby(self.trades_df["Month"]).sum().mean()
         else:
             avg_monthly = 0
 
         if "Week" in self.trades_df.columns:
-            avg_weekly = self.trades_df.groupby("Week")["Profit/Loss (Global)"].sum().mean()
+            avg_weekly = pnl.groupby(self.trades_df["Week"]).sum().mean()
         else:
             avg_weekly = 0
 
         if "Year" in self.trades_df.columns:
-            avg_annual = self.trades_df.groupby("Year")["Profit/Loss (Global)"].sum().mean()
+            avg_annual = pnl.groupby(self.trades_df["Year"]).sum().mean()
         else:
             avg_annual = 0
 
@@ -0,0 +1,98 @@
+"""
+MonteCarlo: Bootstrapped equity paths and their maximum-drawdown distribution.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from typing import Dict, Optional
+import logging
+
+try:
+    from .resampling import bootstrap_indices
+    from .drawdown import max_drawdowns
+except ImportError:  # src/ imported as top-level modules (app.py, tests)
+    from resampling import bootstrap_indices
+    from drawdown import max_drawdowns
+
+logger = logging.getLogger(__name__)
+
+# Live float64 arrays per simulated cell: the gathered paths plus the
+# cumulative-sum and running-peak arrays of the drawdown kernel
+_ARRAYS_PER_CELL = 3
+
+# Daily PnL matrix of the current process-pool worker (set once by _init_worker)
+_WORKER_VALUES = None
+
+
+def _simulate_chunk(values: np.ndarray, num_paths: int, block_size: Optional[int],
+                    seed: np.random.SeedSequence) -> np.ndarray:
+    """
+    Maximum drawdowns of one chunk of resampled paths (process-pool worker).
+
+    All columns share the same resampled days, so cross-strategy
+    dependence is kept. The (days × paths·columns) block goes through the
+    drawdown kernel in one call.
+    """
+    num_days, num_columns = values.shape
+    rows = bootstrap_indices(num_days, num_paths, block_size, np.random.default_rng(seed))
+    paths = values[rows.T].reshape(num_days, num_paths * num_columns)
+    return max_drawdowns(paths).reshape(num_paths, num_columns)
+
+
+def _init_worker(values):
+    """Process-pool initializer: keeps the PnL matrix for every chunk of the worker."""
+    global _WORKER_VALUES
+    _WORKER_VALUES = values
+
+
+def _simulate_in_worker(num_paths: int, block_size: Optional[int], seed: np.random.SeedSequence) -> np.ndarray:
+    return _simulate_chunk(_WORKER_VALUES, num_paths, block_size, seed)
+
+
+def simulate_drawdowns(values: np.ndarray, num_paths: int = 10000, block_size: Optional[int] = None,
+                       seed: Optional[int] = None, memory_mb: float = 256,
+                       max_workers: Optional[int] = None) -> np.ndarray:
+    """
+    Maximum-drawdown distribution of every column over bootstrapped paths.
+
+    Paths are generated in chunks whose working set (the days × paths ×
+    columns gather plus the kernel's cumulative and running-peak arrays of
+    the same size) stays under memory_mb. Each chunk has its own seed
+    spawned from `seed`, so the result does not depend on max_workers.
+    With a pool, the PnL matrix is sent to each worker once.
+
+    Args:
+        values: Daily PnL matrix (T × N); append a weighted-portfolio column
+            to simulate the portfolio jointly with the strategies
+        num_paths: Number of simulated paths (P)
+        block_size: Block length in days (None: i.i.d. bootstrap)
+        seed: Random seed
+        memory_mb: Peak memory bound of one chunk of paths (per worker)
+        max_workers: Process pool size for the chunks (None/1: in-process)
+
+    Returns:
+        np.ndarray: Maximum drawdowns (P × N), in money, ≥ 0
+    """
+    values = np.ascontiguousarray(values, dtype=float)
+    num_days, num_columns = values.shape
+    chunk_paths = max(int(memory_mb * 1024 * 1024 / (_ARRAYS_PER_CELL * 8 * num_days * num_columns)), 1)
+
+    sizes = [min(chunk_paths, num_paths - lo) for lo in range(0, num_paths, chunk_paths)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+
+    if max_workers is not None and max_workers > 1 and len(sizes) > 1:
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker, initargs=(values,)) as pool:
+            futures = [pool.submit(_simulate_in_worker, n, block_size, s) for n, s in zip(sizes, seeds)]
+            chunks = [f.result() for f in futures]
+    else:
+        chunks = [_simulate_chunk(values, n, block_size, s) for n, s in zip(sizes, seeds)]
+
+    return np.vstack(chunks)
+
+
+def drawdown_summary(drawdowns: np.ndarray, percentiles=(50, 95, 99)) -> Dict[str, np.ndarray]:
+    """Mean and percentiles of a (P × N) drawdown sample, per column."""
+    summary = {"mean": drawdowns.mean(axis=0)}
+    for q in percentiles:
+        summary[f"p{q:g}"] = np.percentile(drawdowns, q, axis=0)
+    return summary
@@ -0,0 +1,102 @@
+"""
+MultiStart: Objectives on the portfolio daily PnL and a multi-start local solver.
+"""
+
+import numpy as np
+from scipy.optimize import minimize
+from typing import Callable, Dict, Union
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Daily PnL matrix of the current process-pool worker (set once by _init_worker)
+_WORKER_VALUES = None
+
+
+def _max_drawdown(portfolio_pnl: np.ndarray) -> float:
+    cum = np.cumsum(portfolio_pnl)
+    return float(np.max(np.maximum.accumulate(cum) - cum))
+
+
+def sharpe_objective(portfolio_pnl: np.ndarray, periods_per_year: int = 252) -> float:
+    """Annualized Sharpe ratio of the portfolio daily PnL."""
+    std = portfolio_pnl.std()
+    return float(portfolio_pnl.mean() / std * np.sqrt(periods_per_year)) if std > 0 else 0.0
+
+
+def sortino_objective(portfolio_pnl: np.ndarray, periods_per_year: int = 252) -> float:
+    """Annualized Sortino ratio (downside deviation of the negative days)."""
+    downside = np.sqrt(np.mean(np.minimum(portfolio_pnl, 0.0) ** 2))
+    return float(portfolio_pnl.mean() / downside * np.sqrt(periods_per_year)) if downside > 0 else 0.0
+
+
+def calmar_objective(portfolio_pnl: np.ndarray, periods_per_year: int = 252) -> float:
+    """Annualized PnL over the maximum drawdown."""
+    max_dd = _max_drawdown(portfolio_pnl)
+    return float(portfolio_pnl.mean() * periods_per_year / max_dd) if max_dd > 0 else 0.0
+
+
+def return_dd_objective(portfolio_pnl: np.ndarray, periods_per_year: int = 252) -> float:
+    """Total PnL over the maximum drawdown."""
+    max_dd = _max_drawdown(portfolio_pnl)
+    return float(portfolio_pnl.sum() / max_dd) if max_dd > 0 else 0.0
+
+
+OBJECTIVES = {
+    "sharpe": sharpe_objective,
+    "sortino": sortino_objective,
+    "calmar": calmar_objective,
+    "return_dd": return_dd_objective,
+}
+
+
+def resolve_objective(objective: Union[str, Callable]) -> Callable:
+    """Returns the objective function from its name (see OBJECTIVES) or the callable itself."""
+    if callable(objective):
+        return objective
+    if objective not in OBJECTIVES:
+        raise ValueError(f"Unknown objective: {objective}. Use one of {tuple(OBJECTIVES)} or a callable.")
+    return OBJECTIVES[objective]
+
+
+def local_solve(values: np.ndarray, start: np.ndarray, objective: Union[str, Callable],
+                periods_per_year: int = 252) -> Dict:
+    """
+    Maximizes an objective of the portfolio daily PnL from one starting point.
+
+    SLSQP on the long-only simplex with finite-difference gradients (the
+    drawdown-based objectives are not smooth).
+
+    Args:
+        values: Daily PnL matrix (T × N)
+        start: Starting weights
+        objective: Name in OBJECTIVES or callable(portfolio_pnl, periods_per_year) -> float
+        periods_per_year: Rows per year
+
+    Returns:
+        Dict: weights, objective value, iterations
+    """
+    func = resolve_objective(objective)
+    num_assets = values.shape[1]
+
+    result = minimize(
+        lambda w: -func(values @ w, periods_per_year),
+        start,
+        method="SLSQP",
+        bounds=[(0, 1)] * num_assets,
+        constraints={"type": "eq", "fun": lambda x: np.sum(x) - 1, "jac": lambda x: np.ones_like(x)}
+    )
+
+    weights = np.clip(result.x, 0.0, None)
+    weights /= weights.sum()
+    return {"weights": weights, "objective": func(values @ weights, periods_per_year), "iterations": int(result.nit)}
+
+
+def _init_worker(values):
+    """Process-pool initializer: keeps the PnL matrix for every task of the worker."""
+    global _WORKER_VALUES
+    _WORKER_VALUES = np.asarray(values, dtype=float)
+
+
+def _solve_in_worker(start: np.ndarray, objective: Union[str, Callable], periods_per_year: int) -> Dict:
+    return local_solve(_WORKER_VALUES, start, objective, periods_per_year)
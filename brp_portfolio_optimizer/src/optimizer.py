@@ -2,31 +2,115 @@
 PortfolioOptimizer: Portfolio optimization module using Markowitz and Position Sizing.
 """
 
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import numpy as np
 import pandas as pd
 from scipy.optimize import minimize
-from typing import Tuple, Dict
+from typing import Tuple, Dict, Union, Optional, Callable
 import logging
 
+try:
+    from .sparse_pnl import SparseDailyPnL
+    from .qp_solver import max_sharpe_qp, regularized_cov, solve_qp_active_set, frontier_sweep
+    from .resampling import bootstrap_counts, batched_moments
+    from .covariance import CovarianceEstimator, SampleCovariance, make_estimator
+    from .hrp import hrp_weights
+    from .cvar import cvar_lp
+    from .drawdown import max_drawdowns, multipliers_from_drawdowns
+    from .multistart import local_solve, resolve_objective, _init_worker, _solve_in_worker
+    from .cardinality import cardinality_search
+    from .data_cache import OptimizationCache
+    from .monte_carlo import simulate_drawdowns
+    from .lot_allocation import allocate_lots
+except ImportError:  # src/ imported as top-level modules (app.py, tests)
+    from sparse_pnl import SparseDailyPnL
+    from qp_solver import max_sharpe_qp, regularized_cov, solve_qp_active_set, frontier_sweep
+    from resampling import bootstrap_counts, batched_moments
+    from covariance import CovarianceEstimator, SampleCovariance, make_estimator
+    from hrp import hrp_weights
+    from cvar import cvar_lp
+    from drawdown import max_drawdowns, multipliers_from_drawdowns
+    from multistart import local_solve, resolve_objective, _init_worker, _solve_in_worker
+    from cardinality import cardinality_search
+    from data_cache import OptimizationCache
+    from monte_carlo import simulate_drawdowns
+    from lot_allocation import allocate_lots
+
 logger = logging.getLogger(__name__)
 
+# Daily PnL matrix of the current resampling worker (set once by _init_resample_worker)
+_WORKER_VALUES = None
+
+
+def _solve_resample_batch(values: np.ndarray, counts: np.ndarray, rf: float, solver: Union[str, Callable],
+                          warm_start: Optional[np.ndarray], periods_per_year: int) -> Tuple[np.ndarray, list]:
+    """Max-Sharpe weights for a batch of bootstrap resamples (process-pool worker)."""
+    means, covs = batched_moments(values, counts)
+    weights = np.empty_like(means)
+    statuses = []
+    for i in range(len(means)):
+        weights[i], info = PortfolioOptimizer.solve_max_sharpe(means[i] * periods_per_year, covs[i] * periods_per_year,
+                                                               rf, solver, warm_start)
+        statuses.append(info["status"])
+    return weights, statuses
+
+
+def _init_resample_worker(values):
+    """Process-pool initializer: keeps the PnL matrix for every batch of the worker."""
+    global _WORKER_VALUES
+    _WORKER_VALUES = np.asarray(values, dtype=float)
+
+
+def _resample_batch_in_worker(counts: np.ndarray, rf: float, solver: Union[str, Callable],
+                              warm_start: Optional[np.ndarray], periods_per_year: int) -> Tuple[np.ndarray, list]:
+    return _solve_resample_batch(_WORKER_VALUES, counts, rf, solver, warm_start, periods_per_year)
+
 
 class PortfolioOptimizer:
     """Optimizes portfolio allocation using Markowitz Mean-Variance."""
 
-    def __init__(self, daily_pnl: pd.DataFrame, risk_free_rate: float = 0.0):
+    SOLVERS = ("qp", "slsqp")
+
+    def __init__(self, daily_pnl: Union[pd.DataFrame, SparseDailyPnL], risk_free_rate: float = 0.0,
+                 solver: Union[str, Callable] = "qp",
+                 cov_estimator: Union[str, CovarianceEstimator, None] = None,
+                 periods_per_year: int = 252, result_cache: Optional[OptimizationCache] = None):
         """
         Initializes the optimizer.
 
         Args:
-            daily_pnl (pd.DataFrame): Daily PnL matrix (Date × Strategy)
+            daily_pnl (pd.DataFrame): Daily PnL matrix (Date × Strategy), dense,
+                SparseDailyPnL or a memory-mapped PnLView
             risk_free_rate (float): Risk-free rate for Sharpe Ratio
+            solver: Max-Sharpe backend: "qp" (convex active-set QP, default),
+                "slsqp", or a callable (mean, cov, rf, warm_start) -> weights;
+                hierarchical risk parity is optimize_hrp()
+            cov_estimator: None (sample daily_pnl.cov()), an estimator name
+                ("sample", "ledoit_wolf", "constant_correlation", "ewma") or
+                a CovarianceEstimator instance; the fitted estimator is kept
+                in self.cov_estimator for streaming updates
+            periods_per_year (int): Rows per year used to annualize (252 trading days)
+            result_cache: Optional OptimizationCache; optimize() and
+                calculate_multipliers() then reuse results for the same
+                daily_pnl and parameters
         """
         self.daily_pnl = daily_pnl
         self.risk_free_rate = risk_free_rate
+        self.solver = solver
+        self.cov_estimator = None if cov_estimator is None else make_estimator(cov_estimator)
+        self.periods_per_year = periods_per_year
         self.ann_mean = None
         self.ann_cov = None
         self.optimal_weights = None
+        self.solver_info = None
+        self.multiplier_array = None
+        self.monte_carlo = None
+        self.lot_allocation = None
+        self.result_cache = result_cache
+        self._max_drawdowns = None
+        self._data_digest = None
+        self._result_key = None
 
     def calculate_annual_metrics(self) -> Tuple[np.ndarray, np.ndarray]:
         """
@@ -35,16 +119,25 @@ class PortfolioOptimizer:
         Returns:
             Tuple: (annual_returns, annual_covariance)
         """
-        # Assume 252 trading days per year
-        ann_mean = self.daily_pnl.mean() * 252
-        ann_cov = self.daily_pnl.cov() * 252
-
+        ann_mean = self.daily_pnl.mean() * self.periods_per_year
         self.ann_mean = ann_mean.values
-        self.ann_cov = ann_cov.values
+
+        if self.cov_estimator is None:
+            ann_cov = self.daily_pnl.cov() * self.periods_per_year
+            self.ann_cov = ann_cov.values
+        else:
+            self.cov_estimator.fit(self._values())
+            self.ann_cov = self.cov_estimator.covariance() * self.periods_per_year
 
         logger.info("✅ Annualized metrics calculated")
         return self.ann_mean, self.ann_cov
 
+    def _values(self) -> np.ndarray:
+        """Dense (Date × Strategy) array of the daily PnL."""
+        if isinstance(self.daily_pnl, SparseDailyPnL):
+            return self.daily_pnl.to_dense().values
+        return np.asarray(self.daily_pnl.values, dtype=float)
+
     @staticmethod
     def _negative_sharpe(weights: np.ndarray, mean_returns: np.ndarray,
                          cov_matrix: np.ndarray, rf: float = 0.0) -> float:
@@ -69,47 +162,611 @@ class PortfolioOptimizer:
         sharpe = (p_ret - rf) / p_vol
         return -sharpe
 
-    def optimize(self) -> np.ndarray:
+    @staticmethod
+    def _negative_sharpe_grad(weights: np.ndarray, mean_returns: np.ndarray,
+                              cov_matrix: np.ndarray, rf: float = 0.0) -> np.ndarray:
         """
-        Optimizes portfolio weights by maximizing Sharpe Ratio.
+        Analytic gradient of _negative_sharpe with respect to the weights.
+
+        d(-S)/dw = -(μ / σ - (μᵀw - rf) · Σw / σ³)
+
+        Args:
+            weights: Portfolio weights
+            mean_returns: Annualized mean returns
+            cov_matrix: Covariance matrix
+            rf: Risk-free rate
 
         Returns:
-            np.ndarray: Optimal normalized weights [0, 1]
+            np.ndarray: Gradient vector
         """
-        if self.ann_mean is None or self.ann_cov is None:
-            self.calculate_annual_metrics()
+        cov_w = np.dot(cov_matrix, weights)
+        p_var = np.dot(weights, cov_w)
 
-        num_assets = len(self.daily_pnl.columns)
+        if p_var <= 0:
+            return np.zeros_like(weights)
 
-        # Constraint: Sum of weights = 1
-        constraints = {"type": "eq", "fun": lambda x: np.sum(x) - 1}
+        p_vol = np.sqrt(p_var)
+        p_ret = np.sum(mean_returns * weights)
+        return -(mean_returns / p_vol - (p_ret - rf) * cov_w / (p_vol * p_var))
+
+    @staticmethod
+    def _solve_slsqp(mean_returns: np.ndarray, cov_matrix: np.ndarray, rf: float = 0.0,
+                     warm_start: Optional[np.ndarray] = None) -> Tuple[np.ndarray, Dict]:
+        """Maximizes the Sharpe ratio with SLSQP (non-convex ratio, analytic gradient)."""
+        num_assets = len(mean_returns)
+
+        # Constraint: Sum of weights = 1 (constant Jacobian)
+        constraints = {"type": "eq", "fun": lambda x: np.sum(x) - 1, "jac": lambda x: np.ones_like(x)}
 
         # Bounds: Weights between 0 and 1 (no shorting)
         bounds = tuple((0, 1) for _ in range(num_assets))
 
-        # Initial guess: Equal Weight
-        init_guess = np.array([1.0 / num_assets] * num_assets)
+        # Initial guess: Equal Weight (or the warm start)
+        init_guess = np.array([1.0 / num_assets] * num_assets) if warm_start is None else warm_start
 
         # Optimize
         result = minimize(
-            self._negative_sharpe,
+            PortfolioOptimizer._negative_sharpe,
             init_guess,
-            args=(self.ann_mean, self.ann_cov, self.risk_free_rate),
+            args=(mean_returns, cov_matrix, rf),
             method="SLSQP",
+            jac=PortfolioOptimizer._negative_sharpe_grad,
             bounds=bounds,
             constraints=constraints
         )
 
-        self.optimal_weights = result.x
-        logger.info(f"✅ Optimization completed. Sharpe: {-result.fun:.2f}")
+        return result.x, {"solver": "slsqp", "iterations": int(result.nit), "status": result.message}
+
+    @staticmethod
+    def _solve_qp(mean_returns: np.ndarray, cov_matrix: np.ndarray, rf: float = 0.0,
+                  warm_start: Optional[np.ndarray] = None) -> Tuple[np.ndarray, Dict]:
+        """Maximizes the Sharpe ratio through its convex QP reformulation."""
+        result = max_sharpe_qp(mean_returns, cov_matrix, rf, warm_weights=warm_start)
+        return result["weights"], {"solver": "qp", "iterations": result["iterations"], "status": result["status"]}
+
+    @staticmethod
+    def solve_max_sharpe(mean_returns: np.ndarray, cov_matrix: np.ndarray, rf: float = 0.0,
+                         solver: Union[str, Callable] = "qp",
+                         warm_start: Optional[np.ndarray] = None) -> Tuple[np.ndarray, Dict]:
+        """
+        Maximizes the Sharpe ratio for given annualized moments.
+
+        The QP backend falls back to SLSQP when no strategy has a positive
+        excess return (the QP reformulation is not defined) or when it does
+        not converge.
+
+        Args:
+            mean_returns: Annualized mean returns
+            cov_matrix: Annualized covariance matrix
+            rf: Risk-free rate
+            solver: "qp", "slsqp" or a callable (mean, cov, rf, warm_start) -> weights
+            warm_start: Initial weights (e.g. the previous solution)
+
+        Returns:
+            Tuple: (weights, solver diagnostics)
+        """
+        if callable(solver):
+            weights = np.asarray(solver(mean_returns, cov_matrix, rf, warm_start), dtype=float)
+            info = {"solver": getattr(solver, "__name__", "custom"), "iterations": None, "status": "done"}
+        elif solver == "qp":
+            try:
+                weights, info = PortfolioOptimizer._solve_qp(mean_returns, cov_matrix, rf, warm_start)
+                if info["status"] != "optimal":
+                    raise ValueError(f"QP status: {info['status']}")
+            except ValueError as e:
+                logger.warning(f"QP backend unavailable ({e}), falling back to SLSQP")
+                weights, info = PortfolioOptimizer._solve_slsqp(mean_returns, cov_matrix, rf, warm_start)
+        elif solver == "slsqp":
+            weights, info = PortfolioOptimizer._solve_slsqp(mean_returns, cov_matrix, rf, warm_start)
+        else:
+            raise ValueError(f"Unknown solver: {solver}. Use one of {PortfolioOptimizer.SOLVERS} or a callable.")
+
+        return weights, info
+
+    def _cache_key(self, solver: Union[str, Callable]) -> Optional[str]:
+        """Result cache key for optimize() with the current data and parameters (None: not cacheable)."""
+        if self.result_cache is None or callable(solver):
+            return None
+        if self._data_digest is None:
+            self._data_digest = OptimizationCache.data_digest(self.daily_pnl)
+
+        estimator = None
+        if self.cov_estimator is not None:
+            estimator = {"name": self.cov_estimator.name,
+                         **{k: v for k, v in vars(self.cov_estimator).items() if not k.startswith("_") and k != "n"}}
+        return OptimizationCache.make_key(self._data_digest, {
+            "method": "optimize",
+            "solver": solver,
+            "risk_free_rate": self.risk_free_rate,
+            "periods_per_year": self.periods_per_year,
+            "cov_estimator": estimator,
+        })
+
+    def invalidate_cache(self):
+        """Drops this optimizer's cached result (e.g. after daily_pnl was modified in place)."""
+        if self._result_key and self.result_cache is not None:
+            self.result_cache.invalidate(self._result_key)
+        self._data_digest = None
+        self._result_key = None
+        self._max_drawdowns = None
+
+    def optimize(self, solver: Union[str, Callable, None] = None,
+                 warm_start: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Optimizes portfolio weights by maximizing Sharpe Ratio.
+
+        See solve_max_sharpe for the backends and the QP → SLSQP fallback.
+        Solver diagnostics are kept in self.solver_info.
+
+        Args:
+            solver: Overrides the backend chosen at construction
+            warm_start: Initial weights (e.g. the previous solution)
+
+        Returns:
+            np.ndarray: Optimal normalized weights [0, 1]
+        """
+        solver = solver or self.solver
+        self._result_key = self._cache_key(solver)
+        cached = self.result_cache.get(self._result_key) if self._result_key else None
+        if cached is not None:
+            self.optimal_weights = cached["weights"].copy()
+            self.solver_info = {**cached["solver_info"], "cache": "hit"}
+            logger.info(f"✅ Optimization loaded from cache ({self.solver_info['solver']})")
+            return self.optimal_weights
+
+        if self.ann_mean is None or self.ann_cov is None:
+            self.calculate_annual_metrics()
+
+        start = time.perf_counter()
+        weights, info = self.solve_max_sharpe(self.ann_mean, self.ann_cov, self.risk_free_rate, solver, warm_start)
+
+        info["solve_time"] = time.perf_counter() - start
+        info["sharpe"] = -self._negative_sharpe(weights, self.ann_mean, self.ann_cov, self.risk_free_rate)
+        self.solver_info = info
+        if self._result_key:
+            self.result_cache.put(self._result_key, weights, info)
+
+        self.optimal_weights = weights
+        logger.info(f"✅ Optimization completed ({info['solver']}). Sharpe: {info['sharpe']:.2f}")
+
+        return self.optimal_weights
+
+    def update(self, new_rows: Union[pd.DataFrame, pd.Series], solver: Union[str, Callable, None] = None,
+               reoptimize: bool = True) -> Optional[np.ndarray]:
+        """
+        Appends new daily rows and re-optimizes incrementally.
+
+        The annualized moments are updated in O(k·N²) for k new rows instead
+        of being recomputed from the whole history: the sample covariance
+        by a Welford/Chan merge, a cov_estimator through its own update().
+        The re-solve is warm-started from the previous optimal weights, so
+        a one-day change typically takes a few active-set iterations. Meant
+        for frequent (e.g. intraday) rebalancing checks.
+
+        A date already in daily_pnl (e.g. today's row sent again with more
+        trades) replaces the stored row: its old contribution is removed
+        from the sample moments before the new one is added; a
+        cov_estimator, which cannot in general forget a row, is refitted.
+        New dates must come after the last stored date.
+
+        Args:
+            new_rows: New or revised days (Date × Strategy), or one day as a
+                Series named by its date; missing strategies did not trade (0)
+            solver: Overrides the backend chosen at construction
+            reoptimize: Re-solve after the update (False: only update the data and moments)
+
+        Returns:
+            np.ndarray: New optimal weights (None when reoptimize is False)
+        """
+        if not isinstance(self.daily_pnl, pd.DataFrame):
+            raise ValueError("update() needs a dense DataFrame daily_pnl")
+        if isinstance(new_rows, pd.Series):
+            new_rows = new_rows.to_frame().T
+        unknown = new_rows.columns.difference(self.daily_pnl.columns)
+        if len(unknown):
+            raise ValueError(f"New strategies need a full re-run: {list(unknown)}")
+
+        rows = new_rows.reindex(columns=self.daily_pnl.columns, fill_value=0.0).fillna(0.0).astype(float)
+        if not rows.index.is_unique:
+            raise ValueError("new_rows has repeated dates")
+        repeated = rows.index.isin(self.daily_pnl.index)
+        appended = rows[~repeated]
+        if len(appended) and appended.index.min() <= self.daily_pnl.index[-1]:
+            raise ValueError(f"New dates must come after the last stored date ({self.daily_pnl.index[-1]})")
+
+        num_rows = len(self.daily_pnl)
+        replaced_dates = rows.index[repeated]
+        old_values = self.daily_pnl.loc[replaced_dates].values
+        if len(replaced_dates):
+            self.daily_pnl = self.daily_pnl.copy()
+            self.daily_pnl.loc[replaced_dates] = rows.loc[replaced_dates].values
+        self.daily_pnl = pd.concat([self.daily_pnl, appended])
+        values = rows.values
+
+        if self.ann_mean is not None and self.ann_cov is not None:
+            ppy = self.periods_per_year
+            if self.cov_estimator is None:
+                moments = SampleCovariance.from_moments(self.ann_mean / ppy, self.ann_cov / ppy, num_rows)
+                if len(old_values):
+                    moments.remove(old_values)
+                moments.update(values)
+                self.ann_mean = moments.mean() * ppy
+                self.ann_cov = moments.covariance() * ppy
+            elif len(old_values):
+                self.calculate_annual_metrics()
+            else:
+                self.ann_mean = (self.ann_mean * num_rows + values.sum(axis=0) * ppy) / (num_rows + len(values))
+                self.cov_estimator.update(values)
+                self.ann_cov = self.cov_estimator.covariance() * ppy
+
+        # Results cached for the previous history stay valid for it; only this optimizer's keys move
+        self._data_digest = None
+        self._result_key = None
+        self._max_drawdowns = None
+        logger.info(f"✅ {len(appended)} new rows added, {len(replaced_dates)} replaced ({len(self.daily_pnl)} total)")
+
+        if not reoptimize:
+            return None
+        return self.optimize(solver, warm_start=self.optimal_weights)
+
+    def optimize_hrp(self, method: str = "single") -> np.ndarray:
+        """
+        Allocates by Hierarchical Risk Parity (see hrp.hrp_weights).
+
+        Not a max-Sharpe allocation: the weights come from the covariance
+        alone (expected returns are ignored) and the matrix is never
+        inverted, so it works for singular covariances and scales to
+        thousands of strategies. solver_info["sharpe"] is the Sharpe ratio
+        of the resulting portfolio.
+
+        Args:
+            method: Linkage method for the strategy clustering
+
+        Returns:
+            np.ndarray: Normalized weights [0, 1]
+        """
+        if self.ann_mean is None or self.ann_cov is None:
+            self.calculate_annual_metrics()
+
+        start = time.perf_counter()
+        weights = hrp_weights(self.ann_cov, method=method)
+
+        info = {"solver": "hrp", "linkage": method, "iterations": None, "status": "done"}
+        info["solve_time"] = time.perf_counter() - start
+        info["sharpe"] = -self._negative_sharpe(weights, self.ann_mean, self.ann_cov, self.risk_free_rate)
+        self.solver_info = info
+
+        self.optimal_weights = weights
+        logger.info(f"✅ HRP allocation completed. Sharpe: {info['sharpe']:.2f}")
+
+        return self.optimal_weights
+
+    def optimize_cvar(self, alpha: float = 0.95, objective: str = "min_cvar",
+                      target_return: Optional[float] = None) -> np.ndarray:
+        """
+        Optimizes weights on CVaR, using the daily PnL rows as scenarios.
+
+        Fat-tailed PnL is poorly described by variance; this mode solves
+        the Rockafellar-Uryasev LP with HiGHS (see cvar.cvar_lp). A
+        SparseDailyPnL is passed to the LP without densifying. Solve time
+        and problem size are kept in self.solver_info.
+
+        Args:
+            alpha: CVaR confidence level (e.g., 0.95 = mean of the worst 5% days)
+            objective: "min_cvar" or "return_per_cvar" (max expected return / CVaR)
+            target_return: Minimum annualized expected return for "min_cvar"
+
+        Returns:
+            np.ndarray: Optimal normalized weights [0, 1]
+        """
+        if self.ann_mean is None or self.ann_cov is None:
+            self.calculate_annual_metrics()
+
+        start = time.perf_counter()
+        scenarios = self.daily_pnl.matrix if isinstance(self.daily_pnl, SparseDailyPnL) else self._values()
+        # Daily expected returns; the ratio objective uses the excess over rf
+        daily_mean = (self.ann_mean - (self.risk_free_rate if objective == "return_per_cvar" else 0.0)) \
+            / self.periods_per_year
+        daily_target = None if target_return is None else target_return / self.periods_per_year
+
+        result = cvar_lp(scenarios, alpha, objective, mean_returns=daily_mean, target_return=daily_target)
+        weights = result.pop("weights")
+
+        info = {"solver": f"cvar ({objective})", "alpha": alpha, **result}
+        info["solve_time"] = time.perf_counter() - start
+        info["sharpe"] = -self._negative_sharpe(weights, self.ann_mean, self.ann_cov, self.risk_free_rate)
+        self.solver_info = info
+
+        self.optimal_weights = weights
+        logger.info(f"✅ CVaR optimization completed ({info['num_variables']} variables, "
+                    f"{info['num_constraints']} constraints) in {info['solve_time']:.2f}s. "
+                    f"CVaR {alpha:.0%}: {info['cvar']:.2f}")
+
+        return self.optimal_weights
+
+    def multi_start_optimize(self, objective: Union[str, Callable] = "calmar", num_starts: int = 32,
+                             seed: Optional[int] = None, max_workers: Optional[int] = None,
+                             patience: Optional[int] = None, tol: float = 1e-6) -> Dict:
+        """
+        Multi-start local optimization of a (non-convex) objective of the portfolio PnL.
+
+        Starting points: equal weights, inverse volatility, the max-Sharpe
+        solution and the best single strategy, then Dirichlet samples.
+        Each start is solved with SLSQP (see multistart.local_solve),
+        concurrently when max_workers > 1. With patience, the search stops
+        once that many consecutive finished starts failed to improve the
+        best objective by tol; starts not yet running are cancelled.
+
+        Args:
+            objective: "sharpe", "sortino", "calmar", "return_dd" or a picklable
+                callable(portfolio_pnl, periods_per_year) -> float to maximize
+            num_starts: Number of starting points (M)
+            seed: Random seed for the Dirichlet starts
+            max_workers: Process pool size (None/1: in-process)
+            patience: Early-stop after this many non-improving starts (None: solve all)
+            tol: Minimum improvement of the best objective
+
+        Returns:
+            Dict: weights and objective of the best start, objective values
+                of every solved start, spread (min, median, max), num_solved
+        """
+        if self.ann_mean is None or self.ann_cov is None:
+            self.calculate_annual_metrics()
+
+        start_time = time.perf_counter()
+        func = resolve_objective(objective)
+        values = self._values()
+        num_assets = values.shape[1]
+
+        # Heuristic starts, then Dirichlet samples of the simplex
+        inv_vol = 1.0 / np.maximum(np.sqrt(np.diag(self.ann_cov)), 1e-12)
+        best_single = np.zeros(num_assets)
+        best_single[np.argmax([func(values[:, j], self.periods_per_year) for j in range(num_assets)])] = 1.0
+        sharpe_weights, _ = self.solve_max_sharpe(self.ann_mean, self.ann_cov, self.risk_free_rate, self.solver)
+        starts = [np.full(num_assets, 1.0 / num_assets), inv_vol / inv_vol.sum(), sharpe_weights, best_single]
+        rng = np.random.default_rng(seed)
+        starts += list(rng.dirichlet(np.ones(num_assets), size=max(num_starts - len(starts), 0)))
+        starts = starts[:num_starts]
+
+        results = []
+        stale = 0
+
+        def improves(result) -> bool:
+            best = max((r["objective"] for r in results), default=-np.inf)
+            return result["objective"] > best + tol
+
+        if max_workers is not None and max_workers > 1:
+            with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker, initargs=(values,)) as pool:
+                futures = [pool.submit(_solve_in_worker, w0, objective, self.periods_per_year) for w0 in starts]
+                for future in as_completed(futures):
+                    result = future.result()
+                    stale = 0 if improves(result) else stale + 1
+                    results.append(result)
+                    if patience is not None and stale >= patience:
+                        for f in futures:
+                            f.cancel()
+                        break
+        else:
+            for w0 in starts:
+                result = local_solve(values, w0, objective, self.periods_per_year)
+                stale = 0 if improves(result) else stale + 1
+                results.append(result)
+                if patience is not None and stale >= patience:
+                    break
+
+        objectives = np.array([r["objective"] for r in results])
+        best = results[int(np.argmax(objectives))]
+        weights = best["weights"]
+
+        name = objective if isinstance(objective, str) else getattr(objective, "__name__", "custom")
+        self.solver_info = {
+            "solver": f"multi-start ({name})",
+            "iterations": sum(r["iterations"] for r in results),
+            "status": f"{len(results)}/{len(starts)} starts solved",
+            "solve_time": time.perf_counter() - start_time,
+            "sharpe": -self._negative_sharpe(weights, self.ann_mean, self.ann_cov, self.risk_free_rate),
+        }
+        self.optimal_weights = weights
+        logger.info(f"✅ Multi-start optimization completed ({len(results)} starts). "
+                    f"Best {name}: {best['objective']:.4f}")
+
+        return {
+            "weights": weights,
+            "objective": best["objective"],
+            "objectives": objectives,
+            "spread": (float(objectives.min()), float(np.median(objectives)), float(objectives.max())),
+            "num_solved": len(results),
+        }
+
+    def optimize_cardinality(self, max_assets: int = 20, min_weight: float = 0.01,
+                             time_budget: float = 5.0, max_workers: Optional[int] = None) -> np.ndarray:
+        """
+        Maximizes the Sharpe ratio holding at most max_assets strategies.
+
+        Every held strategy gets at least min_weight, so each EA that has
+        to run in MT5 carries a meaningful allocation. Uses a heuristic
+        pre-selection plus a swap local search with a time budget (see
+        cardinality.cardinality_search).
+
+        Args:
+            max_assets: Maximum number of strategies with nonzero weight (K)
+            min_weight: Minimum weight of every held strategy
+            time_budget: Local search time limit in seconds
+            max_workers: Process pool size for the swap evaluations (None/1: in-process)
+
+        Returns:
+            np.ndarray: Optimal normalized weights [0, 1], at most K nonzero
+        """
+        if self.ann_mean is None or self.ann_cov is None:
+            self.calculate_annual_metrics()
+
+        start = time.perf_counter()
+        result = cardinality_search(self.ann_mean, self.ann_cov, self.risk_free_rate, max_assets,
+                                    min_weight, time_budget, max_workers=max_workers)
+        weights = result["weights"]
+
+        self.solver_info = {
+            "solver": f"cardinality (K={max_assets})",
+            "iterations": result["evaluations"],
+            "status": f"{len(result['selected'])} strategies, {result['rounds']} search rounds",
+            "solve_time": time.perf_counter() - start,
+            "sharpe": -self._negative_sharpe(weights, self.ann_mean, self.ann_cov, self.risk_free_rate),
+            "selected": [self.daily_pnl.columns[j] for j in result["selected"]],
+        }
+        self.optimal_weights = weights
+        logger.info(f"✅ Cardinality-constrained optimization completed ({len(result['selected'])} strategies). "
+                    f"Sharpe: {self.solver_info['sharpe']:.2f}")
 
         return self.optimal_weights
 
+    def efficient_frontier(self, num_points: int = 20, target: str = "return",
+                           max_workers: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """
+        Computes K long-only efficient-frontier points in one call.
+
+        The grid spans the minimum-variance portfolio up to the highest
+        return strategy, evenly in return or in volatility. The regularized
+        covariance is built once and shared by every solve; each point is
+        warm-started from its neighbour, so consecutive solves only move a
+        few strategies in or out of the active set.
+
+        Args:
+            num_points: Number of frontier points (K)
+            target: Grid on "return" or on "volatility"
+            max_workers: Process pool size; the grid is split in contiguous
+                chunks that are swept in parallel (None/1: in-process)
+
+        Returns:
+            Dict: weights (K × N), risk, return and sharpe arrays (K)
+        """
+        if target not in ("return", "volatility"):
+            raise ValueError(f"Unknown frontier target: {target}. Use 'return' or 'volatility'.")
+        if self.ann_mean is None or self.ann_cov is None:
+            self.calculate_annual_metrics()
+
+        start = time.perf_counter()
+        mean = np.asarray(self.ann_mean, dtype=float)
+        Q = regularized_cov(self.ann_cov)
+        num_assets = len(mean)
+
+        # Minimum-variance portfolio: left end of the frontier and warm start of every chunk
+        min_var = solve_qp_active_set(2.0 * Q, np.ones((1, num_assets)), np.array([1.0]))["x"]
+        min_var = min_var / min_var.sum()
+
+        r_lo, r_hi = mean @ min_var, mean.max()
+        if target == "return":
+            targets = np.linspace(r_lo, max(r_hi, r_lo), num_points)
+        else:
+            top = frontier_sweep(Q, mean, [max(r_hi, r_lo)], start=min_var)[0]
+            targets = np.linspace(np.sqrt(min_var @ Q @ min_var), np.sqrt(top @ Q @ top), num_points)
+
+        if max_workers is not None and max_workers > 1 and num_points > 1:
+            chunks = [c for c in np.array_split(targets, min(max_workers, num_points)) if len(c)]
+            with ProcessPoolExecutor(max_workers=len(chunks)) as pool:
+                futures = [pool.submit(frontier_sweep, Q, mean, c, min_var, target) for c in chunks]
+                weights = np.vstack([f.result() for f in futures])
+        else:
+            weights = frontier_sweep(Q, mean, targets, start=min_var, target=target)
+
+        returns = weights @ mean
+        risk = np.sqrt(np.einsum("ij,jk,ik->i", weights, self.ann_cov, weights))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            sharpe = np.where(risk > 0, (returns - self.risk_free_rate) / risk, 0.0)
+
+        logger.info(f"✅ Efficient frontier: {num_points} points in {time.perf_counter() - start:.2f}s")
+        return {"weights": weights, "risk": risk, "return": returns, "sharpe": sharpe}
+
+    def resampled_optimize(self, num_samples: int = 1000, block_size: Optional[int] = None,
+                           seed: Optional[int] = None, confidence: float = 0.90,
+                           max_workers: Optional[int] = None, batch_size: int = 50) -> Dict:
+        """
+        Resampled-efficiency optimization (bootstrap-averaged max-Sharpe weights).
+
+        Draws B bootstrap (or block-bootstrap) resamples of the daily PnL
+        rows, computes their means and covariances in batches, solves each
+        resample (warm-started from the full-sample solution) and averages
+        the weights. The averaged weights become self.optimal_weights.
+
+        Args:
+            num_samples: Number of resamples (B)
+            block_size: Block length in days for the block bootstrap (None: i.i.d.)
+            seed: Random seed; the same seed reproduces the same weights
+            confidence: Width of the reported weight bands (e.g., 0.90 = 5th-95th percentile)
+            max_workers: Process pool size for the solves (None/1: in-process)
+            batch_size: Resamples per batch (and per pool task)
+
+        Returns:
+            Dict: weights (averaged), lower/upper bands, std and samples (B × N)
+        """
+        if self.ann_mean is None or self.ann_cov is None:
+            self.calculate_annual_metrics()
+
+        start = time.perf_counter()
+        values = self._values()
+
+        full_sample, _ = self.solve_max_sharpe(self.ann_mean, self.ann_cov, self.risk_free_rate, self.solver)
+        counts = bootstrap_counts(len(values), num_samples, block_size, np.random.default_rng(seed))
+        batches = [counts[lo:lo + batch_size] for lo in range(0, num_samples, batch_size)]
+
+        if max_workers is not None and max_workers > 1 and len(batches) > 1:
+            # The matrix goes to each worker once; tasks carry only their counts
+            with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_resample_worker,
+                                     initargs=(values,)) as pool:
+                futures = [pool.submit(_resample_batch_in_worker, b, self.risk_free_rate, self.solver, full_sample,
+                                       self.periods_per_year)
+                           for b in batches]
+                results = [f.result() for f in futures]
+        else:
+            results = [_solve_resample_batch(values, b, self.risk_free_rate, self.solver, full_sample,
+                                             self.periods_per_year)
+                       for b in batches]
+
+        samples = np.vstack([r[0] for r in results])
+        statuses = [s for r in results for s in r[1]]
+        weights = samples.mean(axis=0)
+        tail = (1.0 - confidence) / 2 * 100
+
+        self.optimal_weights = weights
+        self.solver_info = {
+            "solver": "resampled",
+            "iterations": num_samples,
+            "status": f"{statuses.count('optimal')}/{num_samples} optimal",
+            "solve_time": time.perf_counter() - start,
+            "sharpe": -self._negative_sharpe(weights, self.ann_mean, self.ann_cov, self.risk_free_rate),
+        }
+        logger.info(f"✅ Resampled optimization completed ({num_samples} samples). "
+                    f"Sharpe: {self.solver_info['sharpe']:.2f}")
+
+        return {
+            "weights": weights,
+            "lower": np.percentile(samples, tail, axis=0),
+            "upper": np.percentile(samples, 100 - tail, axis=0),
+            "std": samples.std(axis=0),
+            "samples": samples,
+        }
+
+    def max_drawdowns(self) -> np.ndarray:
+        """
+        Maximum drawdown (absolute, in money) of each strategy, cached.
+
+        Computed once per daily_pnl with the blocked NumPy kernel (or the
+        input's own max_drawdowns() for sparse and memory-mapped matrices).
+        """
+        if self._max_drawdowns is None:
+            if hasattr(self.daily_pnl, "max_drawdowns"):  # SparseDailyPnL, PnLView
+                self._max_drawdowns = np.asarray(self.daily_pnl.max_drawdowns(), dtype=float)
+            else:
+                self._max_drawdowns = max_drawdowns(self._values())
+        return self._max_drawdowns
+
     def calculate_multipliers(self, optimal_weights: np.ndarray, capital_inicial: float,
                              risk_tolerance_dd: float = 0.25) -> Dict[str, float]:
         """
         Calculates lot multipliers based on risk management.
 
+        The same multipliers, as an array aligned with daily_pnl.columns,
+        are kept in self.multiplier_array.
+
         Args:
             optimal_weights: Optimal weights
             capital_inicial: Total capital
@@ -118,26 +775,115 @@ class PortfolioOptimizer:
         Returns:
             Dict: {strategy_name: multiplier}
         """
-        # Calculate Maximum Drawdown for each strategy
-        cum_ret = self.daily_pnl.cumsum()
-        peaks = cum_ret.cummax()
-        drawdowns = cum_ret - peaks
-        max_dd_money = drawdowns.min().abs()
-        max_dd_money = max_dd_money.replace(0, 1)  # Avoid division by zero
+        # Cached with the optimize() result they were computed from
+        entry = self.result_cache.get(self._result_key) if self._result_key else None
+        if entry is not None and not np.array_equal(optimal_weights, entry["weights"]):
+            entry = None
+        mult_key = OptimizationCache.multiplier_key(capital_inicial, risk_tolerance_dd)
+
+        if entry is not None and mult_key in entry["multipliers"]:
+            self.multiplier_array = np.array(entry["multipliers"][mult_key], dtype=float)
+        else:
+            self.multiplier_array = multipliers_from_drawdowns(
+                optimal_weights, self.max_drawdowns(), capital_inicial, risk_tolerance_dd
+            )
+            if entry is not None:
+                self.result_cache.put(self._result_key, entry["weights"], entry["solver_info"],
+                                      {**entry["multipliers"], mult_key: self.multiplier_array})
+        multipliers = dict(zip(self.daily_pnl.columns, self.multiplier_array.tolist()))
 
-        multipliers = {}
-        for i, strategy in enumerate(self.daily_pnl.columns):
-            weight = optimal_weights[i]
-            allocated_capital = capital_inicial * weight
-            risk_budget = allocated_capital * risk_tolerance_dd
-            dd_value = max_dd_money[strategy]
+        logger.info(f"✅ Multipliers calculated for {len(multipliers)} strategies")
+        return multipliers
+
+    def monte_carlo_multipliers(self, optimal_weights: np.ndarray, capital_inicial: float,
+                                risk_tolerance_dd: float = 0.25, percentile: float = 95,
+                                num_paths: int = 10000, block_size: Optional[int] = None,
+                                seed: Optional[int] = None, max_workers: Optional[int] = None) -> Dict[str, float]:
+        """
+        Calculates lot multipliers from a simulated drawdown percentile.
 
-            multiplier = risk_budget / dd_value if dd_value > 0 else 1.0
-            multipliers[strategy] = multiplier
+        Alternative sizing mode to calculate_multipliers: instead of the
+        single historical max drawdown, each strategy's drawdown is the
+        given percentile of its max-drawdown distribution over bootstrapped
+        (or block-resampled) equity paths. The distributions, and the one
+        of the resulting sized portfolio, are kept in self.monte_carlo.
 
-        logger.info(f"✅ Multipliers calculated for {len(multipliers)} strategies")
+        Args:
+            optimal_weights: Optimal weights
+            capital_inicial: Total capital
+            risk_tolerance_dd: DD tolerance (e.g., 0.25 = 25%)
+            percentile: Drawdown percentile used for sizing (e.g., 95)
+            num_paths: Number of simulated paths
+            block_size: Block length in days (None: i.i.d. bootstrap)
+            seed: Random seed
+            max_workers: Process pool size for the path chunks (None/1: in-process)
+
+        Returns:
+            Dict: {strategy_name: multiplier}
+        """
+        values = self._values()
+        strategy_dd = simulate_drawdowns(values, num_paths, block_size, seed, max_workers=max_workers)
+        sizing_dd = np.percentile(strategy_dd, percentile, axis=0)
+
+        self.multiplier_array = multipliers_from_drawdowns(optimal_weights, sizing_dd, capital_inicial,
+                                                           risk_tolerance_dd)
+        portfolio_dd = simulate_drawdowns((values @ self.multiplier_array)[:, None], num_paths, block_size,
+                                          seed, max_workers=max_workers)[:, 0]
+        self.monte_carlo = {
+            "strategy_drawdowns": strategy_dd,
+            "portfolio_drawdowns": portfolio_dd,
+            "percentile": percentile,
+            "sizing_drawdowns": sizing_dd,
+        }
+        multipliers = dict(zip(self.daily_pnl.columns, self.multiplier_array.tolist()))
+
+        logger.info(f"✅ Monte Carlo multipliers calculated ({num_paths} paths, p{percentile:g} DD). "
+                    f"Sized portfolio p{percentile:g} DD: {np.percentile(portfolio_dd, percentile):,.2f}")
         return multipliers
 
+    def allocate_lots(self, optimal_weights: np.ndarray, original_lots: pd.Series, capital_inicial: float,
+                      risk_tolerance_dd: float = 0.25, **limits) -> Dict[str, float]:
+        """
+        Final MT5 lots on the broker's lot grid, tracking the optimized risk budget.
+
+        Discrete stage after calculate_multipliers: rounding
+        original_lot × multiplier ignores the minimum lot, lot step and
+        maximum lot, so the deployed risk drifts from the weights. See
+        lot_allocation.allocate_lots for the solver and the constraints.
+        The full result is kept in self.lot_allocation.
+
+        Args:
+            optimal_weights: Optimal weights
+            original_lots: Traded lot per strategy (indexed by strategy name)
+            capital_inicial: Total capital
+            risk_tolerance_dd: DD tolerance (e.g., 0.25 = 25%)
+            **limits: min_lot, lot_step, max_lot, groups, group_max_lots (see allocate_lots)
+
+        Returns:
+            Dict: {strategy_name: lot}
+        """
+        lots = pd.Series(original_lots, dtype=float).reindex(self.daily_pnl.columns).values
+        self.lot_allocation = allocate_lots(lots, self.max_drawdowns(), optimal_weights, capital_inicial,
+                                            risk_tolerance_dd, **limits)
+        return dict(zip(self.daily_pnl.columns, self.lot_allocation["lots"].tolist()))
+
+    def multiplier_grid(self, optimal_weights: np.ndarray, params) -> np.ndarray:
+        """
+        Multipliers for a batch of (capital_inicial, risk_tolerance_dd) pairs.
+
+        The drawdowns are computed once (cached), so sweeping the capital
+        and DD tolerance only costs one (P × N) product.
+
+        Args:
+            optimal_weights: Optimal weights
+            params: Sequence of P (capital_inicial, risk_tolerance_dd) pairs
+
+        Returns:
+            np.ndarray: Multipliers matrix (P × N), columns as daily_pnl.columns
+        """
+        params = np.asarray(params, dtype=float).reshape(-1, 2)
+        return multipliers_from_drawdowns(optimal_weights, self.max_drawdowns(), params[:, 0], params[:, 1])
+
     def get_optimal_weights(self) -> Dict[str, float]:
         """Returns optimal weights as a dictionary."""
         if self.optimal_weights is None:
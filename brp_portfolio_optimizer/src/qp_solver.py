@@ -0,0 +1,251 @@
+"""
+QP solver: Dense primal active-set solver for the long-only portfolio problems.
+"""
+
+import numpy as np
+from scipy.optimize import brentq, linprog
+from typing import Dict, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def feasible_start(A: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """
+    Finds a vertex of {x : Ax = b, x ≥ 0} with a phase-I LP (HiGHS).
+
+    Args:
+        A: Equality constraint matrix (m × n)
+        b: Right-hand side (m)
+
+    Returns:
+        np.ndarray: Feasible point with at most m non-zeros
+    """
+    A = np.atleast_2d(A)
+    result = linprog(np.zeros(A.shape[1]), A_eq=A, b_eq=np.atleast_1d(b), bounds=(0, None), method="highs")
+    if result.status != 0:
+        raise ValueError(f"Infeasible constraints: {result.message}")
+    return result.x
+
+
+def regularized_cov(cov_matrix: np.ndarray, ridge: float = 1e-10) -> np.ndarray:
+    """Copy of the covariance with a small relative ridge on the diagonal."""
+    Q = np.array(cov_matrix, dtype=float)
+    Q[np.diag_indices_from(Q)] += ridge * max(np.trace(Q) / len(Q), 1e-300)
+    return Q
+
+
+def solve_qp_active_set(Q: np.ndarray, A: np.ndarray, b: np.ndarray, c: Optional[np.ndarray] = None,
+                        x0: Optional[np.ndarray] = None, max_iter: Optional[int] = None,
+                        tol: float = 1e-9) -> Dict:
+    """
+    Solves min ½xᵀQx + cᵀx subject to Ax = b, x ≥ 0 (Q positive definite).
+
+    Primal active-set method: the working set holds the variables fixed at
+    zero. Each iteration solves the equality-constrained QP on the free
+    variables and either stops at the first variable that hits zero or,
+    after a full step, releases the fixed variable with the most negative
+    bound multiplier. Starting from a sparse point, each iteration works on
+    a small free set.
+
+    Args:
+        Q: Quadratic term (n × n)
+        A: Equality constraint matrix (m × n)
+        b: Right-hand side (m)
+        c: Linear term (default: zero)
+        x0: Feasible starting point (default: phase-I LP vertex)
+        max_iter: Iteration limit (default: 10·n + 100)
+        tol: Relative tolerance on the bound multipliers
+
+    Returns:
+        Dict: {"x", "iterations", "status", "multipliers"}
+    """
+    Q = np.asarray(Q, dtype=float)
+    A = np.atleast_2d(np.asarray(A, dtype=float))
+    b = np.atleast_1d(np.asarray(b, dtype=float))
+    n, m = Q.shape[0], A.shape[0]
+    c = np.zeros(n) if c is None else np.asarray(c, dtype=float)
+    max_iter = max_iter or 10 * n + 100
+
+    x = feasible_start(A, b) if x0 is None else np.maximum(np.asarray(x0, dtype=float), 0.0)
+    free = x > 0
+    nu = np.zeros(m)
+    status = "max_iter"
+
+    for iteration in range(1, max_iter + 1):
+        F = np.flatnonzero(free)
+        k = F.size
+        g = Q @ x + c
+
+        # Equality-constrained step on the free set:
+        # [Q_FF  A_Fᵀ] [p_F]   [-g_F]
+        # [A_F    0  ] [ ν ] = [  0 ]
+        kkt = np.zeros((k + m, k + m))
+        kkt[:k, :k] = Q[np.ix_(F, F)]
+        kkt[:k, k:] = A[:, F].T
+        kkt[k:, :k] = A[:, F]
+        rhs = np.concatenate((-g[F], np.zeros(m)))
+        try:
+            sol = np.linalg.solve(kkt, rhs)
+        except np.linalg.LinAlgError:
+            sol = np.linalg.lstsq(kkt, rhs, rcond=None)[0]
+        p_F, nu = sol[:k], sol[k:]
+
+        # Step along p_F until the first free variable hits zero
+        blocking = None
+        decreasing = p_F < 0
+        if decreasing.any():
+            ratios = -x[F][decreasing] / p_F[decreasing]
+            r = np.argmin(ratios)
+            if ratios[r] < 1.0:
+                blocking = F[decreasing][r]
+                x[F] += max(ratios[r], 0.0) * p_F
+                x[blocking] = 0.0
+                free[blocking] = False
+                continue
+
+        # Full step: x minimizes the objective on the current free set
+        x[F] += p_F
+        W = np.flatnonzero(~free)
+        if W.size == 0:
+            status = "optimal"
+            break
+
+        g = Q @ x + c
+        bound_multipliers = g[W] + A[:, W].T @ nu
+        j = np.argmin(bound_multipliers)
+        if bound_multipliers[j] >= -tol * max(np.abs(g).max(), 1e-300):
+            status = "optimal"
+            break
+        free[W[j]] = True
+
+    x = np.maximum(x, 0.0)
+    if status != "optimal":
+        logger.warning(f"Active-set QP stopped after {max_iter} iterations")
+
+    return {"x": x, "iterations": iteration, "status": status, "multipliers": nu}
+
+
+def max_sharpe_qp(mean_returns: np.ndarray, cov_matrix: np.ndarray, rf: float = 0.0,
+                  warm_weights: Optional[np.ndarray] = None, ridge: float = 1e-10) -> Dict:
+    """
+    Long-only maximum Sharpe portfolio as a convex QP.
+
+    With y = w / ((μ − rf)ᵀw), maximizing the Sharpe ratio is equivalent to
+        min yᵀΣy  subject to (μ − rf)ᵀy = 1, y ≥ 0
+    and the weights are w = y / Σy. Requires at least one strategy with a
+    positive excess return.
+
+    Args:
+        mean_returns: Annualized mean returns
+        cov_matrix: Annualized covariance matrix
+        rf: Risk-free rate
+        warm_weights: Previous weights to start from (e.g. from a neighbouring solve)
+        ridge: Relative diagonal regularization for near-singular covariances
+
+    Returns:
+        Dict: {"weights", "iterations", "status"}
+    """
+    mean_returns = np.asarray(mean_returns, dtype=float)
+    excess = mean_returns - rf
+    if not np.any(excess > 0):
+        raise ValueError("No strategy with a positive excess return: max-Sharpe QP is not defined.")
+
+    Q = regularized_cov(cov_matrix, ridge)
+
+    x0 = None
+    if warm_weights is not None:
+        warm_weights = np.maximum(np.asarray(warm_weights, dtype=float), 0.0)
+        scale = excess @ warm_weights
+        if scale > 0:
+            x0 = warm_weights / scale
+    if x0 is None:
+        best = np.argmax(excess)
+        x0 = np.zeros(len(excess))
+        x0[best] = 1.0 / excess[best]
+
+    result = solve_qp_active_set(2.0 * Q, excess[None, :], np.array([1.0]), x0=x0)
+    y = result["x"]
+    weights = y / y.sum()
+
+    return {"weights": weights, "iterations": result["iterations"], "status": result["status"]}
+
+
+def _frontier_point(Q: np.ndarray, A: np.ndarray, mean_returns: np.ndarray, target: float,
+                    previous: Optional[np.ndarray] = None) -> np.ndarray:
+    """Minimum-variance weights for one target return, warm-started from a neighbour."""
+    # At the ends of [min μ, max μ] the feasible set collapses to the extreme
+    # strategies: the equality system is degenerate, so solve on them directly
+    scale = max(np.abs(mean_returns).max(), 1e-300)
+    for extreme in (mean_returns.max(), mean_returns.min()):
+        if abs(target - extreme) <= 1e-12 * scale:
+            tied = np.flatnonzero(np.abs(mean_returns - extreme) <= 1e-12 * scale)
+            x = solve_qp_active_set(2.0 * Q[np.ix_(tied, tied)], np.ones((1, tied.size)), np.array([1.0]))["x"]
+            weights = np.zeros(len(mean_returns))
+            weights[tied] = x / x.sum()
+            return weights
+
+    x0 = None
+    if previous is not None:
+        # Move the neighbour towards the best (or worst) strategy just enough to
+        # hit the new target: the start stays feasible and keeps its support
+        prev_return = mean_returns @ previous
+        k = np.argmax(mean_returns) if target >= prev_return else np.argmin(mean_returns)
+        gap = mean_returns[k] - prev_return
+        t = min(max((target - prev_return) / gap, 0.0), 1.0) if gap != 0 else 0.0
+        x0 = (1.0 - t) * previous
+        x0[k] += t
+
+    result = solve_qp_active_set(2.0 * Q, A, np.array([1.0, target]), x0=x0)
+    return result["x"] / result["x"].sum()
+
+
+def frontier_sweep(Q: np.ndarray, mean_returns: np.ndarray, targets: np.ndarray,
+                   start: Optional[np.ndarray] = None, target: str = "return") -> np.ndarray:
+    """
+    Efficient-frontier weights for a sorted sequence of targets.
+
+    Each point solves min wᵀQw subject to 1ᵀw = 1, μᵀw = r, w ≥ 0 and is
+    warm-started from the previous one. Volatility targets are mapped to
+    the return whose frontier risk matches them (Brent root search, every
+    evaluation warm-started from the previous point).
+
+    Args:
+        Q: Regularized covariance matrix (shared by all points)
+        mean_returns: Expected returns
+        targets: Ascending target returns within [min μ, max μ], or ascending
+            target volatilities on the efficient branch
+        start: Feasible weights to warm-start the first point from
+            (required for volatility targets: the minimum-variance portfolio)
+        target: "return" or "volatility"
+
+    Returns:
+        np.ndarray: Weights matrix (len(targets) × n)
+    """
+    mean_returns = np.asarray(mean_returns, dtype=float)
+    n = len(mean_returns)
+    A = np.vstack((np.ones(n), mean_returns))
+
+    weights = np.zeros((len(targets), n))
+    previous = start
+    for i, goal in enumerate(targets):
+        if target == "return":
+            previous = _frontier_point(Q, A, mean_returns, goal, previous)
+        elif target == "volatility":
+            if previous is None:
+                raise ValueError("Volatility targets need a feasible start (the minimum-variance weights).")
+            anchor = previous
+            r_lo, r_hi = mean_returns @ anchor, mean_returns.max()
+
+            def excess_vol(r):
+                w = _frontier_point(Q, A, mean_returns, r, anchor)
+                return np.sqrt(w @ Q @ w) - goal
+
+            if np.sqrt(anchor @ Q @ anchor) < goal and r_hi > r_lo:
+                r = r_hi if excess_vol(r_hi) <= 0 else brentq(excess_vol, r_lo, r_hi, xtol=1e-12 * max(abs(r_hi), 1.0))
+                previous = _frontier_point(Q, A, mean_returns, r, anchor)
+        else:
+            raise ValueError(f"Unknown frontier target: {target}. Use 'return' or 'volatility'.")
+        weights[i] = previous
+
+    return weights
@@ -0,0 +1,92 @@
+"""
+Resampling: Bootstrap draws of the daily PnL rows and their batched moments.
+"""
+
+import numpy as np
+from typing import Optional, Tuple
+
+
+def bootstrap_indices(num_rows: int, num_samples: int, block_size: Optional[int] = None,
+                      rng: Optional[np.random.Generator] = None) -> np.ndarray:
+    """
+    Draws bootstrap resamples of the rows as ordered row positions.
+
+    With block_size, rows are drawn in circular blocks of consecutive days
+    (moving block bootstrap), which keeps short-range autocorrelation and
+    drawdown clustering inside each block.
+
+    Args:
+        num_rows: Number of rows (days) T
+        num_samples: Number of resamples B
+        block_size: Block length in rows (None or 1: i.i.d. bootstrap)
+        rng: Random generator (default: fresh, unseeded)
+
+    Returns:
+        np.ndarray: Row positions (B × T)
+    """
+    rng = rng or np.random.default_rng()
+    block_size = block_size or 1
+
+    num_blocks = -(-num_rows // block_size)
+    dtype = np.int32 if num_rows + block_size < 2 ** 31 else np.int64
+    starts = rng.integers(0, num_rows, size=(num_samples, num_blocks), dtype=dtype)
+    if block_size == 1:
+        return starts
+
+    rows = (starts[:, :, None] + np.arange(block_size, dtype=dtype)).reshape(num_samples, -1)[:, :num_rows]
+    rows %= num_rows
+    return rows
+
+
+def bootstrap_counts(num_rows: int, num_samples: int, block_size: Optional[int] = None,
+                     rng: Optional[np.random.Generator] = None) -> np.ndarray:
+    """
+    Draws bootstrap resamples of the rows as occurrence counts.
+
+    Means and covariances do not depend on the row order, so a resample is
+    fully described by how many times each row was drawn (see
+    bootstrap_indices for the sampling scheme).
+
+    Returns:
+        np.ndarray: Counts matrix (B × T), each row summing to T
+    """
+    rows = bootstrap_indices(num_rows, num_samples, block_size, rng)
+    offsets = np.arange(num_samples)[:, None] * num_rows
+    return np.bincount((rows + offsets).ravel(), minlength=num_samples * num_rows).reshape(num_samples, num_rows)
+
+
+def batched_moments(values: np.ndarray, counts: np.ndarray,
+                    chunk_size: int = 32) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Sample means and covariances of a batch of resamples.
+
+    The means are a single (B × T)·(T × N) product; the covariances are
+    Xᵀ·diag(c)·X over chunks of resamples, so memory stays at
+    chunk_size × T × N. Rows are centred on the full-sample mean first
+    (covariances are shift invariant) to avoid cancellation.
+
+    Args:
+        values: Daily PnL matrix (T × N)
+        counts: Occurrence counts from bootstrap_counts (B × T)
+        chunk_size: Resamples per covariance batch
+
+    Returns:
+        Tuple: (means B × N, covariances B × N × N)
+    """
+    values = np.asarray(values, dtype=float)
+    num_rows = values.shape[0]
+    shift = values.mean(axis=0)
+    centred = values - shift
+
+    sums = counts @ centred
+    means = sums / num_rows + shift
+
+    covs = np.empty((len(counts), values.shape[1], values.shape[1]))
+    for lo in range(0, len(counts), chunk_size):
+        c = counts[lo:lo + chunk_size]
+        weighted = centred[None, :, :] * c[:, :, None]
+        second = np.matmul(weighted.transpose(0, 2, 1), centred)
+        s = sums[lo:lo + chunk_size]
+        covs[lo:lo + chunk_size] = (second - s[:, :, None] * s[:, None, :] / num_rows) / (num_rows - 1)
+
+    return means, covs
@@ -0,0 +1,137 @@
+"""
+SharedPnLStore: Memory-mapped daily PnL store shared by multi-process workers.
+"""
+
+import json
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import Optional
+import logging
+
+try:
+    from .drawdown import max_drawdowns
+except ImportError:  # src/ imported as top-level modules (app.py, tests)
+    from drawdown import max_drawdowns
+
+logger = logging.getLogger(__name__)
+
+# Rows per block when reducing over the memory-mapped matrix
+_BLOCK_ROWS = 4096
+
+
+class PnLView:
+    """
+    Read-only, zero-copy view of a daily PnL matrix backed by a memory-mapped file.
+
+    Exposes index, columns, mean(), cov() and max_drawdowns() like the
+    DataFrame/SparseDailyPnL inputs of PortfolioOptimizer. Pickling a view
+    only sends the store path: the receiving process re-attaches to the
+    same file instead of copying the data.
+    """
+
+    def __init__(self, path: Path, values: np.ndarray, index: pd.Index, columns: pd.Index):
+        self.path = Path(path)
+        self.values = values
+        self.index = index
+        self.columns = columns
+
+    def __reduce__(self):
+        return (attach_pnl_view, (str(self.path),))
+
+    @property
+    def shape(self):
+        return self.values.shape
+
+    def mean(self) -> pd.Series:
+        """Mean daily PnL per strategy."""
+        return pd.Series(self.values.mean(axis=0), index=self.columns)
+
+    def cov(self) -> pd.DataFrame:
+        """Sample covariance (ddof=1), accumulated over row blocks of the mapping."""
+        n_days, n_strategies = self.shape
+        mean = self.values.mean(axis=0)
+        cov = np.zeros((n_strategies, n_strategies))
+        for start in range(0, n_days, _BLOCK_ROWS):
+            block = self.values[start:start + _BLOCK_ROWS] - mean
+            cov += block.T @ block
+        cov /= n_days - 1
+        return pd.DataFrame(cov, index=self.columns, columns=self.columns)
+
+    def max_drawdowns(self) -> pd.Series:
+        """Maximum drawdown (absolute, in money) of each strategy's cumulative PnL."""
+        return pd.Series(max_drawdowns(self.values, _BLOCK_ROWS), index=self.columns)
+
+    def to_frame(self) -> pd.DataFrame:
+        """DataFrame wrapping the read-only values (no copy of the matrix)."""
+        return pd.DataFrame(self.values, index=self.index, columns=self.columns, copy=False)
+
+
+class SharedPnLStore:
+    """Writes a daily PnL matrix, its dates and strategy labels to memory-mappable files."""
+
+    VALUES_FILE = "values.npy"
+    DATES_FILE = "dates.npy"
+    LABELS_FILE = "strategies.json"
+
+    def __init__(self, path: str):
+        """
+        Initializes the store.
+
+        Args:
+            path (str): Store directory
+        """
+        self.path = Path(path)
+
+    @classmethod
+    def create(cls, path: str, daily_pnl: pd.DataFrame) -> "SharedPnLStore":
+        """
+        Writes a daily PnL matrix to a new store.
+
+        Args:
+            path: Store directory (created if needed)
+            daily_pnl: Daily PnL matrix (Date × Strategy)
+
+        Returns:
+            SharedPnLStore: The store
+        """
+        store = cls(path)
+        store.path.mkdir(parents=True, exist_ok=True)
+
+        values = np.lib.format.open_memmap(
+            store.path / cls.VALUES_FILE, mode="w+", dtype=np.float64, shape=daily_pnl.shape
+        )
+        values[:] = daily_pnl.to_numpy(dtype=float)
+        values.flush()
+        del values
+
+        np.save(store.path / cls.DATES_FILE, np.asarray(pd.to_datetime(daily_pnl.index), dtype="datetime64[D]"))
+        with open(store.path / cls.LABELS_FILE, "w", encoding="utf-8") as f:
+            json.dump(daily_pnl.columns.tolist(), f, ensure_ascii=False)
+
+        logger.info(f"✅ Shared PnL store created: {store.path} {daily_pnl.shape}")
+        return store
+
+    def attach(self) -> PnLView:
+        """
+        Opens the store as read-only NumPy views (no copy of the matrix).
+
+        Returns:
+            PnLView: View over the memory-mapped matrix
+        """
+        values = np.load(self.path / self.VALUES_FILE, mmap_mode="r")
+        dates = np.load(self.path / self.DATES_FILE)
+        with open(self.path / self.LABELS_FILE, "r", encoding="utf-8") as f:
+            labels = json.load(f)
+
+        return PnLView(
+            self.path,
+            values,
+            index=pd.DatetimeIndex(dates, name="Date"),
+            columns=pd.Index(labels, name="Strategy name (Global)")
+        )
+
+
+def attach_pnl_view(path: str) -> PnLView:
+    """Attaches to an existing store (used when a PnLView is unpickled in a worker)."""
+    return SharedPnLStore(path).attach()
@@ -0,0 +1,113 @@
+"""
+SparseDailyPnL: Sparse (Date × Strategy) PnL matrix for sparsely-trading universes.
+"""
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class SparseDailyPnL:
+    """
+    Daily PnL matrix stored as a CSC sparse matrix (days without trades are zero).
+
+    Exposes the parts of the DataFrame interface the optimizer relies on
+    (index, columns, mean(), cov()), computed directly from the non-zero
+    cells so memory and covariance time scale with the number of
+    (day, strategy) cells that actually traded.
+    """
+
+    def __init__(self, matrix, index, columns):
+        """
+        Initializes the sparse matrix.
+
+        Args:
+            matrix: scipy.sparse matrix of shape (days, strategies)
+            index: Date labels (one per row)
+            columns: Strategy labels (one per column)
+        """
+        self.matrix = sparse.csc_matrix(matrix, dtype=float)
+        self.index = pd.Index(index, name="Date")
+        self.columns = pd.Index(columns, name="Strategy name (Global)")
+
+        if self.matrix.shape != (len(self.index), len(self.columns)):
+            raise ValueError("Matrix shape does not match index and columns.")
+
+    @classmethod
+    def from_dense(cls, daily_pnl: pd.DataFrame) -> "SparseDailyPnL":
+        """Builds the sparse matrix from a dense Date × Strategy DataFrame."""
+        return cls(sparse.csc_matrix(daily_pnl.to_numpy(dtype=float)), daily_pnl.index, daily_pnl.columns)
+
+    @classmethod
+    def from_long(cls, pnl: pd.Series) -> "SparseDailyPnL":
+        """
+        Builds the sparse matrix from (Date, Strategy) → PnL sums, without a dense pivot.
+
+        Args:
+            pnl: Series indexed by a (Date, Strategy) MultiIndex
+        """
+        day_codes, days = pd.factorize(pnl.index.get_level_values(0), sort=True)
+        strategy_codes, strategies = pd.factorize(pnl.index.get_level_values(1), sort=True)
+
+        matrix = sparse.coo_matrix(
+            (pnl.to_numpy(dtype=float), (day_codes, strategy_codes)),
+            shape=(len(days), len(strategies))
+        )
+        index = days.date if isinstance(days, pd.DatetimeIndex) else days
+        return cls(matrix, index, strategies)
+
+    @property
+    def shape(self):
+        return self.matrix.shape
+
+    @property
+    def nnz(self) -> int:
+        return self.matrix.nnz
+
+    def mean(self) -> pd.Series:
+        """Mean daily PnL per strategy (zero days included)."""
+        n_days = self.shape[0]
+        means = np.asarray(self.matrix.sum(axis=0)).ravel() / n_days
+        return pd.Series(means, index=self.columns)
+
+    def cov(self) -> pd.DataFrame:
+        """
+        Sample covariance (ddof=1), same as DataFrame.cov() on the dense matrix.
+
+        Uses cov = (XᵀX − n·μμᵀ) / (n − 1), where XᵀX is a sparse product.
+        """
+        n_days = self.shape[0]
+        mean = self.mean().to_numpy()
+        gram = (self.matrix.T @ self.matrix).toarray()
+        cov = (gram - n_days * np.outer(mean, mean)) / (n_days - 1)
+        return pd.DataFrame(cov, index=self.columns, columns=self.columns)
+
+    def max_drawdowns(self) -> pd.Series:
+        """
+        Maximum drawdown (absolute, in money) of each strategy's cumulative PnL.
+
+        The cumulative PnL only changes on non-zero cells, so each column is
+        scanned over its non-zero entries only.
+        """
+        result = np.zeros(self.shape[1])
+        indptr, rows, data = self.matrix.indptr, self.matrix.indices, self.matrix.data
+
+        for j in range(self.shape[1]):
+            start, end = indptr[j], indptr[j + 1]
+            if start == end:
+                continue
+            order = np.argsort(rows[start:end], kind="stable")
+            cum = np.cumsum(data[start:end][order])
+            if rows[start:end].min() > 0:
+                # Flat at zero before the first trade
+                cum = np.concatenate(([0.0], cum))
+            result[j] = -(cum - np.maximum.accumulate(cum)).min()
+
+        return pd.Series(result, index=self.columns)
+
+    def to_dense(self) -> pd.DataFrame:
+        """Materializes the dense DataFrame."""
+        return pd.DataFrame(self.matrix.toarray(), index=self.index, columns=self.columns)
@@ -0,0 +1,89 @@
+"""
+Timestamps: Fast, deterministic parsing of trade timestamps ("Open time").
+"""
+
+import pandas as pd
+import numpy as np
+from typing import Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Number of values inspected when sniffing the format
+SNIFF_SAMPLE_SIZE = 256
+
+_DAYFIRST_DATES = ["%d.%m.%Y", "%d/%m/%Y", "%d-%m-%Y"]
+_MONTHFIRST_DATES = ["%m.%d.%Y", "%m/%d/%Y", "%m-%d-%Y"]
+_YEARFIRST_DATES = ["%Y.%m.%d", "%Y-%m-%d", "%Y/%m/%d"]
+_TIMES = [" %H:%M:%S", " %H:%M", " %H:%M:%S.%f", "T%H:%M:%S", "T%H:%M:%S.%f", ""]
+
+
+def _candidate_formats(dayfirst: bool):
+    """Yields candidate formats, ordered by the day/month preference."""
+    date_formats = _YEARFIRST_DATES + (
+        _DAYFIRST_DATES + _MONTHFIRST_DATES if dayfirst else _MONTHFIRST_DATES + _DAYFIRST_DATES
+    )
+    for date_format in date_formats:
+        for time_format in _TIMES:
+            yield date_format + time_format
+
+
+def sniff_datetime_format(values: pd.Series, dayfirst: bool = True) -> Optional[str]:
+    """
+    Finds an explicit strftime format matching a small sample of the values.
+
+    Args:
+        values: Timestamp strings
+        dayfirst: Prefer day-first formats when the sample is ambiguous
+
+    Returns:
+        str or None: The first candidate format that parses the whole sample
+    """
+    sample = values.dropna()
+    if sample.empty:
+        return None
+
+    # Spread the sample over the column instead of only taking the head
+    if len(sample) > SNIFF_SAMPLE_SIZE:
+        positions = np.linspace(0, len(sample) - 1, SNIFF_SAMPLE_SIZE).astype(int)
+        sample = sample.iloc[positions]
+    sample = sample.astype(str).str.strip()
+
+    for fmt in _candidate_formats(dayfirst):
+        try:
+            pd.to_datetime(sample, format=fmt)
+        except (ValueError, TypeError):
+            continue
+        return fmt
+
+    return None
+
+
+def parse_open_time(values: pd.Series, dayfirst: bool = True, fmt: Optional[str] = None) -> pd.Series:
+    """
+    Parses timestamps with an explicit format, falling back to inference.
+
+    Columns that are already datetime64 are returned unchanged, so the
+    parse happens once per pipeline no matter how many modules call this.
+
+    Args:
+        values: Timestamp column (strings or datetimes)
+        dayfirst: Day-first preference for ambiguous dates
+        fmt: Known format; sniffed from a sample when None
+
+    Returns:
+        pd.Series: datetime64 series
+    """
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values
+
+    if fmt is None:
+        fmt = sniff_datetime_format(values, dayfirst=dayfirst)
+
+    if fmt is not None:
+        try:
+            return pd.to_datetime(values, format=fmt)
+        except (ValueError, TypeError):
+            logger.warning(f"Timestamps do not all match '{fmt}', falling back to inference")
+
+    return pd.to_datetime(values, dayfirst=dayfirst)
@@ -0,0 +1,216 @@
+"""
+WalkForwardOptimizer: Out-of-sample walk-forward engine on top of PortfolioOptimizer.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from typing import Callable, Dict, List, Tuple, Union
+import logging
+
+try:
+    from .optimizer import PortfolioOptimizer
+except ImportError:  # src/ imported as top-level modules (app.py, tests)
+    from optimizer import PortfolioOptimizer
+
+logger = logging.getLogger(__name__)
+
+
+class RollingMoments:
+    """
+    Mean and covariance of a sliding row window, updated incrementally.
+
+    Keeps the sums S1 = Σx and S2 = Σxxᵀ over the rows in the window, so
+    moving the window costs O(k·N²) for the k rows that enter or leave
+    instead of O(T·N²) for a full recomputation. Rows are shifted by a
+    fixed reference before accumulating, which keeps S2 - S1·S1ᵀ/n well
+    conditioned (the covariance does not depend on the shift).
+    """
+
+    def __init__(self, values: np.ndarray):
+        self.values = np.asarray(values, dtype=float)
+        self.shift = self.values.mean(axis=0)
+        self.start = 0
+        self.stop = 0
+        num_assets = self.values.shape[1]
+        self.s1 = np.zeros(num_assets)
+        self.s2 = np.zeros((num_assets, num_assets))
+
+    def _accumulate(self, start: int, stop: int, sign: float):
+        if stop > start:
+            block = self.values[start:stop] - self.shift
+            self.s1 += sign * block.sum(axis=0)
+            self.s2 += sign * (block.T @ block)
+
+    def move_to(self, start: int, stop: int):
+        """Moves the window to rows [start, stop)."""
+        if start >= self.stop or stop <= self.start:  # no overlap: rebuild
+            self.s1[:] = 0.0
+            self.s2[:] = 0.0
+            self._accumulate(start, stop, 1.0)
+        else:
+            self._accumulate(self.start, min(start, self.stop), -1.0)
+            self._accumulate(stop, self.stop, -1.0)
+            self._accumulate(start, self.start, 1.0)
+            self._accumulate(max(self.stop, start), stop, 1.0)
+        self.start, self.stop = start, stop
+
+    def mean(self) -> np.ndarray:
+        return self.s1 / (self.stop - self.start) + self.shift
+
+    def cov(self) -> np.ndarray:
+        n = self.stop - self.start
+        return (self.s2 - np.outer(self.s1, self.s1) / n) / (n - 1)
+
+
+def _run_window_chunk(daily_pnl, windows: List[Tuple[int, int, int, int]], params: Dict) -> List[Dict]:
+    """
+    Optimizes a contiguous chunk of walk-forward windows (process-pool worker).
+
+    The moments slide incrementally from one window to the next and each
+    solve is warm-started from the previous window's weights.
+    """
+    values = np.asarray(daily_pnl.values, dtype=float)
+    columns = daily_pnl.columns
+    moments = RollingMoments(values)
+    periods = params["periods_per_year"]
+
+    results = []
+    warm_start = None
+    for train_start, train_stop, test_start, test_stop in windows:
+        moments.move_to(train_start, train_stop)
+
+        optimizer = PortfolioOptimizer(
+            pd.DataFrame(values[train_start:train_stop], columns=columns),
+            risk_free_rate=params["risk_free_rate"],
+            solver=params["solver"]
+        )
+        optimizer.ann_mean = moments.mean() * periods
+        optimizer.ann_cov = moments.cov() * periods
+        weights = optimizer.optimize(warm_start=warm_start)
+        multipliers = optimizer.calculate_multipliers(weights, params["capital_inicial"],
+                                                      params["risk_tolerance_dd"])
+        multipliers = np.array([multipliers[c] for c in columns])
+
+        results.append({
+            "weights": weights,
+            "multipliers": multipliers,
+            "oos_pnl": values[test_start:test_stop] @ multipliers,
+            "status": optimizer.solver_info["status"],
+        })
+        warm_start = weights
+
+    return results
+
+
+class WalkForwardOptimizer:
+    """Rolling or expanding walk-forward optimization with stitched out-of-sample results."""
+
+    MODES = ("rolling", "expanding")
+
+    def __init__(self, daily_pnl: pd.DataFrame, train_size: int = 252, test_size: int = 21,
+                 mode: str = "rolling", risk_free_rate: float = 0.0,
+                 solver: Union[str, Callable] = "qp", periods_per_year: int = 252):
+        """
+        Initializes the walk-forward engine.
+
+        Args:
+            daily_pnl (pd.DataFrame): Daily PnL matrix (Date × Strategy), dense
+                or a memory-mapped PnLView (workers re-attach to the file)
+            train_size (int): Training window length in rows (minimum length
+                in expanding mode)
+            test_size (int): Out-of-sample window length in rows (also the step)
+            mode (str): "rolling" (fixed-length train window) or "expanding"
+            risk_free_rate (float): Risk-free rate for Sharpe Ratio
+            solver: PortfolioOptimizer backend; callables must be picklable
+                (module-level) to run with a process pool
+            periods_per_year (int): Rows per year used to annualize the moments
+        """
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown walk-forward mode: {mode}. Use one of {self.MODES}.")
+        if train_size < 2 or test_size < 1:
+            raise ValueError("train_size must be at least 2 and test_size at least 1.")
+
+        self.daily_pnl = daily_pnl
+        self.train_size = train_size
+        self.test_size = test_size
+        self.mode = mode
+        self.risk_free_rate = risk_free_rate
+        self.solver = solver
+        self.periods_per_year = periods_per_year
+
+    def windows(self) -> List[Tuple[int, int, int, int]]:
+        """
+        Row positions of every window.
+
+        Returns:
+            List: (train_start, train_stop, test_start, test_stop) tuples; the
+                last test window is truncated at the end of the history
+        """
+        num_days = len(self.daily_pnl.index)
+        windows = []
+        for test_start in range(self.train_size, num_days, self.test_size):
+            train_start = test_start - self.train_size if self.mode == "rolling" else 0
+            windows.append((train_start, test_start, test_start, min(test_start + self.test_size, num_days)))
+        return windows
+
+    def run(self, capital_inicial: float, risk_tolerance_dd: float = 0.25,
+            max_workers: int = None) -> Dict:
+        """
+        Runs the walk-forward optimization.
+
+        Each window is optimized on its train rows and sized with
+        calculate_multipliers; the multipliers are then applied to the
+        following test rows, so every point of the stitched curve is out of
+        sample.
+
+        Args:
+            capital_inicial: Total capital
+            risk_tolerance_dd: DD tolerance (e.g., 0.25 = 25%)
+            max_workers: Process pool size; windows are split in contiguous
+                chunks that slide their moments independently (None/1: in-process)
+
+        Returns:
+            Dict: equity and oos_pnl (Series), weights and multipliers
+                (DataFrame indexed by test start date), status (list) and
+                oos_start (YYYY-MM-DD, for generate_comparison_chart)
+        """
+        windows = self.windows()
+        if not windows:
+            raise ValueError(f"History too short for train_size={self.train_size}.")
+
+        params = {
+            "risk_free_rate": self.risk_free_rate,
+            "solver": self.solver,
+            "periods_per_year": self.periods_per_year,
+            "capital_inicial": capital_inicial,
+            "risk_tolerance_dd": risk_tolerance_dd,
+        }
+
+        if max_workers is not None and max_workers > 1 and len(windows) > 1:
+            bounds = np.linspace(0, len(windows), min(max_workers, len(windows)) + 1).astype(int)
+            chunks = [windows[lo:hi] for lo, hi in zip(bounds[:-1], bounds[1:])]
+            with ProcessPoolExecutor(max_workers=len(chunks)) as pool:
+                futures = [pool.submit(_run_window_chunk, self.daily_pnl, chunk, params) for chunk in chunks]
+                results = [r for f in futures for r in f.result()]
+        else:
+            results = _run_window_chunk(self.daily_pnl, windows, params)
+
+        index = pd.Index(self.daily_pnl.index)
+        columns = self.daily_pnl.columns
+        starts = index[[w[2] for w in windows]]
+        oos_index = index[windows[0][2]:windows[-1][3]]
+
+        oos_pnl = pd.Series(np.concatenate([r["oos_pnl"] for r in results]), index=oos_index, name="oos_pnl")
+        equity = capital_inicial + oos_pnl.cumsum()
+
+        logger.info(f"✅ Walk-forward completed: {len(windows)} windows, {len(oos_index)} OOS days")
+
+        return {
+            "equity": equity,
+            "oos_pnl": oos_pnl,
+            "weights": pd.DataFrame(np.vstack([r["weights"] for r in results]), index=starts, columns=columns),
+            "multipliers": pd.DataFrame(np.vstack([r["multipliers"] for r in results]), index=starts, columns=columns),
+            "status": [r["status"] for r in results],
+            "oos_start": pd.Timestamp(oos_index[0]).strftime("%Y-%m-%d"),
+        }
@@ -22,6 +22,7 @@ logger = logging.getLogger(__name__)
 sys.path.insert(0, str(Path(__file__).parent / "brp_portfolio_optimizer" / "src"))
 
 from data_processor import DataProcessor
+from data_cache import PreparedDataCache, OptimizationCache
 from optimizer import PortfolioOptimizer
 from metrics import MetricsCalculator
 from reports import ReportGenerator
@@ -42,21 +43,21 @@ def main():
     
     # 1. CARREGAMENTO DE DADOS
     logger.info("\n[ETAPA 1] Carregando dados...")
-    processor = DataProcessor(csv_file)
+    processor = DataProcessor(csv_file, cache=PreparedDataCache())
     
     if not processor.load_and_validate():
         logger.error("Falha na validação do arquivo")
         return False
     
     daily_pnl, original_lots, metadata = processor.prepare_data()
-    original_df = processor.get_original_df()
+    original_df = processor.get_original_df(copy=False)
     
     logger.info(f"✓ {metadata['num_trades']} trades de {metadata['num_strategies']} estratégias")
     logger.info(f"✓ Período: {metadata['date_range'][0].date()} → {metadata['date_range'][1].date()}")
     
     # 2. OTIMIZAÇÃO
     logger.info("\n[ETAPA 2] Otimizando portfólio...")
-    optimizer = PortfolioOptimizer(daily_pnl, risk_free_rate=0.0)
+    optimizer = PortfolioOptimizer(daily_pnl, risk_free_rate=0.0, result_cache=OptimizationCache())
     optimizer.calculate_annual_metrics()
     optimal_weights = optimizer.optimize()
     
@@ -73,26 +74,32 @@ def main():
         capital_inicial,
         risk_tolerance_dd
     )
+    # Lotes finais na grade do broker (lote mínimo, passo e máximo)
+    final_lots = optimizer.allocate_lots(
+        optimal_weights,
+        original_lots,
+        capital_inicial,
+        risk_tolerance_dd
+    )
+    # Multiplicadores dos lotes realmente operados (lote final / lote original)
+    deployed_multipliers = dict(
+        zip(daily_pnl.columns, optimizer.lot_allocation["multipliers"].tolist())
+    )
     
     logger.info("✓ Multiplicadores de lote:")
-    for strategy, mult in sorted(multipliers.items(), key=lambda x: x[1], reverse=True):
+    for strategy, mult in sorted(deployed_multipliers.items(), key=lambda x: x[1], reverse=True):
         original_lote = original_lots[strategy]
-        new_lote = round(original_lote * mult, 2)
-        logger.info(f"  - {strategy}: {original_lote} → {new_lote} (×{mult:.2f})")
+        new_lote = final_lots[strategy]
+        logger.info(f"  - {strategy}: {original_lote} → {new_lote} (×{mult:.2f}, contínuo ×{multipliers[strategy]:.2f})")
     
-    # 4. CRIAR TRADES OTIMIZADOS
+    # 4. TRADES OTIMIZADOS (derivados sob demanda: P/L × multiplicador)
     logger.info("\n[ETAPA 4] Criando trades otimizados...")
-    trades_original = original_df.copy()
-    trades_optimized = original_df.copy()
-    trades_optimized['Multiplier'] = trades_optimized['Strategy name (Global)'].map(multipliers)
-    trades_optimized['Profit/Loss (Global)'] = (
-        trades_optimized['Profit/Loss (Global)'] * trades_optimized['Multiplier']
-    )
+    trades_original = original_df
     
     # 5. CALCULAR MÉTRICAS
     logger.info("\n[ETAPA 5] Calculando métricas...")
     calc_original = MetricsCalculator(trades_original, capital_inicial)
-    calc_optimized = MetricsCalculator(trades_optimized, capital_inicial)
+    calc_optimized = MetricsCalculator(trades_original, capital_inicial, multipliers=deployed_multipliers)
     
     metrics_original = calc_original.calculate_all_metrics()
     metrics_optimized = calc_optimized.calculate_all_metrics()
@@ -125,7 +132,7 @@ def main():
                 'Estratégia': strat,
                 'Peso (%)': f"{peso:.2f}%",
                 'Lote Original': original_lots[strat],
-                'Lote Final (MT5)': round(original_lots[strat] * multipliers[strat], 2)
+                'Lote Final (MT5)': final_lots[strat]
             })
     
     mt5_df = pd.DataFrame(mt5_data).sort_values(by='Lote Final (MT5)', ascending=False)
@@ -146,7 +153,7 @@ def main():
         metrics_df,
         mt5_df,
         trades_original,
-        trades_optimized
+        calc_optimized.get_trades()
     )
     logger.info(f"✓ Relatório Excel: {excel_path}")
     
@@ -7,14 +7,30 @@ import pytest
 import pandas as pd
 import numpy as np
 from pathlib import Path
+import os
 import sys
 
 # Adicionar src ao path
 sys.path.insert(0, str(Path(__file__).parent.parent / "brp_portfolio_optimizer" / "src"))
 
-from data_processor import DataProcessor
+from data_processor import DataProcessor, DailyAggregate
 from optimizer import PortfolioOptimizer
 from metrics import MetricsCalculator
+from data_cache import PreparedDataCache, OptimizationCache
+from timestamps import sniff_datetime_format, parse_open_time
+from sparse_pnl import SparseDailyPnL
+from shared_store import SharedPnLStore
+from qp_solver import solve_qp_active_set
+from hrp import hrp_weights
+from drawdown import max_drawdowns
+from multistart import calmar_objective
+from cardinality import subset_max_sharpe
+from walk_forward import WalkForwardOptimizer, RollingMoments
+from resampling import bootstrap_counts, bootstrap_indices, batched_moments
+from monte_carlo import simulate_drawdowns
+from lot_allocation import allocate_lots
+from covariance import (CovarianceEstimator, SampleCovariance, LedoitWolfCovariance,
+                        ConstantCorrelationCovariance, EWMACovariance, _ShrinkageCovariance)
 
 
 class TestDataProcessor:
@@ -49,6 +65,54 @@ class TestDataProcessor:
         processor = DataProcessor("nonexistent.csv")
         assert processor.load_and_validate() == False
     
+    def test_preflight_rejects_before_parsing(self, tmp_path, monkeypatch):
+        """Extensão, tamanho e cabeçalho são checados sem ler o corpo do arquivo."""
+        def fail_read_csv(*args, **kwargs):
+            raise AssertionError("read_csv called by the pre-flight check")
+
+        monkeypatch.setattr(pd, "read_csv", fail_read_csv)
+
+        txt_file = tmp_path / "trades.txt"
+        txt_file.write_text("Open time,Strategy name (Global),Profit/Loss (Global),Size\n")
+        processor = DataProcessor(str(txt_file))
+        assert processor.load_and_validate() == False
+        assert "Extension" in processor.validation_error
+
+        bad_header = tmp_path / "bad.csv"
+        bad_header.write_text("Open time,Size\n01.01.2024 10:00:00,0.1\n")
+        processor = DataProcessor(str(bad_header))
+        assert processor.load_and_validate() == False
+        assert "Missing columns" in processor.validation_error
+
+        big_file = tmp_path / "big.csv"
+        big_file.write_text("Open time,Strategy name (Global),Profit/Loss (Global),Size\n" + "x" * 2048)
+        assert DataProcessor(str(big_file)).preflight(max_size_mb=0.001) == False
+
+    def test_semicolon_delimiter(self, tmp_path, sample_df):
+        """Arquivos com ';' e colunas extras são lidos só com as colunas necessárias."""
+        csv_file = tmp_path / "semicolon.csv"
+        sample_df.assign(Comment='x').to_csv(csv_file, sep=';', index=False)
+
+        processor = DataProcessor(str(csv_file))
+        assert processor.load_and_validate()
+        assert processor.delimiter == ';'
+        assert list(processor.df.columns) == list(sample_df.columns)
+        assert processor.df['Profit/Loss (Global)'].dtype == np.float64
+
+    def test_padded_header(self, tmp_path, sample_df):
+        """Cabeçalho com espaços: passa no pre-flight e carrega com os nomes canônicos."""
+        csv_file = tmp_path / "padded.csv"
+        sample_df.rename(columns=lambda c: f" {c} ").to_csv(csv_file, index=False)
+
+        processor = DataProcessor(str(csv_file))
+        assert processor.preflight()
+        assert processor.load_and_validate()
+        assert list(processor.df.columns) == list(sample_df.columns)
+        daily_pnl, _, _ = processor.prepare_data()
+
+        stream_pnl, _, _ = DataProcessor(str(csv_file)).prepare_data_streaming()
+        pd.testing.assert_frame_equal(stream_pnl, daily_pnl)
+
     def test_prepare_data(self, sample_csv):
         """Testa preparação de dados."""
         processor = DataProcessor(sample_csv)
@@ -62,6 +126,211 @@ class TestDataProcessor:
         assert metadata['num_strategies'] > 0
 
 
+class TestStreamingIngestion:
+    """Testes para a leitura em chunks (prepare_data_streaming)."""
+
+    @pytest.fixture
+    def mt5_csv(self, tmp_path):
+        """Cria um CSV no formato de data do MT5 (dia primeiro)."""
+        rng = np.random.default_rng(42)
+        n = 400
+        times = pd.Timestamp('2024-01-01 09:00') + pd.to_timedelta(rng.integers(0, 90 * 24, n), unit='h')
+        df = pd.DataFrame({
+            'Open time': times.strftime('%d.%m.%Y %H:%M:%S'),
+            'Strategy name (Global)': rng.choice(['EA 1', 'EA 2', 'EA 3', 'EA 4'], n),
+            'Profit/Loss (Global)': rng.normal(10, 200, n).round(2),
+            'Size': rng.choice([0.01, 0.05, 0.1, 0.2], n),
+        })
+        csv_file = tmp_path / "mt5_trades.csv"
+        df.to_csv(csv_file, index=False)
+        return str(csv_file)
+
+    def test_streaming_matches_prepare_data(self, mt5_csv):
+        """A leitura em chunks gera o mesmo resultado da leitura completa."""
+        processor = DataProcessor(mt5_csv)
+        assert processor.load_and_validate()
+        daily_pnl, original_lots, metadata = processor.prepare_data()
+
+        stream_pnl, stream_lots, stream_meta = DataProcessor(mt5_csv).prepare_data_streaming(chunksize=37)
+
+        pd.testing.assert_frame_equal(stream_pnl, daily_pnl)
+        pd.testing.assert_series_equal(stream_lots, original_lots)
+        assert stream_meta['num_trades'] == metadata['num_trades']
+        assert stream_meta['date_range'] == metadata['date_range']
+        assert stream_meta['original_df'] is None
+
+    def test_streaming_missing_columns(self, tmp_path):
+        """Testa erro quando faltam colunas obrigatórias."""
+        csv_file = tmp_path / "bad.csv"
+        pd.DataFrame({'Open time': ['01.01.2024 10:00:00']}).to_csv(csv_file, index=False)
+        with pytest.raises(ValueError):
+            DataProcessor(str(csv_file)).prepare_data_streaming()
+
+    def test_append_matches_full_rebuild(self, mt5_csv, tmp_path):
+        """Estado salvo + delta de trades novos = reprocessamento completo."""
+        trades = pd.read_csv(mt5_csv)
+        history_csv = tmp_path / "history.csv"
+        trades.iloc[:300].to_csv(history_csv, index=False)
+
+        state_file = tmp_path / "state.npz"
+        DataProcessor(str(history_csv)).build_state().save(state_file)
+
+        state = DailyAggregate.load(state_file)
+        state.append(trades.iloc[300:])
+        daily_pnl, original_lots, metadata = state.to_outputs()
+
+        full_pnl, full_lots, full_meta = DataProcessor(mt5_csv).prepare_data_streaming()
+        pd.testing.assert_frame_equal(daily_pnl, full_pnl)
+        pd.testing.assert_series_equal(original_lots, full_lots)
+        assert metadata['num_trades'] == full_meta['num_trades']
+        assert metadata['date_range'] == full_meta['date_range']
+
+    def test_incremental_update_order(self, mt5_csv):
+        """Deltas com dias novos ou já vistos dão o mesmo estado, sem chaves repetidas."""
+        trades = pd.read_csv(mt5_csv)
+        trades = trades.iloc[np.argsort(parse_open_time(trades['Open time']).values, kind='stable')]
+        full_pnl, full_lots, _ = DailyAggregate().update(trades).to_outputs()
+
+        for ordered in (trades, trades.sample(frac=1, random_state=0)):
+            state = DailyAggregate()
+            for lo in range(0, len(ordered), 100):
+                state.update(ordered.iloc[lo:lo + 100])
+            assert state.pnl.index.is_unique and state.size_counts.index.is_unique
+            daily_pnl, original_lots, _ = state.to_outputs()
+            pd.testing.assert_frame_equal(daily_pnl, full_pnl)
+            pd.testing.assert_series_equal(original_lots, full_lots)
+
+    def test_directory_ingestion(self, mt5_csv, tmp_path):
+        """Vários arquivos são agregados em paralelo; arquivo inválido é reportado."""
+        trades = pd.read_csv(mt5_csv)
+        accounts = tmp_path / "accounts"
+        accounts.mkdir()
+        for i, start in enumerate(range(0, len(trades), 150)):
+            trades.iloc[start:start + 150].to_csv(accounts / f"account_{i}.csv", index=False)
+        pd.DataFrame({'Open time': ['01.01.2024 10:00:00']}).to_csv(accounts / "broken.csv", index=False)
+
+        processor = DataProcessor(str(accounts))
+        daily_pnl, original_lots, metadata = processor.prepare_data_streaming(max_workers=2)
+        full_pnl, full_lots, _ = DataProcessor(mt5_csv).prepare_data_streaming()
+
+        pd.testing.assert_frame_equal(daily_pnl, full_pnl)
+        pd.testing.assert_series_equal(original_lots, full_lots)
+        assert metadata['num_trades'] == len(trades)
+        assert list(metadata['failed_files']) == [str(accounts / "broken.csv")]
+
+        glob_pnl, _, _ = DataProcessor(str(accounts / "account_*.csv")).prepare_data_streaming(max_workers=1)
+        pd.testing.assert_frame_equal(glob_pnl, full_pnl)
+
+    def test_compact_schema(self, mt5_csv):
+        """O esquema compacto gera as mesmas matrizes com tipos menores."""
+        processor = DataProcessor(mt5_csv)
+        processor.load_and_validate()
+        daily_pnl, original_lots, metadata = processor.prepare_data()
+
+        compact = DataProcessor(mt5_csv, compact=True, float32_pnl=True)
+        assert compact.load_and_validate()
+        compact_pnl, compact_lots, compact_meta = compact.prepare_data()
+
+        pd.testing.assert_frame_equal(compact_pnl, daily_pnl, rtol=1e-4)
+        pd.testing.assert_series_equal(compact_lots, original_lots)
+
+        trades = compact_meta['original_df']
+        assert isinstance(trades['Strategy name (Global)'].dtype, pd.CategoricalDtype)
+        assert trades['Month'].dtype == np.int32
+        assert trades['Week'].dtype == np.int32
+        assert trades['Profit/Loss (Global)'].dtype == np.float32
+
+        full = MetricsCalculator(metadata['original_df'], 100000).calculate_all_metrics()
+        small = MetricsCalculator(trades, 100000).calculate_all_metrics()
+        assert all(isinstance(v, (int, float)) for v in small.values())
+        for key in ['Total Trades', 'Days Operating', 'Avg Monthly Profit', 'Avg Weekly Profit', 'Sharpe Ratio']:
+            assert np.isclose(small[key], full[key], rtol=1e-3)
+
+    def test_cache_hit_skips_csv(self, mt5_csv, tmp_path, monkeypatch):
+        """Um segundo carregamento do mesmo arquivo vem do cache."""
+        cache = PreparedDataCache(cache_dir=tmp_path / "cache")
+        daily_pnl, original_lots, metadata = DataProcessor(mt5_csv, cache=cache).prepare_data_streaming()
+
+        def fail_read_csv(*args, **kwargs):
+            raise AssertionError("read_csv called on a cache hit")
+
+        monkeypatch.setattr(pd, "read_csv", fail_read_csv)
+        cached_pnl, cached_lots, cached_meta = DataProcessor(mt5_csv, cache=cache).prepare_data_streaming()
+
+        pd.testing.assert_frame_equal(cached_pnl, daily_pnl)
+        pd.testing.assert_series_equal(cached_lots, original_lots)
+        assert cached_meta['date_range'] == metadata['date_range']
+        assert cached_meta['num_trades'] == metadata['num_trades']
+
+    @pytest.mark.parametrize("compact", [False, True])
+    def test_prepare_data_cache_hit(self, mt5_csv, tmp_path, monkeypatch, compact):
+        """load_and_validate + prepare_data: o segundo carregamento não lê o CSV nem pivota."""
+        cache = PreparedDataCache(cache_dir=tmp_path / "cache")
+        first = DataProcessor(mt5_csv, cache=cache, compact=compact)
+        assert first.load_and_validate()
+        daily_pnl, original_lots, metadata = first.prepare_data()
+
+        def fail(*args, **kwargs):
+            raise AssertionError("CSV parsed on a cache hit")
+
+        monkeypatch.setattr(pd, "read_csv", fail)
+        monkeypatch.setattr(pd.DataFrame, "pivot_table", fail)
+        again = DataProcessor(mt5_csv, cache=cache, compact=compact)
+        assert again.load_and_validate()
+        cached_pnl, cached_lots, cached_meta = again.prepare_data()
+
+        pd.testing.assert_frame_equal(cached_pnl, daily_pnl)
+        pd.testing.assert_series_equal(cached_lots, original_lots)
+        pd.testing.assert_frame_equal(again.get_original_df(), first.get_original_df())
+        pd.testing.assert_frame_equal(cached_meta['original_df'], metadata['original_df'])
+        assert set(cached_meta) == set(metadata)
+        assert cached_meta['failed_files'] == {}
+
+        # A entrada do modo streaming tem as mesmas chaves de metadata numa hit
+        monkeypatch.undo()
+        DataProcessor(mt5_csv, cache=cache).prepare_data_streaming()
+        _, _, stream_meta = DataProcessor(mt5_csv, cache=cache).prepare_data_streaming()
+        assert stream_meta['failed_files'] == {} and stream_meta['original_df'] is None
+
+    def test_cache_lru_eviction(self, mt5_csv, tmp_path):
+        """O cache respeita o limite de tamanho removendo as entradas mais antigas."""
+        cache = PreparedDataCache(cache_dir=tmp_path / "cache", max_size_mb=0.01)
+        daily_pnl, original_lots, metadata = DataProcessor(mt5_csv).prepare_data_streaming()
+        for i in range(5):
+            cache.put(f"key{i}", daily_pnl, original_lots, metadata)
+
+        total = sum(p.stat().st_size for p in (tmp_path / "cache").glob("*.npz"))
+        assert total <= cache.max_bytes
+        assert cache.get("key4") is not None
+        assert cache.get("key0") is None
+
+
+class TestTimestamps:
+    """Testes para o parsing de datas de 'Open time'."""
+
+    def test_sniff_formats(self):
+        """Detecta os formatos mais comuns de exportação do MT5."""
+        assert sniff_datetime_format(pd.Series(['2024.01.15 10:30:00'])) == '%Y.%m.%d %H:%M:%S'
+        assert sniff_datetime_format(pd.Series(['2024-01-15'])) == '%Y-%m-%d'
+        assert sniff_datetime_format(pd.Series(['15/01/2024 10:30'])) == '%d/%m/%Y %H:%M'
+        assert sniff_datetime_format(pd.Series(['not a date'])) is None
+
+    def test_dayfirst_preference(self):
+        """Datas ambíguas são lidas com o dia primeiro."""
+        parsed = parse_open_time(pd.Series(['02.03.2024 10:00:00']))
+        assert parsed.iloc[0] == pd.Timestamp('2024-03-02 10:00:00')
+
+    def test_parse_once(self, monkeypatch):
+        """Colunas já convertidas não são reprocessadas."""
+        values = pd.Series(pd.date_range('2024-01-01', periods=5))
+
+        def fail_to_datetime(*args, **kwargs):
+            raise AssertionError("to_datetime called on a datetime column")
+
+        monkeypatch.setattr(pd, "to_datetime", fail_to_datetime)
+        assert parse_open_time(values) is values
+
+
 class TestPortfolioOptimizer:
     """Testes para o módulo PortfolioOptimizer."""
     
@@ -97,6 +366,94 @@ class TestPortfolioOptimizer:
         assert np.all(weights >= 0)  # Sem short
         assert np.all(weights <= 1)  # Sem alavancagem
     
+    def test_sharpe_gradient(self, sample_daily_pnl):
+        """O gradiente analítico confere com diferenças finitas."""
+        from scipy.optimize import check_grad
+
+        optimizer = PortfolioOptimizer(sample_daily_pnl)
+        ann_mean, ann_cov = optimizer.calculate_annual_metrics()
+        w = np.array([0.2, 0.5, 0.3])
+        error = check_grad(
+            PortfolioOptimizer._negative_sharpe,
+            PortfolioOptimizer._negative_sharpe_grad,
+            w, ann_mean, ann_cov, 0.0
+        )
+        assert error < 1e-5 * max(1.0, np.abs(PortfolioOptimizer._negative_sharpe_grad(w, ann_mean, ann_cov)).max())
+
+    def test_qp_backend_matches_slsqp(self, sample_daily_pnl):
+        """O backend QP atinge Sharpe pelo menos igual ao SLSQP."""
+        shifted = sample_daily_pnl + 20  # garante retorno esperado positivo
+        qp = PortfolioOptimizer(shifted, solver="qp")
+        slsqp = PortfolioOptimizer(shifted, solver="slsqp")
+
+        w_qp = qp.optimize()
+        w_slsqp = slsqp.optimize()
+
+        assert qp.solver_info['solver'] == 'qp'
+        assert np.isclose(w_qp.sum(), 1.0) and np.all(w_qp >= 0)
+        assert qp.solver_info['sharpe'] >= slsqp.solver_info['sharpe'] - 1e-6
+        np.testing.assert_array_equal(w_qp, PortfolioOptimizer(shifted).optimize())  # determinístico
+
+    def test_qp_falls_back_to_slsqp(self, sample_daily_pnl):
+        """Sem retorno esperado positivo o QP não se aplica e o SLSQP é usado."""
+        optimizer = PortfolioOptimizer(-sample_daily_pnl.abs() - 1)
+        weights = optimizer.optimize()
+        assert optimizer.solver_info['solver'] == 'slsqp'
+        assert np.isclose(weights.sum(), 1.0)
+
+    def test_custom_solver(self, sample_daily_pnl):
+        """Backends podem ser passados como funções."""
+        def equal_weight(mean, cov, rf, warm_start):
+            return np.full(len(mean), 1.0 / len(mean))
+
+        optimizer = PortfolioOptimizer(sample_daily_pnl, solver=equal_weight)
+        np.testing.assert_allclose(optimizer.optimize(), [1 / 3] * 3)
+        assert optimizer.solver_info['solver'] == 'equal_weight'
+
+    def test_efficient_frontier(self):
+        """Fronteira eficiente: pesos válidos, risco e retorno crescentes, mesmo resultado em paralelo."""
+        rng = np.random.default_rng(3)
+        daily_pnl = pd.DataFrame(rng.normal(5, 100, (300, 8)), columns=[f"S{i}" for i in range(8)])
+        optimizer = PortfolioOptimizer(daily_pnl)
+        optimizer.optimize()
+
+        frontier = optimizer.efficient_frontier(num_points=10)
+        weights = frontier['weights']
+        assert weights.shape == (10, 8)
+        np.testing.assert_allclose(weights.sum(axis=1), 1.0)
+        assert np.all(weights >= 0)
+        assert np.all(np.diff(frontier['return']) >= -1e-9)
+        assert np.all(np.diff(frontier['risk']) >= -1e-9)
+        assert np.isclose(frontier['return'][-1], optimizer.ann_mean.max())
+        # Nenhum ponto supera o máximo Sharpe
+        assert frontier['sharpe'].max() <= optimizer.solver_info['sharpe'] + 1e-6
+
+        by_vol = optimizer.efficient_frontier(num_points=10, target='volatility')
+        np.testing.assert_allclose(np.diff(by_vol['risk']), np.diff(by_vol['risk'])[0], rtol=1e-6)
+
+        parallel = optimizer.efficient_frontier(num_points=10, max_workers=2)
+        np.testing.assert_allclose(parallel['weights'], weights, atol=1e-9)
+
+    def test_resampled_optimize(self):
+        """Pesos reamostrados: reprodutíveis pela seed, bandas coerentes, pool idêntico."""
+        rng = np.random.default_rng(4)
+        daily_pnl = pd.DataFrame(rng.normal(5, 100, (250, 6)), columns=[f"S{i}" for i in range(6)])
+        optimizer = PortfolioOptimizer(daily_pnl)
+
+        result = optimizer.resampled_optimize(num_samples=60, seed=1, batch_size=25)
+        assert result['samples'].shape == (60, 6)
+        assert np.isclose(result['weights'].sum(), 1.0)
+        assert np.all(result['lower'] <= result['weights'] + 1e-12)
+        assert np.all(result['weights'] <= result['upper'] + 1e-12)
+        np.testing.assert_array_equal(optimizer.optimal_weights, result['weights'])
+        assert optimizer.solver_info['solver'] == 'resampled'
+
+        again = optimizer.resampled_optimize(num_samples=60, seed=1, batch_size=25, max_workers=2)
+        np.testing.assert_allclose(again['samples'], result['samples'])
+
+        blocks = optimizer.resampled_optimize(num_samples=20, block_size=10, seed=2)
+        assert np.isclose(blocks['weights'].sum(), 1.0)
+
     def test_calculate_multipliers(self, sample_daily_pnl):
         """Testa cálculo de multiplicadores."""
         optimizer = PortfolioOptimizer(sample_daily_pnl)
@@ -110,7 +467,651 @@ class TestPortfolioOptimizer:
         
         assert isinstance(multipliers, dict)
         assert len(multipliers) == 3
-        assert all(v > 0 for v in multipliers.values())
+        # O QP zera exatamente os pesos fora da carteira: multiplicador 0 só nesses casos
+        assert all((v > 0) == (w > 0) for v, w in zip(multipliers.values(), weights))
+
+    def test_result_cache(self, sample_daily_pnl, tmp_path, monkeypatch):
+        """Mesmos dados e parâmetros: pesos e multiplicadores vêm do cache (memória e disco)."""
+        cache = OptimizationCache(tmp_path / "results", max_entries=1)
+        first = PortfolioOptimizer(sample_daily_pnl, result_cache=cache)
+        weights = first.optimize()
+        multipliers = first.calculate_multipliers(weights, 100000, 0.25)
+        first.multiplier_array *= 2  # nem o array calculado nem o lido do cache são compartilhados
+        assert first.calculate_multipliers(weights, 100000, 0.25) == multipliers
+        first.multiplier_array *= 2
+        assert first.calculate_multipliers(weights, 100000, 0.25) == multipliers
+
+        def fail_solve(*args, **kwargs):
+            raise AssertionError("optimizer re-solved a cached result")
+
+        monkeypatch.setattr(PortfolioOptimizer, "solve_max_sharpe", staticmethod(fail_solve))
+        monkeypatch.setattr(PortfolioOptimizer, "max_drawdowns", fail_solve)
+
+        # Outra instância, cache só em disco (nova memória)
+        again = PortfolioOptimizer(sample_daily_pnl.copy(), result_cache=OptimizationCache(tmp_path / "results"))
+        np.testing.assert_array_equal(again.optimize(), weights)
+        assert again.solver_info['cache'] == 'hit'
+        assert again.calculate_multipliers(weights, 100000, 0.25) == multipliers
+        again.multiplier_array *= 2
+        assert again.calculate_multipliers(weights, 100000, 0.25) == multipliers
+
+        # Outros parâmetros ou dados geram outra chave
+        assert first._cache_key("slsqp") != first._cache_key("qp")
+        changed = sample_daily_pnl.copy()
+        changed.iloc[0, 0] += 1
+        assert OptimizationCache.data_digest(changed) != OptimizationCache.data_digest(sample_daily_pnl)
+
+        assert cache.invalidate(first._result_key)
+        assert cache.get(first._result_key) is None
+
+    def test_result_cache_eviction_order(self, tmp_path):
+        """Acertos em memória também renovam a entrada em disco: a mais usada não é removida primeiro."""
+        weights = np.full(4, 0.25)
+        probe = OptimizationCache(tmp_path / "probe")
+        entry_size = probe.put("probe", weights, {}).stat().st_size
+
+        cache = OptimizationCache(tmp_path / "results", max_entries=3, max_size_mb=2.5 * entry_size / (1024 * 1024))
+        for age, key in enumerate(["hot", "cold"]):
+            path = cache.put(key, weights, {})
+            os.utime(path, (1000 + age, 1000 + age))  # "hot" é a entrada mais antiga em disco
+
+        for _ in range(3):
+            assert cache.get("hot") is not None  # acertos em memória
+
+        cache.put("new", weights, {})
+        assert (tmp_path / "results" / "hot.npz").exists()
+        assert not (tmp_path / "results" / "cold.npz").exists()
+        assert (tmp_path / "results" / "new.npz").exists()
+
+    @pytest.mark.parametrize("estimator", [None, "ledoit_wolf"])
+    def test_incremental_update(self, estimator):
+        """update() com novas linhas: mesmos momentos e pesos que otimizar o histórico completo."""
+        rng = np.random.default_rng(5)
+        daily_pnl = pd.DataFrame(rng.normal(5, 100, (120, 4)), columns=[f"EA {i}" for i in range(4)],
+                                 index=pd.date_range('2024-01-01', periods=120))
+
+        optimizer = PortfolioOptimizer(daily_pnl.iloc[:100], cov_estimator=estimator)
+        optimizer.optimize()
+        optimizer.max_drawdowns()
+        optimizer.update(daily_pnl.iloc[100])  # um dia, como Series
+        weights = optimizer.update(daily_pnl.iloc[101:].drop(columns="EA 3"))  # estratégia sem trades
+
+        expected = daily_pnl.copy()
+        expected.iloc[101:, 3] = 0.0
+        full = PortfolioOptimizer(expected, cov_estimator=estimator)
+        np.testing.assert_allclose(weights, full.optimize(), atol=1e-8)
+        np.testing.assert_allclose(optimizer.ann_mean, full.ann_mean)
+        np.testing.assert_allclose(optimizer.ann_cov, full.ann_cov)
+        np.testing.assert_allclose(optimizer.max_drawdowns(), full.max_drawdowns())
+        pd.testing.assert_frame_equal(optimizer.daily_pnl, expected, check_freq=False)
+
+        with pytest.raises(ValueError):
+            optimizer.update(pd.DataFrame({"EA 9": [1.0]}))
+
+    @pytest.mark.parametrize("estimator", [None, "ewma"])
+    def test_update_repeated_date_replaces_row(self, estimator):
+        """O mesmo dia reenviado (checagens intradiárias) substitui a linha em vez de duplicá-la."""
+        rng = np.random.default_rng(9)
+        daily_pnl = pd.DataFrame(rng.normal(5, 100, (101, 4)), columns=[f"EA {i}" for i in range(4)],
+                                 index=pd.date_range('2024-01-01', periods=101))
+        today = daily_pnl.index[-1]
+
+        optimizer = PortfolioOptimizer(daily_pnl.iloc[:100], cov_estimator=estimator)
+        optimizer.optimize()
+        for partial in (0.2, 0.7, 1.0):  # PnL do dia acumulando ao longo do pregão
+            optimizer.update(daily_pnl.iloc[100] * partial)
+        optimizer.update(daily_pnl.iloc[100])  # reenvio idêntico
+
+        assert optimizer.daily_pnl.index.is_unique and len(optimizer.daily_pnl) == 101
+        pd.testing.assert_frame_equal(optimizer.daily_pnl, daily_pnl, check_freq=False)
+        full = PortfolioOptimizer(daily_pnl, cov_estimator=estimator)
+        np.testing.assert_allclose(optimizer.optimal_weights, full.optimize(), atol=1e-8)
+        np.testing.assert_allclose(optimizer.ann_mean, full.ann_mean)
+        np.testing.assert_allclose(optimizer.ann_cov, full.ann_cov)
+
+    def test_update_rejects_out_of_order_dates(self, sample_daily_pnl):
+        """Datas novas anteriores ao último dia (e datas repetidas na entrada) são rejeitadas."""
+        optimizer = PortfolioOptimizer(sample_daily_pnl)
+        optimizer.calculate_annual_metrics()
+        mean = optimizer.ann_mean.copy()
+        past = sample_daily_pnl.iloc[[0]].set_axis([pd.Timestamp('2023-12-31')])
+
+        with pytest.raises(ValueError):
+            optimizer.update(past)
+        with pytest.raises(ValueError):
+            optimizer.update(pd.concat([sample_daily_pnl.iloc[[-1]], sample_daily_pnl.iloc[[-1]]]))
+        pd.testing.assert_frame_equal(optimizer.daily_pnl, sample_daily_pnl)
+        np.testing.assert_array_equal(optimizer.ann_mean, mean)
+
+    def test_drawdown_kernel_and_multiplier_grid(self, sample_daily_pnl):
+        """Kernel em blocos igual ao cálculo com DataFrames; grade de parâmetros sem recalcular DD."""
+        cum = sample_daily_pnl.cumsum()
+        expected = (cum - cum.cummax()).min().abs().values
+        np.testing.assert_allclose(max_drawdowns(sample_daily_pnl.values, block_rows=7), expected)
+
+        optimizer = PortfolioOptimizer(sample_daily_pnl)
+        weights = np.array([0.5, 0.3, 0.2])
+        multipliers = optimizer.calculate_multipliers(weights, 100000, 0.25)
+        np.testing.assert_allclose(optimizer.multiplier_array, list(multipliers.values()))
+        np.testing.assert_allclose(optimizer.multiplier_array, 100000 * 0.25 * weights / expected)
+
+        grid = optimizer.multiplier_grid(weights, [(100000, 0.25), (50000, 0.10), (200000, 0.50)])
+        assert grid.shape == (3, 3)
+        np.testing.assert_allclose(grid[0], optimizer.multiplier_array)
+        np.testing.assert_allclose(grid[1], list(optimizer.calculate_multipliers(weights, 50000, 0.10).values()))
+
+
+class TestSparseDailyPnL:
+    """Testes para a matriz de PnL diário esparsa."""
+
+    @pytest.fixture
+    def sparse_daily_pnl(self):
+        """Matriz com ~90% de zeros (estratégias que operam pouco)."""
+        rng = np.random.default_rng(7)
+        values = rng.normal(20, 300, (120, 8))
+        values[rng.random((120, 8)) < 0.9] = 0.0
+        dates = pd.date_range('2024-01-01', periods=120).date
+        return pd.DataFrame(values, index=dates, columns=[f'EA {i}' for i in range(8)])
+
+    def test_mean_cov_match_dense(self, sparse_daily_pnl):
+        """Média e covariância esparsas são iguais às densas."""
+        sparse_pnl = SparseDailyPnL.from_dense(sparse_daily_pnl)
+        assert sparse_pnl.nnz < sparse_daily_pnl.size * 0.2
+        np.testing.assert_allclose(sparse_pnl.mean(), sparse_daily_pnl.mean())
+        np.testing.assert_allclose(sparse_pnl.cov(), sparse_daily_pnl.cov(), atol=1e-8)
+
+    def test_optimizer_accepts_sparse(self, sparse_daily_pnl):
+        """O otimizador produz os mesmos multiplicadores com a matriz esparsa."""
+        dense = PortfolioOptimizer(sparse_daily_pnl)
+        sparse_opt = PortfolioOptimizer(SparseDailyPnL.from_dense(sparse_daily_pnl))
+
+        weights = dense.optimize()
+        np.testing.assert_allclose(sparse_opt.optimize(), weights, atol=1e-6)
+
+        dense_mult = dense.calculate_multipliers(weights, 100000, 0.25)
+        sparse_mult = sparse_opt.calculate_multipliers(weights, 100000, 0.25)
+        assert dense_mult.keys() == sparse_mult.keys()
+        np.testing.assert_allclose(list(sparse_mult.values()), list(dense_mult.values()))
+
+    def test_streaming_sparse_output(self, tmp_path):
+        """A leitura em chunks pode gerar a matriz esparsa diretamente."""
+        rng = np.random.default_rng(3)
+        times = pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, 60 * 24, 200), unit='h')
+        csv_file = tmp_path / "trades.csv"
+        pd.DataFrame({
+            'Open time': times.strftime('%Y.%m.%d %H:%M:%S'),
+            'Strategy name (Global)': rng.choice(['A', 'B', 'C'], 200),
+            'Profit/Loss (Global)': rng.normal(0, 100, 200),
+            'Size': 0.1,
+        }).to_csv(csv_file, index=False)
+
+        dense_pnl, _, _ = DataProcessor(str(csv_file)).prepare_data_streaming()
+        sparse_pnl, lots, metadata = DataProcessor(str(csv_file)).prepare_data_streaming(sparse=True)
+
+        assert isinstance(sparse_pnl, SparseDailyPnL)
+        pd.testing.assert_frame_equal(sparse_pnl.to_dense(), dense_pnl)
+        assert metadata['strategies'] == ['A', 'B', 'C']
+
+
+def _worker_mean(view):
+    """Executado em outro processo: recebe só o caminho do store."""
+    return view.mean().to_numpy()
+
+
+class TestSharedPnLStore:
+    """Testes para o store de PnL diário em memória mapeada."""
+
+    @pytest.fixture
+    def daily_pnl(self):
+        rng = np.random.default_rng(11)
+        dates = pd.date_range('2024-01-01', periods=80).date
+        return pd.DataFrame(rng.normal(10, 100, (80, 4)), index=dates, columns=['A', 'B', 'C', 'D'])
+
+    def test_attach_read_only_view(self, daily_pnl, tmp_path):
+        """Os workers recebem views somente leitura, sem cópia dos dados."""
+        view = SharedPnLStore.create(tmp_path / "store", daily_pnl).attach()
+
+        assert isinstance(view.values, np.memmap)
+        assert not view.values.flags.writeable
+        assert list(view.columns) == ['A', 'B', 'C', 'D']
+        np.testing.assert_allclose(view.cov(), daily_pnl.cov())
+
+        import pickle
+        assert len(pickle.dumps(view)) < 1024  # só o caminho, não a matriz
+
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=2) as pool:
+            means = list(pool.map(_worker_mean, [view, view]))
+        np.testing.assert_allclose(means[0], daily_pnl.mean())
+
+    def test_optimizer_and_metrics_accept_view(self, daily_pnl, tmp_path):
+        """PortfolioOptimizer e MetricsCalculator aceitam a view diretamente."""
+        view = SharedPnLStore.create(tmp_path / "store", daily_pnl).attach()
+
+        dense = PortfolioOptimizer(daily_pnl)
+        weights = dense.optimize()
+        shared = PortfolioOptimizer(view)
+        np.testing.assert_allclose(shared.optimize(), weights, atol=1e-6)
+        np.testing.assert_allclose(
+            list(shared.calculate_multipliers(weights, 100000).values()),
+            list(dense.calculate_multipliers(weights, 100000).values())
+        )
+
+        metrics = MetricsCalculator.from_daily_pnl(view, 100000).calculate_all_metrics()
+        expected = MetricsCalculator.from_daily_pnl(daily_pnl, 100000).calculate_all_metrics()
+        assert metrics == expected
+        assert metrics['Total Profit'] == round(daily_pnl.to_numpy().sum(), 2)
+
+
+class TestActiveSetQP:
+    """Testes para o solver QP de conjunto ativo."""
+
+    def test_known_solution(self):
+        """min x1² + x2² + x3² com x1 + x2 + x3 = 1 e x3 ≤ 0 pela função linear."""
+        Q = 2 * np.eye(3)
+        c = np.array([0.0, 0.0, 10.0])
+        result = solve_qp_active_set(Q, np.ones((1, 3)), np.array([1.0]), c=c)
+        assert result['status'] == 'optimal'
+        np.testing.assert_allclose(result['x'], [0.5, 0.5, 0.0], atol=1e-12)
+
+    def test_matches_slsqp_min_variance(self):
+        """Variância mínima long-only igual à do SLSQP."""
+        from scipy.optimize import minimize
+
+        rng = np.random.default_rng(5)
+        X = rng.normal(0, 1, (200, 12)) @ rng.normal(0, 1, (12, 12))
+        cov = np.cov(X, rowvar=False)
+
+        result = solve_qp_active_set(cov, np.ones((1, 12)), np.array([1.0]))
+        reference = minimize(lambda w: w @ cov @ w, np.full(12, 1 / 12), method="SLSQP",
+                             bounds=[(0, 1)] * 12, constraints={"type": "eq", "fun": lambda w: w.sum() - 1},
+                             options={"ftol": 1e-14, "maxiter": 500})
+        x = result['x']
+        assert np.isclose(x.sum(), 1.0) and np.all(x >= 0)
+        assert x @ cov @ x <= reference.fun + 1e-9
+
+
+class TestResampling:
+    """Testes para as reamostragens bootstrap."""
+
+    def test_batched_moments_match_resampled_rows(self):
+        """Momentos calculados pelas contagens iguais aos das linhas reamostradas."""
+        values = np.random.default_rng(2).normal(0, 1, (120, 4))
+        counts = bootstrap_counts(120, 5, block_size=7, rng=np.random.default_rng(0))
+        assert np.all(counts.sum(axis=1) == 120)
+
+        means, covs = batched_moments(values, counts, chunk_size=2)
+        for i in range(5):
+            rows = values[np.repeat(np.arange(120), counts[i])]
+            np.testing.assert_allclose(means[i], rows.mean(axis=0))
+            np.testing.assert_allclose(covs[i], np.cov(rows, rowvar=False))
+
+
+def _mean_pnl_objective(portfolio_pnl, periods_per_year):
+    """Objetivo customizado (nível de módulo para ser serializável no pool)."""
+    return portfolio_pnl.mean()
+
+
+class TestMultiStart:
+    """Testes para o otimizador multi-start de objetivos não convexos."""
+
+    @pytest.fixture
+    def daily_pnl(self):
+        """PnL diário com caudas pesadas e médias distintas."""
+        rng = np.random.default_rng(21)
+        return pd.DataFrame(rng.standard_t(3, (300, 5)) * 50 + rng.normal(3, 2, 5),
+                            columns=[f"EA {i}" for i in range(5)])
+
+    def test_best_of_all_starts(self, daily_pnl):
+        """O melhor Calmar supera os pontos de partida heurísticos e é reprodutível."""
+        optimizer = PortfolioOptimizer(daily_pnl)
+        result = optimizer.multi_start_optimize('calmar', num_starts=8, seed=0)
+
+        assert result['num_solved'] == 8
+        assert np.isclose(result['weights'].sum(), 1.0) and np.all(result['weights'] >= 0)
+        assert result['objective'] == result['spread'][2]
+        equal = calmar_objective(daily_pnl.values @ np.full(5, 0.2))
+        assert result['objective'] >= equal - 1e-9
+        np.testing.assert_array_equal(optimizer.optimal_weights, result['weights'])
+
+        again = PortfolioOptimizer(daily_pnl).multi_start_optimize('calmar', num_starts=8, seed=0)
+        np.testing.assert_allclose(again['objectives'], result['objectives'])
+
+    def test_custom_objective_parallel_early_stop(self, daily_pnl):
+        """Objetivo customizado no pool; paciência interrompe a busca."""
+        optimizer = PortfolioOptimizer(daily_pnl)
+        result = optimizer.multi_start_optimize(_mean_pnl_objective, num_starts=6, seed=1, max_workers=2)
+        # Maximizar a média leva toda a alocação para a melhor estratégia
+        assert np.isclose(result['objective'], daily_pnl.values.mean(axis=0).max())
+
+        stopped = optimizer.multi_start_optimize(_mean_pnl_objective, num_starts=20, seed=1, patience=2)
+        assert stopped['num_solved'] < 20
+
+
+class TestCardinality:
+    """Testes para a alocação com no máximo K estratégias."""
+
+    @pytest.fixture
+    def daily_pnl(self):
+        """12 estratégias com fator comum e médias positivas."""
+        rng = np.random.default_rng(17)
+        common = rng.normal(0, 1, (500, 2)) @ rng.normal(0, 40, (2, 12))
+        return pd.DataFrame(rng.normal(0, 1, (500, 12)) * rng.uniform(30, 120, 12) + common + rng.normal(4, 3, 12),
+                            columns=[f"EA {i}" for i in range(12)])
+
+    def test_cardinality_and_min_weight(self, daily_pnl):
+        """No máximo K estratégias, peso mínimo respeitado e resultado próximo da busca exaustiva."""
+        from itertools import combinations
+
+        optimizer = PortfolioOptimizer(daily_pnl)
+        weights = optimizer.optimize_cardinality(max_assets=3, min_weight=0.05)
+        held = weights > 0
+
+        assert held.sum() <= 3
+        assert np.all(weights[held] >= 0.05)
+        assert np.isclose(weights.sum(), 1.0)
+        assert len(optimizer.solver_info['selected']) == held.sum()
+
+        mean, cov = optimizer.ann_mean, optimizer.ann_cov
+        best = max(subset_max_sharpe(mean, cov, 0.0, s, 0.05)[1] for s in combinations(range(12), 3))
+        assert optimizer.solver_info['sharpe'] >= 0.98 * best
+
+    def test_unconstrained_solution_already_small(self, daily_pnl):
+        """Se a solução livre já tem até K estratégias, ela é devolvida sem busca."""
+        optimizer = PortfolioOptimizer(daily_pnl)
+        free = optimizer.optimize()
+        weights = optimizer.optimize_cardinality(max_assets=12, min_weight=0.0)
+        np.testing.assert_allclose(weights, free, atol=1e-10)
+
+
+    def test_no_positive_excess_return(self, daily_pnl):
+        """Sem retorno acima de rf o máximo Sharpe não existe: erro, em vez de pesos zerados."""
+        optimizer = PortfolioOptimizer(daily_pnl - 50)
+        with pytest.raises(ValueError):
+            optimizer.optimize_cardinality(max_assets=3)
+        assert optimizer.optimal_weights is None
+
+
+class TestCVaR:
+    """Testes para a otimização de CVaR por programação linear."""
+
+    @pytest.fixture
+    def daily_pnl(self):
+        """PnL diário com caudas pesadas (t de Student)."""
+        rng = np.random.default_rng(12)
+        return pd.DataFrame(rng.standard_t(3, (400, 6)) * 50 + 4, columns=[f"EA {i}" for i in range(6)])
+
+    def test_min_cvar(self, daily_pnl):
+        """O CVaR do LP é a média das piores perdas da carteira e não supera a de pesos iguais."""
+        optimizer = PortfolioOptimizer(daily_pnl)
+        weights = optimizer.optimize_cvar(alpha=0.95)
+        info = optimizer.solver_info
+
+        assert np.isclose(weights.sum(), 1.0) and np.all(weights >= -1e-12)
+        losses = -(daily_pnl.values @ weights)
+        assert np.isclose(info['cvar'], np.sort(losses)[-20:].mean())  # 5% de 400 dias
+        equal = -(daily_pnl.values @ np.full(6, 1 / 6))
+        assert info['cvar'] <= np.sort(equal)[-20:].mean() + 1e-9
+        assert info['num_variables'] == 6 + 1 + 400
+        assert info['solve_time'] > 0 and info['nnz'] > 0
+
+    def test_return_per_cvar_and_sparse_input(self, daily_pnl):
+        """Razão retorno/CVaR máxima; matriz esparsa dá o mesmo resultado da densa."""
+        optimizer = PortfolioOptimizer(daily_pnl)
+        weights = optimizer.optimize_cvar(objective='return_per_cvar')
+        mean = daily_pnl.values.mean(axis=0)
+        ratio = mean @ weights / optimizer.solver_info['cvar']
+        assert ratio >= (mean @ np.full(6, 1 / 6)) / np.sort(-(daily_pnl.values.mean(axis=1)))[-20:].mean() - 1e-9
+
+        sparse_optimizer = PortfolioOptimizer(SparseDailyPnL.from_dense(daily_pnl))
+        sparse_optimizer.optimize_cvar(objective='return_per_cvar')
+        assert np.isclose(sparse_optimizer.solver_info['cvar'], optimizer.solver_info['cvar'])
+
+
+class TestHRP:
+    """Testes para o alocador Hierarchical Risk Parity."""
+
+    def test_diagonal_covariance_is_inverse_variance(self):
+        """Sem correlação, o HRP reduz-se aos pesos de variância inversa."""
+        variances = np.array([1.0, 4.0, 9.0, 2.0, 0.5])
+        expected = (1 / variances) / (1 / variances).sum()
+        np.testing.assert_allclose(hrp_weights(np.diag(variances)), expected)
+
+    def test_optimize_hrp(self):
+        """optimize_hrp: covariância singular (estratégias duplicadas), mesmo formato de pesos."""
+        rng = np.random.default_rng(6)
+        base = rng.normal(0, 100, (200, 30))
+        daily_pnl = pd.DataFrame(np.hstack([base, base[:, :5]]), columns=[f"S{i}" for i in range(35)])
+
+        optimizer = PortfolioOptimizer(daily_pnl)
+        weights = optimizer.optimize_hrp()
+        assert weights.shape == (35,)
+        assert np.isclose(weights.sum(), 1.0) and np.all(weights > 0)
+        assert optimizer.solver_info['solver'] == 'hrp'
+        with pytest.raises(ValueError):
+            optimizer.optimize(solver="hrp")  # HRP não é um backend de máximo Sharpe
+
+        multipliers = optimizer.calculate_multipliers(weights, capital_inicial=100000)
+        assert len(multipliers) == 35 and all(v > 0 for v in multipliers.values())
+
+
+class TestMonteCarlo:
+    """Testes para o simulador de drawdowns por Monte Carlo."""
+
+    @pytest.fixture
+    def daily_pnl(self):
+        """PnL diário de 4 estratégias com média positiva."""
+        rng = np.random.default_rng(31)
+        return pd.DataFrame(rng.normal(5, 100, (250, 4)), columns=[f"EA {i}" for i in range(4)])
+
+    def test_paths_match_direct_drawdowns(self, daily_pnl):
+        """Drawdowns simulados iguais aos calculados diretamente sobre os caminhos reamostrados."""
+        values = daily_pnl.values
+        drawdowns = simulate_drawdowns(values, num_paths=50, block_size=5, seed=3)
+
+        rng = np.random.default_rng(np.random.SeedSequence(3).spawn(1)[0])
+        rows = bootstrap_indices(250, 50, 5, rng)
+        for i in (0, 17, 49):
+            cum = values[rows[i]].cumsum(axis=0)
+            np.testing.assert_allclose(drawdowns[i], (np.maximum.accumulate(cum, axis=0) - cum).max(axis=0))
+
+        # Pedaços de memória pequenos, em paralelo ou não: mesmo resultado
+        chunked = simulate_drawdowns(values, num_paths=50, seed=3, memory_mb=0.05)
+        parallel = simulate_drawdowns(values, num_paths=50, seed=3, memory_mb=0.05, max_workers=2)
+        np.testing.assert_array_equal(chunked, parallel)
+
+    def test_percentile_multipliers(self, daily_pnl):
+        """Multiplicadores pelo percentil do DD simulado, com a distribuição da carteira dimensionada."""
+        optimizer = PortfolioOptimizer(daily_pnl)
+        weights = optimizer.optimize()
+        multipliers = optimizer.monte_carlo_multipliers(weights, 100000, 0.25, percentile=95,
+                                                        num_paths=500, seed=0)
+        mc = optimizer.monte_carlo
+
+        assert mc['strategy_drawdowns'].shape == (500, 4)
+        assert mc['portfolio_drawdowns'].shape == (500,)
+        sizing = np.percentile(mc['strategy_drawdowns'], 95, axis=0)
+        expected = 100000 * 0.25 * weights / sizing
+        np.testing.assert_allclose(list(multipliers.values()), expected)
+        np.testing.assert_allclose(optimizer.multiplier_array, expected)
+
+
+class TestLotAllocation:
+    """Testes para a alocação de lotes discretos (passo de lote do MT5)."""
+
+    def test_matches_brute_force(self):
+        """Mesmo erro de rastreamento que a enumeração de todos os lotes válidos."""
+        import itertools
+        rng = np.random.default_rng(8)
+        for _ in range(20):
+            original_lots = rng.choice([0.01, 0.05, 0.1], 3)
+            max_dd = rng.uniform(500, 3000, 3)
+            weights = rng.dirichlet(np.ones(3))
+            capital = rng.uniform(500, 3000)
+            caps = {"EURUSD": 0.05}
+            result = allocate_lots(original_lots, max_dd, weights, capital, 0.25, min_lot=0.02, lot_step=0.01,
+                                   max_lot=0.2, groups=["EURUSD", "EURUSD", "XAUUSD"], group_max_lots=caps)
+
+            unit_risk = 0.01 * max_dd / original_lots
+            target = capital * 0.25 * weights
+            best = np.inf
+            for units in itertools.product([0] + list(range(2, 21)), repeat=3):
+                units = np.array(units)
+                if units @ unit_risk <= capital * 0.25 + 1e-9 and (units[0] + units[1]) * 0.01 <= 0.05 + 1e-9:
+                    best = min(best, np.sqrt(np.sum((units * unit_risk - target) ** 2)))
+            assert result['tracking_error'] == pytest.approx(best)
+
+    def test_broker_limits(self):
+        """Lotes no grid do corretor, dentro do orçamento de risco e dos limites por símbolo."""
+        rng = np.random.default_rng(2)
+        num = 300
+        original_lots = rng.choice([0.01, 0.1, 1.0], num)
+        weights = rng.dirichlet(np.full(num, 0.3))
+        symbols = rng.integers(0, 10, num)
+        result = allocate_lots(original_lots, rng.uniform(500, 3000, num), weights, 1e6, 0.25,
+                               min_lot=0.05, lot_step=0.02, max_lot=20.0,
+                               groups=symbols, group_max_lots={s: 10.0 for s in range(10)})
+        lots = result['lots']
+
+        held = lots > 0
+        assert np.all(lots[held] >= 0.05 - 1e-9) and np.all(lots <= 20.0)
+        np.testing.assert_allclose(lots / 0.02, np.round(lots / 0.02), atol=1e-6)
+        assert np.all(np.bincount(symbols, weights=lots) <= 10.0 + 1e-9)
+        assert result['risk'].sum() <= 1e6 * 0.25 + 1e-6
+        assert not np.any(held & (weights == 0))
+        np.testing.assert_allclose(result['multipliers'], lots / original_lots)
+
+        with pytest.raises(ValueError):
+            allocate_lots(original_lots, np.ones(num), weights, 1e6, min_lot=1.0, max_lot=0.5)
+
+    def test_optimizer_final_lots(self):
+        """PortfolioOptimizer.allocate_lots: lotes finais melhores que arredondar lote × multiplicador para baixo."""
+        rng = np.random.default_rng(3)
+        daily_pnl = pd.DataFrame(rng.normal(5, 100, (250, 4)), columns=[f"EA {i}" for i in range(4)])
+        original_lots = pd.Series([0.1, 0.5, 1.0, 0.2], index=daily_pnl.columns[::-1])
+
+        optimizer = PortfolioOptimizer(daily_pnl)
+        weights = optimizer.optimize()
+        multipliers = optimizer.calculate_multipliers(weights, 100000, 0.25)
+        final_lots = optimizer.allocate_lots(weights, original_lots, 100000, 0.25)
+
+        assert list(final_lots) == list(daily_pnl.columns)
+        allocation = optimizer.lot_allocation
+        unit_risk = optimizer.max_drawdowns() / original_lots[daily_pnl.columns].values
+        floor_lots = np.floor(original_lots[daily_pnl.columns].values * list(multipliers.values()) / 0.01 + 1e-9) * 0.01
+        floor_error = np.sqrt(np.sum((floor_lots * unit_risk - allocation['target_risk']) ** 2))
+        assert allocation['tracking_error'] <= floor_error + 1e-9
+        np.testing.assert_allclose(allocation['risk'], np.array(list(final_lots.values())) * unit_risk)
+
+
+class TestCovarianceEstimators:
+    """Testes para os estimadores de covariância com atualização online."""
+
+    @pytest.fixture
+    def values(self):
+        """Retornos correlacionados com média diferente de zero."""
+        rng = np.random.default_rng(8)
+        return rng.normal(20, 100, (400, 6)) @ rng.normal(0, 1, (6, 6)) * 0.5 + 30
+
+    def test_incomplete_estimator_fails_at_construction(self):
+        """Estimador sem os métodos abstratos falha ao instanciar, não no meio do fit."""
+        class NoCovariance(CovarianceEstimator):
+            def _reset(self, num_assets):
+                pass
+
+            def _accumulate(self, rows):
+                pass
+
+        class NoTarget(_ShrinkageCovariance):
+            pass
+
+        for cls in (CovarianceEstimator, NoCovariance, NoTarget):
+            with pytest.raises(TypeError):
+                cls()
+
+    @pytest.mark.parametrize("estimator", [SampleCovariance, LedoitWolfCovariance,
+                                           ConstantCorrelationCovariance, EWMACovariance])
+    def test_streaming_matches_fit(self, values, estimator):
+        """Adicionar linha a linha dá o mesmo resultado que ajustar no histórico inteiro."""
+        streamed = estimator().fit(values[:250])
+        for row in values[250:]:
+            streamed.update(row)
+        full = estimator().fit(values)
+        np.testing.assert_allclose(streamed.covariance(), full.covariance(), rtol=1e-9)
+        np.testing.assert_allclose(streamed.mean(), full.mean(), rtol=1e-9)
+
+    def test_reference_values(self, values):
+        """Covariância amostral, intensidade Ledoit-Wolf e EWMA conferem com as fórmulas diretas."""
+        np.testing.assert_allclose(SampleCovariance().fit(values).covariance(), np.cov(values, rowvar=False))
+
+        T, N = values.shape
+        Y = values - values.mean(axis=0)
+        S = Y.T @ Y / T
+        F = np.trace(S) / N * np.eye(N)
+        pi = np.mean([np.sum((np.outer(y, y) - S) ** 2) for y in Y])
+        expected = min(pi / T / np.sum((S - F) ** 2), 1.0)
+        assert np.isclose(LedoitWolfCovariance().fit(values).shrinkage(), expected)
+        assert 0 <= ConstantCorrelationCovariance().fit(values).shrinkage() <= 1
+
+        ewma = EWMACovariance(decay=0.94).fit(values).covariance()
+        reference = pd.DataFrame(values).ewm(alpha=0.06, adjust=False).cov(bias=True).iloc[-N:].values
+        np.testing.assert_allclose(ewma, reference)
+
+    def test_optimizer_estimator_option(self, values):
+        """O otimizador usa o estimador escolhido e o fator de anualização informado."""
+        daily_pnl = pd.DataFrame(values)
+        optimizer = PortfolioOptimizer(daily_pnl, cov_estimator="ledoit_wolf", periods_per_year=260)
+        _, ann_cov = optimizer.calculate_annual_metrics()
+        np.testing.assert_allclose(ann_cov, LedoitWolfCovariance().fit(values).covariance() * 260)
+        np.testing.assert_allclose(optimizer.ann_mean, values.mean(axis=0) * 260)
+        assert np.isclose(optimizer.optimize().sum(), 1.0)
+
+        with pytest.raises(ValueError):
+            PortfolioOptimizer(daily_pnl, cov_estimator="unknown")
+
+
+class TestWalkForward:
+    """Testes para o motor walk-forward."""
+
+    @pytest.fixture
+    def daily_pnl(self):
+        """Matriz de PnL diário com 300 dias e 5 estratégias."""
+        rng = np.random.default_rng(11)
+        dates = pd.bdate_range('2023-01-02', periods=300)
+        return pd.DataFrame(rng.normal(10, 100, (300, 5)), index=dates, columns=[f"EA {i}" for i in range(5)])
+
+    def test_rolling_moments(self, daily_pnl):
+        """Média e covariância incrementais iguais às calculadas do zero."""
+        values = daily_pnl.values
+        moments = RollingMoments(values)
+        for start, stop in [(0, 100), (7, 107), (50, 200), (250, 300), (0, 300)]:
+            moments.move_to(start, stop)
+            np.testing.assert_allclose(moments.mean(), values[start:stop].mean(axis=0))
+            np.testing.assert_allclose(moments.cov(), np.cov(values[start:stop], rowvar=False))
+
+    def test_walk_forward(self, daily_pnl):
+        """Curva OOS costurada, histórico de pesos e execução paralela idêntica."""
+        wf = WalkForwardOptimizer(daily_pnl, train_size=120, test_size=40)
+        assert len(wf.windows()) == 5  # último teste truncado em 20 dias
+
+        result = wf.run(capital_inicial=100000)
+        assert result['oos_start'] == daily_pnl.index[120].strftime('%Y-%m-%d')
+        assert len(result['equity']) == 180
+        assert result['weights'].shape == (5, 5)
+        np.testing.assert_allclose(result['weights'].sum(axis=1), 1.0)
+
+        # Primeira janela igual ao otimizador rodando direto no treino
+        optimizer = PortfolioOptimizer(daily_pnl.iloc[:120])
+        np.testing.assert_allclose(result['weights'].iloc[0], optimizer.optimize(), atol=1e-8)
+        multipliers = optimizer.calculate_multipliers(optimizer.optimal_weights, 100000)
+        expected = (daily_pnl.iloc[120:160] * pd.Series(multipliers)).sum(axis=1)
+        np.testing.assert_allclose(result['oos_pnl'].iloc[:40], expected)
+
+        parallel = wf.run(capital_inicial=100000, max_workers=2)
+        np.testing.assert_allclose(parallel['equity'], result['equity'])
+
+        expanding = WalkForwardOptimizer(daily_pnl, train_size=120, test_size=40, mode='expanding')
+        assert expanding.windows()[-1][:2] == (0, 280)
 
 
 class TestMetricsCalculator:
@@ -145,6 +1146,23 @@ class TestMetricsCalculator:
         assert 'Win Rate (%)' in metrics
         assert all(isinstance(v, (int, float)) for v in metrics.values())
     
+    def test_lazy_optimized_trades(self, sample_trades_df):
+        """Multiplicadores aplicados sob demanda = frame otimizado materializado."""
+        multipliers = {'Strategy A': 2.0, 'Strategy B': 0.5}
+        before = sample_trades_df.copy()
+
+        optimized = sample_trades_df.copy()
+        optimized['Profit/Loss (Global)'] *= optimized['Strategy name (Global)'].map(multipliers)
+        expected = MetricsCalculator(optimized, capital_inicial=100000).calculate_all_metrics()
+
+        calc = MetricsCalculator(sample_trades_df, capital_inicial=100000, multipliers=multipliers)
+        assert calc.calculate_all_metrics() == expected
+        pd.testing.assert_frame_equal(sample_trades_df, before)  # entrada intacta
+
+        trades = calc.get_trades()
+        assert 'Multiplier' in trades.columns
+        np.testing.assert_allclose(trades['Profit/Loss (Global)'], optimized['Profit/Loss (Global)'])
+
     def test_get_equity_curve(self, sample_trades_df):
         """Testa obtenção da curva de equity."""
         calc = MetricsCalculator(sample_trades_df, capital_inicial=100000)